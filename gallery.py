@@ -0,0 +1,38 @@
+from pathlib import Path
+import sys
+from postcard.gallery import build
+from postcard.spec import SpecError
+
+# ────────── CONFIG ───────────────────────────────────────────────────────────
+# card specs (their print files), rendered cards or folders; command‑line paths override
+INPUTS       = sorted(p for p in Path(".").glob("*.toml") if p.name != "pyproject.toml")
+OUTPUT_DIR   = Path("gallery")       # index.html, thumbs/, manifest.json
+TITLE        = "Postcards"
+STYLESHEET   = Path("styles.css")    # copied beside index.html
+WIDTHS       = (320, 640, 1280)      # thumbnail widths for srcset, px
+JPEG_QUALITY = 82                    # progressive JPEG
+WEBP_QUALITY = 80
+WORKERS      = None                  # processes for thumbnailing (None = one per CPU)
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+def main(paths):
+    missing = [p for p in paths if not Path(p).exists()]
+    if missing:
+        sys.exit(f"❌ File not found: {', '.join(map(str, missing))}")
+    if not STYLESHEET.is_file():
+        sys.exit(f"❌ Stylesheet not found: {STYLESHEET}")
+
+    try:
+        report = build(paths, OUTPUT_DIR, TITLE, STYLESHEET, WIDTHS,
+                       JPEG_QUALITY, WEBP_QUALITY, WORKERS)
+    except SpecError as e:
+        sys.exit(f"❌ {e}")
+    if not report.cards:
+        print(f"⚠️  No cards found in {', '.join(map(str, paths))}.")
+    state = "✅ Gallery updated" if report.written else "✅ Gallery up to date"
+    print(f"{state}: {OUTPUT_DIR / 'index.html'} – {report.summary()}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:] or INPUTS)
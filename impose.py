@@ -0,0 +1,51 @@
+from pathlib import Path
+import sys
+from postcard.impose import impose
+
+# ────────── CONFIG ───────────────────────────────────────────────────────────
+CARDS          = [Path("badlands.tif"), Path("boxwork_postcard.tif")]   # command‑line paths override
+BACKS          = None                 # None | one file for every card | list matching CARDS
+OUTPUT_FILE    = Path("sheet.tif")    # several sheets / sides → sheet-01-front.tif, …
+
+SHEET_IN       = (12, 18)             # press sheet w, h (inches)
+CARD_IN        = (6, 4)               # trim size; each card is turned to fit the slots
+DPI            = 300
+BLEED_IN       = 0.125                # mirrored card edge beyond the trim
+GAP_IN         = 0.0                  # extra space between bleeds
+MARGIN_IN      = 0.5                  # kept clear for crop marks / gripper
+MARK_LEN_IN    = 0.25
+MARK_OFFSET_IN = 0.0625               # gap between bleed edge and crop marks
+PAPER          = (255, 255, 255)
+COMPRESSION    = "deflate"            # None | "deflate"
+
+# double‑sided runs
+DUPLEX_FLIP    = "left-right"         # axis the sheet is turned over on: "left-right" | "top-bottom"
+BACK_OFFSET_IN = (0.0, 0.0)           # shift the whole back side to fix registration
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+def px(inches):
+    return round(inches * DPI)
+
+
+def main(cards):
+    cards   = [Path(c) for c in cards]
+    backs   = [] if BACKS is None else BACKS if isinstance(BACKS, list) else [BACKS]
+    missing = [p for p in cards + [Path(b) for b in backs] if not p.exists()]
+    if missing:
+        sys.exit(f"❌ File not found: {', '.join(map(str, missing))}")
+
+    try:
+        report = impose(cards, OUTPUT_FILE, tuple(map(px, SHEET_IN)), tuple(map(px, CARD_IN)),
+                        DPI, px(BLEED_IN), px(GAP_IN), px(MARGIN_IN), BACKS, DUPLEX_FLIP,
+                        tuple(map(px, BACK_OFFSET_IN)), px(MARK_LEN_IN), px(MARK_OFFSET_IN),
+                        COMPRESSION, PAPER)
+    except ValueError as e:
+        sys.exit(f"❌ {e}")
+    for path in report.sheets:
+        print(f"✅ Saved {path}")
+    print(report.summary())
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:] or CARDS)
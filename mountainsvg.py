@@ -1,60 +1,50 @@
-import re
 from pathlib import Path
-
-def hex_to_rgb(hex_color):
-    hex_color = hex_color.lstrip('#')
-    if len(hex_color) == 3:
-        hex_color = ''.join([c * 2 for c in hex_color])
-    try:
-        return tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
-    except:
-        return None
-
-def is_near_white(rgb, threshold=20):
-    if rgb is None:
-        return False
-    r, g, b = rgb
-    return r > 255 - threshold and g > 255 - threshold and b > 255 - threshold
-
-def clean_svg_colors(svg_text):
-    # Replace attribute colors
-    def replace_attr(match):
-        attr = match.group(1)
-        value = match.group(2)
-        rgb = hex_to_rgb(value)
-        if is_near_white(rgb):
-            return ''  # remove white-ish
-        return f'{attr}="#001f3f"'  # everything else → navy
-
-    svg_text = re.sub(r'(fill|stroke)\s*=\s*["\']#?([0-9a-fA-F]{3,6})["\']', replace_attr, svg_text)
-
-    # Replace inline style colors
-    def replace_style(match):
-        attr = match.group(1)
-        value = match.group(2)
-        rgb = hex_to_rgb(value)
-        if is_near_white(rgb):
-            return ''  # remove white-ish
-        return f'{attr}:#001f3f;'  # everything else → navy
-
-    svg_text = re.sub(r'(fill|stroke)\s*:\s*#?([0-9a-fA-F]{3,6})\s*;', replace_style, svg_text)
-
-    return svg_text
-
-def process_file(filepath):
-    path = Path(filepath)
-    if not path.exists():
-        print(f"❌ File not found: {filepath}")
-        return
-
-    svg_text = path.read_text(encoding='utf-8')
-    cleaned_svg = clean_svg_colors(svg_text)
-
-    if cleaned_svg != svg_text:
-        path.write_text(cleaned_svg, encoding='utf-8')
-        print(f"✅ Updated: {filepath}")
+import sys
+from postcard.svgcolor import recolor_all
+from postcard.svgopt import optimize_all
+
+# ────────── CONFIG ───────────────────────────────────────────────────────────
+INPUTS      = [Path("mountains.svg")]  # SVG files or folders; command‑line paths override
+SUFFIX      = ""                  # "" rewrites in place; "_cleaned" → mountains_cleaned.svg
+TOLERANCE   = 20                  # per‑channel distance for a palette colour to match
+PALETTE     = {                   # first match wins; None removes the colour
+    "white": None,                # near‑white → removed
+    "*":     "#001f3f",           # everything else → navy
+}
+WORKERS     = None                # processes for folders (None = one per CPU)
+
+# path optimiser (after recolouring, same single write per file)
+OPTIMIZE        = False
+OPT_TOLERANCE   = 0.1             # max geometric error, px (sets coordinate precision)
+DROP_BACKGROUND = True            # drop invisible shapes and a full‑canvas background
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+def main(paths):
+    missing = [p for p in paths if not Path(p).exists()]
+    if missing:
+        sys.exit(f"❌ File not found: {', '.join(map(str, missing))}")
+
+    changed = saved = 0
+    if OPTIMIZE:
+        for src, report in optimize_all(paths, PALETTE, TOLERANCE, SUFFIX,
+                                        OPT_TOLERANCE, DROP_BACKGROUND, WORKERS):
+            if report.path is None:
+                print(f"⚠️  No changes made to {src}.")
+                continue
+            changed += 1
+            saved   += report.bytes_in - report.bytes_out
+            print(f"✅ Optimised: {report.path} – {report.summary()}")
     else:
-        print("⚠️  No changes made. (Colors may already be navy or white was only present.)")
+        for src, out, counts in recolor_all(paths, PALETTE, TOLERANCE, SUFFIX, WORKERS):
+            if out is None:
+                print(f"⚠️  No changes made to {src}. (Colours may already match the palette.)")
+                continue
+            changed += 1
+            print(f"✅ Updated: {out} ({counts['recoloured']} recoloured, {counts['removed']} removed)")
+    if len(paths) > 1 or Path(paths[0]).is_dir():
+        print(f"{changed} file(s) updated" + (f", {saved:,} bytes saved" if OPTIMIZE else ""))
+
 
 if __name__ == "__main__":
-    process_file("mountains.svg")
+    main(sys.argv[1:] or INPUTS)
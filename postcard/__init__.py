@@ -0,0 +1,7 @@
+"""Shared pipeline stages for the postcard scripts."""
+
+import os
+from pathlib import Path
+
+# on‑disk caches (prepared textures, font index, …)
+CACHE_DIR = Path(os.environ.get("POSTCARD_CACHE", Path.home() / ".cache" / "postcard"))
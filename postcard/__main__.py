@@ -0,0 +1,6 @@
+"""`python -m postcard …` – see postcard.cli."""
+
+import sys
+from postcard.cli import main
+
+sys.exit(main())
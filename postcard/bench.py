@@ -0,0 +1,242 @@
+"""
+Stage benchmarks.
+
+`postcard bench` renders a matrix of cards – synthetic 12, 24 and 48 MP
+sources × one‑ and three‑line captions – and times every pipeline stage
+(crop, decode, colour conversion, resample, each layer, compositing,
+export and its resizes and encodes, through a postcard.trace Tracer) plus
+the end‑to‑end render, with the peak RSS of the process.
+
+• sources are generated, not downloaded: smooth colour fields with
+  full‑resolution grain, saved as 3:2 JPEGs tagged with an sRGB profile
+  (so the colour stage runs a real transform), and kept in BENCH_DIR
+• captions use the first of FONTS that is installed (or `--font`), so it
+  runs on a bare Linux box – no macOS fonts, no `sips`, no network
+• every run of every case is a fresh spawned process and skips the stage
+  cache: in‑memory caches start cold as they do for a real `postcard render`, and the peak RSS
+  is that one render's
+• results are written as JSON; against a stored baseline, any total,
+  stage or peak RSS that grew by more than the threshold is a regression
+  (stages under NOISE_S are too short to judge and never gate)
+"""
+
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from multiprocessing import get_context
+from pathlib import Path
+from statistics import median
+from time import perf_counter
+from PIL import Image, ImageChops, ImageFilter, ImageOps
+from postcard import CACHE_DIR, parallel
+
+BENCH_DIR = CACHE_DIR / "bench"
+SOURCES   = {12: (4240, 2832), 24: (6000, 4000), 48: (8496, 5664)}   # MP → 3:2 px
+LINES     = (1, 3)
+CAPTIONS  = ("Badlands National Park", "Sage Creek Rim Road", "South Dakota")
+FONTS     = ("DejaVu Sans", "Liberation Sans", "Noto Sans", "FreeSans", "Helvetica", "Arial")
+REPEAT    = 3
+THRESHOLD = 0.10        # fail when a time or peak RSS grows by more than this
+NOISE_S   = 0.02        # shorter stages vary more than that between runs
+SCHEMA    = 1
+
+
+# ────────── inputs ───────────────────────────────────────────────────────────
+
+def _save(img: Image.Image, path: Path, **opts):
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    img.save(tmp, **opts)
+    os.replace(tmp, path)
+
+
+def synth_source(mp: int) -> Path:
+    """A photo‑like JPEG of *mp* megapixels (a key of SOURCES), made once."""
+    from postcard.color import profile_bytes
+
+    path = BENCH_DIR / f"source-{mp}mp.jpg"
+    if path.is_file():
+        return path
+    BENCH_DIR.mkdir(parents=True, exist_ok=True)
+    w, h = SOURCES[mp]
+    rng  = random.Random(mp)
+
+    # soft colour fields at 1/32 scale over a sky‑to‑ground ramp …
+    small  = (w // 32, h // 32)
+    fields = Image.merge("RGB", [Image.frombytes("L", small, rng.randbytes(small[0] * small[1]))
+                                 for _ in range(3)])
+    fields = ImageOps.autocontrast(fields.filter(ImageFilter.GaussianBlur(6)))
+    ramp   = ImageOps.colorize(Image.linear_gradient("L").resize(small), (120, 160, 210), (90, 70, 50))
+    img    = Image.blend(ramp, fields, 0.4).resize((w, h), Image.BICUBIC)
+    # … with ±12 levels of full‑resolution grain, so the JPEG has detail to decode
+    grain  = Image.frombytes("L", (w, h), rng.randbytes(w * h)).point(lambda v: v * 24 // 255 - 12 + 128)
+    img    = Image.merge("RGB", [ImageChops.add(c, grain, 1.0, -128) for c in img.split()])
+    _save(img, path, format="JPEG", quality=90, icc_profile=profile_bytes())
+    return path
+
+
+def synth_texture() -> Path:
+    """A grey paper‑grain tile for the texture layer."""
+    path = BENCH_DIR / "paper.png"
+    if path.is_file():
+        return path
+    BENCH_DIR.mkdir(parents=True, exist_ok=True)
+    grain = Image.frombytes("L", (1024, 1024), random.Random(0).randbytes(1024 * 1024))
+    grain = ImageOps.autocontrast(grain.filter(ImageFilter.GaussianBlur(1.2)))
+    _save(grain.point(lambda v: 200 + v * 55 // 255), path, format="PNG")
+    return path
+
+
+def case_name(mp: int, lines: int) -> str:
+    return f"{mp}mp-{lines}line"
+
+
+def case_plan(mp: int, lines: int, out_dir: Path, font=None, dpi=300):
+    """The RenderPlan for one case, writing into *out_dir*."""
+    from postcard import spec
+
+    name  = case_name(mp, lines)
+    table = {
+        "input":   str(synth_source(mp)),
+        "output":  str(out_dir / f"{name}.tif"),
+        "card":    {"dpi": dpi, "size_in": [6, 4]},
+        "caption": {"lines": list(CAPTIONS[:lines])},
+        "font":    {"name": font or FONTS[0], "fallbacks": [] if font else list(FONTS[1:])},
+        "texture": {"file": str(synth_texture())},
+        "derivatives": [{"path": str(out_dir / f"{name}-web.jpg"), "width": 1600},
+                        {"path": str(out_dir / f"{name}-thumb.webp"), "width": 480}],
+    }
+    return spec.compile(spec.parse(table, name), out_dir, name)
+
+
+# ────────── measuring ────────────────────────────────────────────────────────
+
+def peak_rss() -> int:
+    """Peak resident set size of this process, bytes."""
+    try:
+        # this address space's high‑water mark; ru_maxrss would carry over
+        # the parent's peak through fork + exec
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024      # Linux reports KiB
+
+
+def _run(plan, workers) -> dict:
+    """One render of *plan*, in a fresh process."""
+    from postcard import render, trace
+
+    if workers:
+        parallel.set_workers(workers)
+    tracer = trace.Tracer(memory=False)
+    t0     = perf_counter()
+    render.render(plan, tracer, cache=False)
+    total  = perf_counter() - t0
+    stages = {name: s for name, s in tracer.totals().items() if name != "card"}
+    return dict(total=total, stages=stages, peak_rss=peak_rss())
+
+
+def run(sizes=tuple(SOURCES), lines=LINES, repeat=REPEAT, font=None, dpi=300,
+        workers=None, progress=None) -> dict:
+    """Benchmark every size × lines case *repeat* times; returns the JSON‑able results."""
+    cases = {}
+    with tempfile.TemporaryDirectory(prefix="postcard-bench-") as tmp:
+        plans = {(mp, n): case_plan(mp, n, Path(tmp), font, dpi) for mp in sizes for n in lines}
+        for (mp, n), plan in plans.items():
+            runs = []
+            for _ in range(repeat):
+                with ProcessPoolExecutor(1, mp_context=get_context("spawn")) as pool:
+                    runs.append(pool.submit(_run, plan, workers).result())
+            names = dict.fromkeys(s for r in runs for s in r["stages"])
+            cases[plan.name] = dict(
+                source=list(SOURCES[mp]), lines=n, card=list(plan.size), font=plan.font.family,
+                total=median(r["total"] for r in runs),
+                stages={s: median(r["stages"].get(s, 0.0) for r in runs) for s in names},
+                peak_rss=max(r["peak_rss"] for r in runs), runs=len(runs))
+            if progress:
+                progress(plan.name, cases[plan.name])
+    return dict(schema=SCHEMA, machine=machine(workers), dpi=dpi, repeat=repeat, cases=cases)
+
+
+def machine(workers=None) -> dict:
+    import PIL
+    return dict(python=platform.python_version(), pillow=PIL.__version__,
+                system=f"{platform.system()} {platform.machine()}",
+                cpus=os.cpu_count(), workers=workers or os.cpu_count())
+
+
+# ────────── baselines ────────────────────────────────────────────────────────
+
+@dataclass
+class Regression:
+    case:   str
+    metric: str
+    base:   float
+    now:    float
+
+    def __str__(self):
+        unit = (lambda v: f"{v / 2**20:.0f} MiB") if self.metric == "peak RSS" else (lambda v: f"{v:.3f}s")
+        return (f"{self.case} {self.metric}: {unit(self.base)} → {unit(self.now)} "
+                f"(+{self.now / self.base - 1:.0%})")
+
+
+def load(path) -> dict:
+    with open(path) as f:
+        results = json.load(f)
+    if results.get("schema") != SCHEMA:
+        raise ValueError(f"{path}: not a postcard bench file (schema {SCHEMA})")
+    return results
+
+
+def save(results: dict, path):
+    path = Path(path)
+    tmp  = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(results, indent=2) + "\n")
+    os.replace(tmp, path)
+
+
+def compare(results: dict, baseline: dict, threshold=THRESHOLD) -> list:
+    """Regressions of *results* against *baseline*, for the cases both ran."""
+    out = []
+    for name, now in results["cases"].items():
+        base = baseline["cases"].get(name)
+        if base is None:
+            continue
+        pairs = [("total", base["total"], now["total"]),
+                 ("peak RSS", base["peak_rss"], now["peak_rss"])]
+        pairs += [(s, base["stages"][s], t) for s, t in now["stages"].items()
+                  if base["stages"].get(s, 0.0) >= NOISE_S]
+        out += [Regression(name, m, b, n) for m, b, n in pairs if b > 0 and n > b * (1 + threshold)]
+    return out
+
+
+def table(results: dict, baseline: dict = None) -> str:
+    """Stages down, cases across; with *baseline*, each cell's change too."""
+    cases  = results["cases"]
+    stages = dict.fromkeys(s for c in cases.values() for s in c["stages"])
+    rows   = [(s, lambda c, s=s: c["stages"].get(s), "{:.3f}") for s in stages]
+    rows  += [("total", lambda c: c["total"], "{:.3f}"),
+              ("peak RSS MiB", lambda c: c["peak_rss"] / 2**20, "{:.0f}")]
+
+    def cell(name, get, fmt):
+        v = get(cases[name])
+        if v is None:
+            return "–"
+        base = baseline and baseline["cases"].get(name)
+        b    = base and get(base)
+        return f"{fmt.format(v)} {v / b - 1:+4.0%}" if b else fmt.format(v)
+
+    width = max(14 if baseline else 10, *(len(n) for n in cases)) + 2
+    lines = ["stage".ljust(16) + "".join(n.rjust(width) for n in cases)]
+    for label, get, fmt in rows:
+        lines.append(label.ljust(16) + "".join(cell(n, get, fmt).rjust(width) for n in cases))
+    return "\n".join(lines)
@@ -0,0 +1,164 @@
+"""
+The `postcard` command.
+
+    postcard render badlands.toml [castle.toml …] [--open] [--workers N] [--trace [FILE]] [--no-cache]
+    postcard check  badlands.toml […]
+    postcard bench  [--sizes 12 24 48] [--json out.json] [--baseline base.json]
+    postcard cache  stats | clear
+
+`render` validates every spec and compiles it into a render plan before
+any pixels are touched, then renders the cards in turn; with `--trace` every stage is timed and
+measured (see postcard.trace), a table per card is printed and the whole
+run is written as a Chrome trace. The decoded, converted and resampled
+photo comes from the stage cache (see postcard.stagecache) unless
+`--no-cache`; `cache stats` shows how it is doing. `check` stops
+after compiling and prints what would be made. `bench` times every
+stage on synthetic sources (see postcard.bench) and exits 1 when a run
+regresses past the baseline's threshold. Paths in a spec are
+relative to the spec file.
+
+Startup is kept lazy: only argparse is imported up front, the spec parser
+when a command runs, and the pipeline (Pillow and its format plugins,
+which it registers one by one instead of scanning them all) only once
+every spec is known to be valid.
+"""
+
+import argparse
+import os
+import sys
+
+
+def _show(path) -> str:
+    """*path* relative to the working directory when it's below it."""
+    rel = os.path.relpath(path)
+    return path if rel.startswith("..") else rel
+
+
+def _plans(paths):
+    from postcard import spec
+    plans, failed = [], False
+    for p in paths:
+        try:
+            plans.append(spec.load_plan(p))
+        except spec.SpecError as e:
+            print(e, file=sys.stderr)
+            failed = True
+    return None if failed else plans
+
+
+def cmd_check(args) -> int:
+    plans = _plans(args.specs)
+    if plans is None:
+        return 2
+    from postcard import render
+    for plan in plans:
+        s = plan.spec
+        w, h = plan.size
+        outs = ", ".join(_show(d.path) for d in render.derivatives(plan))
+        print(f"{plan.name}: {w}×{h}px @ {s.card.dpi} dpi, font {plan.font.family}; writes {outs}"
+              + (f", {_show(s.pdf)}" if s.pdf else ""))
+    return 0
+
+
+def cmd_render(args) -> int:
+    plans = _plans(args.specs)
+    if plans is None:
+        return 2
+    from postcard import export, parallel, render, trace
+    if args.workers:
+        parallel.set_workers(args.workers)
+
+    spans = []
+    for plan in plans:
+        s      = plan.spec
+        tracer = trace.Tracer() if args.trace else trace.off
+        res    = render.render(plan, tracer, cache=not args.no_cache)
+        w, h   = plan.size
+        print(f"Saved {_show(s.output)} ({w}×{h}px @ {s.card.dpi} dpi; {res.comp.stats.summary()})")
+        if len(res.export.written) > 1:
+            print(f"Exported {res.export.summary()}")
+        if s.pdf:
+            print(f"Saved {_show(s.pdf)}")
+        if args.trace:
+            tracer.close()
+            print(trace.summary(tracer.spans))
+            spans += tracer.spans
+        if args.open or s.open_viewer:
+            export.open_viewer(s.output)
+    if args.trace:
+        trace.save_chrome(args.trace, spans)
+        print(f"Saved trace {_show(args.trace)}")
+    return 0
+
+
+def cmd_bench(args) -> int:
+    from postcard import bench, fonts, spec
+    baseline = None
+    try:
+        if args.baseline:
+            baseline = bench.load(args.baseline)
+        results = bench.run(args.sizes, args.lines, args.repeat, args.font, args.dpi, args.workers,
+                            progress=lambda name, c: print(f"{name}: {c['total']:.2f}s", file=sys.stderr))
+    except (OSError, ValueError, spec.SpecError, fonts.FontNotFoundError) as e:
+        print(e, file=sys.stderr)
+        return 2
+    print(bench.table(results, baseline))
+    if args.json:
+        bench.save(results, args.json)
+    if baseline is None:
+        return 0
+    if baseline["machine"] != results["machine"]:
+        print(f"note: baseline is from {baseline['machine']}", file=sys.stderr)
+    regressions = bench.compare(results, baseline, args.threshold)
+    for r in regressions:
+        print(f"REGRESSION {r}")
+    return 1 if regressions else 0
+
+
+def cmd_cache(args) -> int:
+    from postcard import stagecache
+    if args.action == "clear":
+        print(f"Removed {stagecache.clear()} cached stage(s) from {stagecache.STAGE_CACHE_DIR}")
+    else:
+        print(stagecache.summary())
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="postcard", description="Print‑ready postcards from photos.")
+    sub    = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("render", help="render cards from TOML specs")
+    p.add_argument("specs", nargs="+", metavar="SPEC", help="card spec (.toml)")
+    p.add_argument("--open", action="store_true", help="open each print file when done (not when headless)")
+    p.add_argument("--workers", type=int, metavar="N", help="threads for pixel work (default: every core)")
+    p.add_argument("--trace", nargs="?", const="postcard-trace.json", metavar="FILE",
+                   help="time and measure every stage; write a Chrome trace (default: postcard-trace.json)")
+    p.add_argument("--no-cache", action="store_true", help="decode every photo again (skip the stage cache)")
+    p.set_defaults(run=cmd_render)
+
+    p = sub.add_parser("check", help="validate specs and show what they would write")
+    p.add_argument("specs", nargs="+", metavar="SPEC", help="card spec (.toml)")
+    p.set_defaults(run=cmd_check)
+
+    p = sub.add_parser("bench", help="time every render stage on synthetic 12–48 MP sources")
+    p.add_argument("--sizes", type=int, nargs="+", choices=[12, 24, 48], default=[12, 24, 48],
+                   metavar="MP", help="source sizes, megapixels (default: 12 24 48)")
+    p.add_argument("--lines", type=int, nargs="+", choices=[1, 2, 3], default=[1, 3],
+                   metavar="N", help="caption lines per card (default: 1 3)")
+    p.add_argument("--repeat", type=int, default=3, metavar="N", help="runs per case; the median is kept")
+    p.add_argument("--dpi", type=int, default=300, help="card resolution (6×4 in)")
+    p.add_argument("--font", help="caption font (default: the first installed of DejaVu Sans, Liberation Sans, …)")
+    p.add_argument("--workers", type=int, metavar="N", help="threads for pixel work (default: every core)")
+    p.add_argument("--json", metavar="PATH", help="write the results here")
+    p.add_argument("--baseline", metavar="PATH", help="compare with these results; exit 1 on a regression")
+    p.add_argument("--threshold", type=float, default=0.10, metavar="F",
+                   help="allowed growth over the baseline (default: 0.10 = 10%%)")
+    p.set_defaults(run=cmd_bench)
+
+    p = sub.add_parser("cache", help="stage cache statistics, or clear it")
+    p.add_argument("action", choices=["stats", "clear"], nargs="?", default="stats")
+    p.set_defaults(run=cmd_cache)
+
+    args = parser.parse_args(argv)
+    return args.run(args)
@@ -0,0 +1,158 @@
+"""
+In‑process ICC colour management (replaces the macOS `sips --matchTo` step).
+
+The embedded source profile is converted to the target profile with
+LittleCMS via Pillow's ImageCms – no temp files, one decode, and it runs
+anywhere Pillow was built with lcms2 (Linux render nodes included).
+The transform runs in horizontal strips on the `parallel` thread pool.
+Built transforms are cached per (source profile hash, target, intent,
+black‑point compensation) so a batch only pays the transform‑build cost
+once per distinct profile.
+
+For the press, `to_cmyk` converts the sRGB card to a CMYK output profile
+and `soft_proof` shows that CMYK file back in sRGB – the way it will
+print – through the same transform cache.
+"""
+
+from hashlib import sha1
+from io import BytesIO
+from pathlib import Path
+from threading import Lock
+from PIL import Image, ImageCms
+from postcard import parallel
+
+SRGB = "sRGB"
+
+INTENTS = {
+    "perceptual": ImageCms.Intent.PERCEPTUAL,
+    "relative":   ImageCms.Intent.RELATIVE_COLORIMETRIC,
+    "saturation": ImageCms.Intent.SATURATION,
+    "absolute":   ImageCms.Intent.ABSOLUTE_COLORIMETRIC,
+}
+
+# ICC colour‑space signature → Pillow mode the transform runs in
+_SPACE_MODES = {"RGB ": "RGB", "CMYK": "CMYK", "GRAY": "L"}
+
+_lock       = Lock()
+_profiles   = {}   # digest / name → ImageCmsProfile
+_transforms = {}   # (src digest, target key, intent, bpc, in_mode, out_mode) → transform
+
+
+def _digest(data: bytes) -> str:
+    return sha1(data).hexdigest()
+
+
+def _key(target) -> str:
+    """Cache key for a profile target: raw ICC bytes by digest, else its name."""
+    return _digest(target) if isinstance(target, bytes) else str(target)
+
+
+def load_profile(target) -> ImageCms.ImageCmsProfile:
+    """Return a cached profile for "sRGB", an .icc path or raw ICC bytes."""
+    key = _key(target)
+    with _lock:
+        prof = _profiles.get(key)
+    if prof is not None:
+        return prof
+
+    if isinstance(target, bytes):
+        prof = ImageCms.ImageCmsProfile(BytesIO(target))
+    elif key == SRGB:
+        prof = ImageCms.ImageCmsProfile(ImageCms.createProfile("sRGB"))
+    else:
+        path = Path(target)
+        if not path.is_file():
+            raise FileNotFoundError(f"ICC profile not found: {path}")
+        prof = ImageCms.ImageCmsProfile(str(path))
+
+    with _lock:
+        return _profiles.setdefault(key, prof)
+
+
+def profile_mode(profile: ImageCms.ImageCmsProfile) -> str:
+    space = profile.profile.xcolor_space
+    try:
+        return _SPACE_MODES[space]
+    except KeyError:
+        raise ValueError(f"unsupported ICC colour space {space!r}") from None
+
+
+def profile_bytes(target=SRGB) -> bytes:
+    """ICC bytes to embed in output files for *target*."""
+    return load_profile(target).tobytes()
+
+
+def get_transform(src_icc: bytes, target=SRGB, intent="perceptual",
+                  in_mode=None, out_mode=None, bpc=False) -> ImageCms.ImageCmsTransform:
+    """Build (or fetch from cache) the src → target LittleCMS transform,
+    with black‑point compensation if *bpc*."""
+    if intent not in INTENTS:
+        raise ValueError(f"unknown rendering intent {intent!r}")
+    src = load_profile(src_icc)
+    dst = load_profile(target)
+    in_mode  = in_mode or profile_mode(src)
+    out_mode = out_mode or profile_mode(dst)
+
+    key = (_digest(src_icc), _key(target), intent, bool(bpc), in_mode, out_mode)
+    with _lock:
+        xf = _transforms.get(key)
+    if xf is None:
+        flags = ImageCms.Flags.BLACKPOINTCOMPENSATION if bpc else ImageCms.Flags.NONE
+        xf = ImageCms.buildTransform(src, dst, in_mode, out_mode, INTENTS[intent], flags=flags)
+        with _lock:
+            xf = _transforms.setdefault(key, xf)
+    return xf
+
+
+def transform_cache_size() -> int:
+    return len(_transforms)
+
+
+def to_srgb(img: Image.Image, intent="perceptual", icc: bytes = None):
+    """
+    Convert *img* to 8‑bit sRGB in memory.
+
+    Returns (image, icc_bytes) where icc_bytes is the sRGB profile to embed.
+    Images without an embedded profile are assumed to already be sRGB.
+    """
+    icc = icc if icc is not None else img.info.get("icc_profile")
+    if not icc:
+        out = img if img.mode == "RGB" else img.convert("RGB")
+        return out, profile_bytes(SRGB)
+
+    in_mode = profile_mode(load_profile(icc))
+    if in_mode == "RGB" and img.mode == "RGBA":
+        in_mode = "RGBA"
+    src = img if img.mode == in_mode else img.convert(in_mode)
+    out_mode = "RGBA" if in_mode == "RGBA" else "RGB"
+
+    xf  = get_transform(icc, SRGB, intent, in_mode, out_mode)
+    out = parallel.map_strips(src, lambda strip: ImageCms.applyTransform(strip, xf))
+    if out.mode == "RGBA":
+        out = out.convert("RGB")
+    return out, profile_bytes(SRGB)
+
+
+def to_cmyk(img: Image.Image, profile, intent="relative", bpc=True):
+    """
+    Convert the sRGB *img* to the CMYK output *profile* (an .icc path or
+    bytes, e.g. the printer's press profile).
+
+    Returns (image, icc_bytes) with the press profile to embed.
+    """
+    dst = load_profile(profile)
+    if profile_mode(dst) != "CMYK":
+        raise ValueError(f"{profile} is not a CMYK profile")
+    src = img if img.mode == "RGB" else img.convert("RGB")
+    xf  = get_transform(profile_bytes(SRGB), profile, intent, "RGB", "CMYK", bpc)
+    out = parallel.map_strips(src, lambda strip: ImageCms.applyTransform(strip, xf))
+    return out, dst.tobytes()
+
+
+def soft_proof(cmyk: Image.Image, profile, intent="relative", bpc=False) -> Image.Image:
+    """
+    sRGB preview of the CMYK *cmyk* as printed with *profile*. "absolute"
+    also simulates the paper white; "relative" maps it to screen white.
+    """
+    xf = get_transform(load_profile(profile).tobytes(), SRGB, intent, "CMYK", "RGB", bpc)
+    return parallel.map_strips(cmyk, lambda strip: ImageCms.applyTransform(strip, xf))
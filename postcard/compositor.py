@@ -0,0 +1,158 @@
+"""
+Single‑buffer layer compositor.
+
+A card is one RGB working buffer plus a stack of layers (photo, gradient,
+emblem, texture, text shadow, text). Every layer carries its own bounding
+box and is blended in place with `Image.paste(fill, box, mask)`, or for custom
+blend modes (texture) crop → blend → paste in strips, so nothing ever
+round‑trips the whole canvas through RGBA. `CompositeStats` counts the
+buffers the compositor holds as it allocates them – the canvas, the layer
+being blended and its live strip crops – and reports their peak bytes and
+how many of those crops were full‑frame copies (the size of the canvas).
+Process‑wide RSS is postcard.trace's business.
+"""
+
+from dataclasses import dataclass, field
+from threading import Lock
+from PIL import Image
+from postcard import parallel
+
+LAYER_ORDER = ("photo", "gradient", "emblem", "texture", "text shadow", "text")
+
+
+@dataclass
+class Layer:
+    name: str
+    xy:   tuple                 # top‑left of the layer on the canvas
+    fill: object                # RGB tuple or an RGB image the size of the box
+    mask: Image.Image = None    # "L" coverage; None = opaque
+    blend: object = None        # optional fn(region, fill) → blended region
+    vector: object = None       # optional vector description for PDF export (pdf.py)
+
+    @property
+    def size(self):
+        src = self.mask if self.mask is not None else self.fill
+        return src.size
+
+    @property
+    def box(self):
+        x, y = self.xy
+        w, h = self.size
+        return x, y, x + w, y + h
+
+
+@dataclass
+class CompositeStats:
+    layers: int = 0
+    full_frame_copies: int = 0
+    canvas_bytes: int = 0
+    peak_bytes: int = 0
+    per_layer: list = field(default_factory=list)
+
+    def summary(self) -> str:
+        return (f"{self.layers} layers, {self.full_frame_copies} full‑frame copies, "
+                f"peak {self.peak_bytes / 2**20:.1f} MiB")
+
+
+def _nbytes(img) -> int:
+    if not isinstance(img, Image.Image):
+        return 0
+    return img.width * img.height * len(img.getbands())
+
+
+def _clip(box, size):
+    x0, y0, x1, y1 = box
+    return max(x0, 0), max(y0, 0), min(x1, size[0]), min(y1, size[1])
+
+
+class _Meter:
+    """Live and peak bytes of strip temporaries, counted as they're made."""
+
+    def __init__(self, canvas_size):
+        self.canvas_size = canvas_size
+        self.live = self.peak = self.copies = 0
+        self._lock = Lock()
+
+    def take(self, img):
+        with self._lock:
+            self.live += _nbytes(img)
+            self.peak  = max(self.peak, self.live)
+            self.copies += isinstance(img, Image.Image) and img.size == self.canvas_size
+        return img
+
+    def drop(self, *imgs):
+        with self._lock:
+            self.live -= sum(_nbytes(img) for img in imgs)
+
+
+class Compositor:
+    """Blend a stack of layers into one RGB buffer, each within its own box."""
+
+    def __init__(self, size, background):
+        self.canvas = Image.new("RGB", size, background)
+        self.background = background
+        self.layers = []
+        self.stats  = CompositeStats(canvas_bytes=_nbytes(self.canvas))
+
+    def add(self, layer: Layer):
+        if layer is not None:
+            self.layers.append(layer)
+        return self
+
+    def _apply(self, layer: Layer, meter: _Meter):
+        """Blend one layer, strip by strip on the `parallel` pool."""
+        canvas = self.canvas
+        if layer.blend is None:
+            # plain paste; a single strip pastes straight from the layer
+            w, h = layer.size
+            bounds = parallel.strip_bounds(h, w)
+            if len(bounds) <= 1:
+                canvas.paste(layer.fill, layer.xy, layer.mask)
+                return
+            x, y = layer.xy
+
+            def paste(rows):
+                r0, r1 = rows
+                fill = (meter.take(layer.fill.crop((0, r0, w, r1)))
+                        if isinstance(layer.fill, Image.Image) else layer.fill)
+                mask = meter.take(layer.mask.crop((0, r0, w, r1))) if layer.mask is not None else None
+                canvas.paste(fill, (x, y + r0), mask)
+                meter.drop(fill, mask)
+
+            parallel.run(paste, bounds)
+            return
+
+        # custom blend: crop → blend → paste back
+        x0, y0, x1, y1 = _clip(layer.box, canvas.size)
+        if x0 >= x1 or y0 >= y1:
+            return
+        lx, ly = x0 - layer.xy[0], y0 - layer.xy[1]
+
+        def blend(rows):
+            r0, r1 = rows
+            local  = (lx, ly + r0, lx + x1 - x0, ly + r1)
+            region = meter.take(canvas.crop((x0, y0 + r0, x1, y0 + r1)))
+            fill   = (meter.take(layer.fill.crop(local))
+                      if isinstance(layer.fill, Image.Image) else layer.fill)
+            mask   = meter.take(layer.mask.crop(local)) if layer.mask is not None else None
+            out    = layer.blend(region, fill)
+            if out is not region:
+                meter.take(out)
+            canvas.paste(out, (x0, y0 + r0), mask)
+            meter.drop(region, fill, mask, out if out is not region else None)
+
+        parallel.run(blend, parallel.strip_bounds(y1 - y0, x1 - x0))
+
+    def render(self) -> Image.Image:
+        """Blend every layer in stack order and return the working buffer."""
+        stats = self.stats
+        for layer in self.layers:
+            meter = _Meter(self.canvas.size)
+            self._apply(layer, meter)
+            held  = stats.canvas_bytes + _nbytes(layer.fill) + _nbytes(layer.mask)
+            stats.layers += 1
+            stats.full_frame_copies += meter.copies
+            stats.peak_bytes = max(stats.peak_bytes, held + meter.peak)
+            stats.per_layer.append((layer.name, layer.box))
+        stats.peak_bytes = max(stats.peak_bytes, stats.canvas_bytes)
+        return self.canvas
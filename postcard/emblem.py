@@ -0,0 +1,402 @@
+"""
+Vector emblems.
+
+An SVG (logo, line art, e.g. mountains_cleaned.svg) is rasterised to the
+size it will be printed at:
+• path data is parsed (svgopt.parse_path), arcs become cubics and every
+  segment is mapped through the element's transform chain into device
+  space, where Béziers are flattened to polygons with just enough points
+  to stay within FLATNESS px (Wang's formula)
+• polygons are filled with ImageDraw at SUPERSAMPLE× and box‑reduced,
+  which anti‑aliases the edges; fill‑rule nonzero sums signed coverage,
+  evenodd XORs it; strokes are drawn as wide polylines
+• a full‑canvas rectangle (a traced paper background) is skipped
+• the result is an RGB image + alpha (the SVG's own colours) or, with a
+  colour, just the alpha mask to stamp in that colour; there near‑white
+  shapes (the paper of a traced drawing) erase rather than add coverage
+
+Rasters are cached by (svg hash, size, colour) in memory and as PNGs
+under CACHE_DIR/emblems, so a batch stamping the same emblem on every card
+rasterises it once.
+"""
+
+import os
+import re
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass, field
+from functools import lru_cache
+from hashlib import sha1
+from math import atan2, ceil, cos, pi, radians, sin, sqrt, tan
+from pathlib import Path
+from PIL import Image, ImageChops, ImageColor, ImageDraw
+from postcard import CACHE_DIR
+from postcard.compositor import Layer
+from postcard.svgopt import local_name, parse_path, style_prop
+
+EMBLEM_CACHE_DIR  = CACHE_DIR / "emblems"
+EMBLEM_CACHE_SIZE = 16
+SUPERSAMPLE = 4
+FLATNESS    = 0.2          # max polygon deviation from the curve, device px
+PAPER       = 240          # in a single‑colour mask, fills this close to white erase
+VERSION     = 2            # bump when the rasteriser's output changes
+
+_INHERITED = ("fill", "fill-rule", "fill-opacity", "stroke", "stroke-width",
+              "stroke-opacity", "visibility")
+_SKIP      = {"defs", "clipPath", "mask", "symbol", "marker", "pattern",
+              "linearGradient", "radialGradient", "style", "script", "title",
+              "desc", "metadata"}
+_TRANSFORM = re.compile(r"(matrix|translate|scale|rotate|skewX|skewY)\s*\(([^)]*)\)")
+IDENTITY   = (1.0, 0.0, 0.0, 1.0, 0.0, 0.0)
+
+
+# ────────── geometry ─────────────────────────────────────────────────────────
+
+def multiply(m, n):
+    """Affine m ∘ n, both as (a, b, c, d, e, f) like SVG's matrix()."""
+    a, b, c, d, e, f = m
+    A, B, C, D, E, F = n
+    return (a * A + c * B, b * A + d * B, a * C + c * D, b * C + d * D,
+            a * E + c * F + e, b * E + d * F + f)
+
+
+def parse_transform(text: str):
+    m = IDENTITY
+    for kind, args in _TRANSFORM.findall(text or ""):
+        v = [float(x) for x in re.split(r"[\s,]+", args.strip()) if x]
+        if kind == "matrix":
+            t = tuple(v)
+        elif kind == "translate":
+            t = (1, 0, 0, 1, v[0], v[1] if len(v) > 1 else 0)
+        elif kind == "scale":
+            t = (v[0], 0, 0, v[1] if len(v) > 1 else v[0], 0, 0)
+        elif kind == "rotate":
+            a = radians(v[0])
+            t = (cos(a), sin(a), -sin(a), cos(a), 0, 0)
+            if len(v) == 3:
+                t = multiply(multiply((1, 0, 0, 1, v[1], v[2]), t), (1, 0, 0, 1, -v[1], -v[2]))
+        elif kind == "skewX":
+            t = (1, 0, tan(radians(v[0])), 1, 0, 0)
+        else:
+            t = (1, tan(radians(v[0])), 0, 1, 0, 0)
+        m = multiply(m, t)
+    return m
+
+
+def arc_to_cubics(x0, y0, rx, ry, phi, large, sweep, x, y):
+    """SVG endpoint arc → list of cubic control tuples (x1, y1, x2, y2, x, y)."""
+    if rx == 0 or ry == 0 or (x0, y0) == (x, y):
+        return [(x0, y0, x, y, x, y)]
+    p = radians(phi)
+    cp, sp = cos(p), sin(p)
+    dx, dy = (x0 - x) / 2, (y0 - y) / 2
+    x1p, y1p = cp * dx + sp * dy, -sp * dx + cp * dy
+    lam = x1p ** 2 / rx ** 2 + y1p ** 2 / ry ** 2
+    if lam > 1:                                      # radii too small: scale up
+        rx, ry = rx * sqrt(lam), ry * sqrt(lam)
+    num = rx ** 2 * ry ** 2 - rx ** 2 * y1p ** 2 - ry ** 2 * x1p ** 2
+    den = rx ** 2 * y1p ** 2 + ry ** 2 * x1p ** 2
+    k = sqrt(max(0.0, num / den)) * (-1 if large == sweep else 1)
+    cxp, cyp = k * rx * y1p / ry, -k * ry * x1p / rx
+    cx = cp * cxp - sp * cyp + (x0 + x) / 2
+    cy = sp * cxp + cp * cyp + (y0 + y) / 2
+    t1 = atan2((y1p - cyp) / ry, (x1p - cxp) / rx)
+    t2 = atan2((-y1p - cyp) / ry, (-x1p - cxp) / rx)
+    dt = t2 - t1
+    if sweep and dt < 0:
+        dt += 2 * pi
+    elif not sweep and dt > 0:
+        dt -= 2 * pi
+
+    n   = max(1, ceil(abs(dt) / (pi / 2)))
+    h   = dt / n
+    kk  = 4 / 3 * tan(h / 4)
+    out = []
+
+    def pt(t):
+        ex, ey = rx * cos(t), ry * sin(t)
+        return cx + cp * ex - sp * ey, cy + sp * ex + cp * ey
+
+    def deriv(t):
+        ex, ey = -rx * sin(t), ry * cos(t)
+        return cp * ex - sp * ey, sp * ex + cp * ey
+
+    t = t1
+    for _ in range(n):
+        (ax, ay), (bx, by) = pt(t), pt(t + h)
+        (dax, day), (dbx, dby) = deriv(t), deriv(t + h)
+        out.append((ax + kk * dax, ay + kk * day, bx - kk * dbx, by - kk * dby, bx, by))
+        t += h
+    out[-1] = (*out[-1][:4], x, y)
+    return out
+
+
+def _apply(m, x, y):
+    a, b, c, d, e, f = m
+    return a * x + c * y + e, b * x + d * y + f
+
+
+def _steps(pts, degree) -> int:
+    """Wang's formula: segments keeping a Bézier within FLATNESS."""
+    dd = max(sqrt((p0[0] - 2 * p1[0] + p2[0]) ** 2 + (p0[1] - 2 * p1[1] + p2[1]) ** 2)
+             for p0, p1, p2 in zip(pts, pts[1:], pts[2:]))
+    return max(1, ceil(sqrt(degree * (degree - 1) / 8 * dd / FLATNESS)))
+
+
+def _bezier(pts, n):
+    out = []
+    for i in range(1, n + 1):
+        t, p = i / n, list(pts)
+        while len(p) > 1:
+            p = [(a[0] + (b[0] - a[0]) * t, a[1] + (b[1] - a[1]) * t) for a, b in zip(p, p[1:])]
+        out.append(p[0])
+    return out
+
+
+def flatten(segs, m):
+    """Absolute segments → device‑space polygons (one per subpath), with
+    the closing flag for each."""
+    polys, cur, start = [], None, (0.0, 0.0)
+    pos = (0.0, 0.0)                 # current point, user space
+    for s in segs:
+        kind = s[0]
+        if kind == "M":
+            pos = start = s[1:3]
+            cur = [_apply(m, *pos)]
+            polys.append([cur, False])
+            continue
+        if cur is None:
+            cur = [_apply(m, *pos)]
+            polys.append([cur, False])
+        if kind == "Z":
+            polys[-1][1] = True
+            pos = start
+            cur = None
+            continue
+        if kind == "L":
+            cur.append(_apply(m, *s[1:3]))
+        elif kind in ("C", "Q"):
+            ctrl = [_apply(m, *pos)] + [_apply(m, x, y) for x, y in zip(s[1::2], s[2::2])]
+            degree = len(ctrl) - 1
+            cur.extend(_bezier(ctrl, _steps(ctrl, degree)))
+        elif kind == "A":
+            for c in arc_to_cubics(*pos, *s[1:]):
+                ctrl = [_apply(m, *pos)] + [_apply(m, x, y) for x, y in zip(c[0::2], c[1::2])]
+                cur.extend(_bezier(ctrl, _steps(ctrl, 3)))
+                pos = c[4:6]
+        pos = (s[-2], s[-1])
+    return [(p, closed) for p, closed in polys if len(p) > 1]
+
+
+# ────────── rasterising ──────────────────────────────────────────────────────
+
+def _bounds(polys, pad, size):
+    xs = [x for p, _ in polys for x, _ in p]
+    ys = [y for p, _ in polys for _, y in p]
+    x0, y0 = max(0, int(min(xs) - pad)), max(0, int(min(ys) - pad))
+    x1, y1 = min(size[0], ceil(max(xs) + pad) + 1), min(size[1], ceil(max(ys) + pad) + 1)
+    return (x0, y0, x1, y1) if x0 < x1 and y0 < y1 else None
+
+
+def _signed_area(poly):
+    return sum(x0 * y1 - x1 * y0 for (x0, y0), (x1, y1) in zip(poly, poly[1:] + poly[:1]))
+
+
+def _fill(polys, box, rule) -> Image.Image:
+    """"L" coverage (0/255) of *polys* inside *box*."""
+    x0, y0, x1, y1 = box
+    size = (x1 - x0, y1 - y0)
+    local = [[(x - x0, y - y0) for x, y in p] for p, _ in polys if len(p) > 2]
+    if len(local) <= 1 or rule == "evenodd":
+        cov = Image.new("L", size)
+        for p in local:
+            tmp = Image.new("L", size)
+            ImageDraw.Draw(tmp).polygon(p, fill=255)
+            cov = ImageChops.difference(cov, tmp) if len(local) > 1 else tmp
+        return cov
+    # winding number in "L", offset by 128 (±127 nested contours is plenty)
+    wind = Image.new("L", size, 128)
+    for p in local:
+        tmp = Image.new("L", size, 128)
+        ImageDraw.Draw(tmp).polygon(p, fill=129 if _signed_area(p) > 0 else 127)
+        wind = ImageChops.add(wind, tmp, 1.0, -128)
+    return wind.point(lambda v: 0 if v == 128 else 255)
+
+
+def _stroke(polys, box, width) -> Image.Image:
+    x0, y0, x1, y1 = box
+    cov  = Image.new("L", (x1 - x0, y1 - y0))
+    draw = ImageDraw.Draw(cov)
+    for p, closed in polys:
+        pts = [(x - x0, y - y0) for x, y in p] + ([(p[0][0] - x0, p[0][1] - y0)] if closed else [])
+        draw.line(pts, fill=255, width=max(1, round(width)), joint="curve")
+    return cov
+
+
+def _opacity(v) -> float:
+    try:
+        return max(0.0, min(1.0, float(v)))
+    except (TypeError, ValueError):
+        return 1.0
+
+
+def _length(v) -> float:
+    try:
+        return float(re.sub(r"[a-z]+$", "", str(v).strip()))
+    except ValueError:
+        return 1.0
+
+
+def _paint(color):
+    if color in (None, "none", "transparent") or str(color).startswith("url("):
+        return None
+    try:
+        return ImageColor.getrgb(color)[:3]
+    except ValueError:
+        return None
+
+
+def _is_background(polys, size, tol=SUPERSAMPLE) -> bool:
+    """One rectangle covering the whole canvas – a traced paper background."""
+    if len(polys) != 1:
+        return False
+    poly = polys[0][0]
+    xs, ys = [x for x, _ in poly], [y for _, y in poly]
+    x0, y0, x1, y1 = min(xs), min(ys), max(xs), max(ys)
+    if x0 > tol or y0 > tol or x1 < size[0] - tol or y1 < size[1] - tol:
+        return False
+    return all(min(abs(x - x0), abs(x - x1), abs(y - y0), abs(y - y1)) <= tol
+               for x, y in poly)
+
+
+def _viewbox(root):
+    vb = root.get("viewBox")
+    if vb:
+        return tuple(float(v) for v in vb.replace(",", " ").split())
+    w, h = (float(re.sub(r"[a-z%]+$", "", root.get(k, "100"))) for k in ("width", "height"))
+    return 0.0, 0.0, w, h
+
+
+def _render(svg: bytes, size, color):
+    root = ET.fromstring(svg)
+    vx, vy, vw, vh = _viewbox(root)
+    s  = min(size[0] / vw, size[1] / vh)
+    W, H = max(1, round(vw * s)), max(1, round(vh * s))
+    ss = SUPERSAMPLE
+    k  = s * ss
+    big = (W * ss, H * ss)
+    alpha = Image.new("L", big)
+    rgb   = Image.new("RGB", big) if color is None else None
+
+    def visit(el, props, m, opacity):
+        if local_name(el.tag) in _SKIP or style_prop(el, "display") == "none":
+            return
+        props = dict(props)
+        for name in _INHERITED:
+            v = style_prop(el, name)
+            if v is not None and v != "inherit":
+                props[name] = v
+        m = multiply(m, parse_transform(el.get("transform")))
+        opacity *= _opacity(style_prop(el, "opacity") or 1)   # group opacity, approximated
+        if opacity <= 0:
+            return
+        if local_name(el.tag) == "path" and props.get("visibility") not in ("hidden", "collapse"):
+            try:
+                segs = parse_path(el.get("d", ""))
+            except ValueError:
+                segs = []
+            polys = flatten(segs, m)
+            if polys and not _is_background(polys, big):
+                paint(polys, props, opacity, m)
+        for child in el:
+            visit(child, props, m, opacity)
+
+    def paint(polys, props, opacity, m):
+        sw = _length(props.get("stroke-width", 1)) * sqrt(abs(m[0] * m[3] - m[1] * m[2]))
+        jobs = []
+        fill = _paint(props.get("fill", "black"))
+        if fill is not None:
+            jobs.append(("fill", fill, opacity * _opacity(props.get("fill-opacity", 1))))
+        stroke = _paint(props.get("stroke"))
+        if stroke is not None and sw > 0:
+            jobs.append(("stroke", stroke, opacity * _opacity(props.get("stroke-opacity", 1))))
+        for kind, rgb_, op in jobs:
+            box = _bounds(polys, sw / 2 + 1, big)
+            if box is None:
+                continue
+            cov = (_fill(polys, box, props.get("fill-rule", "nonzero")) if kind == "fill"
+                   else _stroke(polys, box, sw))
+            if op < 1:
+                cov = cov.point(lambda v: round(v * op))
+            region = alpha.crop(box)
+            if rgb is None and min(rgb_) >= PAPER:
+                alpha.paste(ImageChops.subtract(region, cov), box[:2])  # paper erases ink
+                continue
+            alpha.paste(ImageChops.screen(region, cov), box[:2])      # a + b − ab
+            if rgb is not None:
+                rgb.paste(rgb_, box[:2], cov)
+
+    device = (k, 0, 0, k, -vx * k, -vy * k)
+    visit(root, {}, device, 1.0)
+
+    if rgb is None:
+        return None, alpha.reduce(ss)
+    # pasting through the coverage onto black left rgb premultiplied already
+    rgba = Image.merge("RGBa", (*rgb.split(), alpha)).reduce(ss).convert("RGBA")
+    return rgba.convert("RGB"), rgba.getchannel("A")
+
+
+@dataclass(frozen=True)
+class _Svg:
+    """SVG bytes that hash and compare by their digest alone."""
+    digest: str
+    data:   bytes = field(compare=False, repr=False)
+
+
+@lru_cache(maxsize=EMBLEM_CACHE_SIZE)
+def _raster(svg: _Svg, size, color):
+    key  = f"{svg.digest}:{size[0]}x{size[1]}:{color}:{SUPERSAMPLE}:{FLATNESS}:{PAPER}:{VERSION}"
+    disk = EMBLEM_CACHE_DIR / f"{sha1(key.encode()).hexdigest()}.png"
+    if disk.is_file():
+        with Image.open(disk) as im:
+            im.load()
+            if color is not None:
+                return None, im.convert("L")
+            return im.convert("RGB"), im.getchannel("A")
+
+    rgb, alpha = _render(svg.data, size, color)
+    try:
+        disk.parent.mkdir(parents=True, exist_ok=True)
+        tmp = disk.with_suffix(f".{os.getpid()}.tmp")
+        out = alpha if rgb is None else Image.merge("RGBA", (*rgb.split(), alpha))
+        out.save(tmp, "PNG", compress_level=1)
+        os.replace(tmp, disk)
+    except OSError:
+        pass  # disk cache is best‑effort
+    return rgb, alpha
+
+
+def rasterize(path: Path, size, color=None):
+    """
+    (rgb or None, alpha) for the SVG at *path*, fitted inside *size* (w, h)
+    keeping its aspect. With *color* only the alpha is rendered – every
+    painted shape counts, near‑white ones erase – and rgb is None. Cached
+    by content, not path; treat as read‑only.
+    """
+    path = Path(path)
+    if not path.is_file():
+        raise FileNotFoundError(f"emblem not found: {path}")
+    data  = path.read_bytes()
+    color = tuple(color) if color is not None else None
+    return _raster(_Svg(sha1(data).hexdigest(), data), tuple(size), color)
+
+
+def emblem_layer(path: Path, xy, size, color=None, opacity: float = 1.0) -> Layer:
+    """Compositor layer stamping the emblem with its top‑left at *xy*."""
+    rgb, alpha = rasterize(path, size, color)
+    if opacity < 1:
+        alpha = alpha.point(lambda v: round(v * opacity))
+    return Layer("emblem", tuple(xy), rgb if rgb is not None else color, alpha)
+
+
+def cache_info():
+    return _raster.cache_info()
@@ -0,0 +1,227 @@
+"""
+Derivative export from one finished canvas.
+
+A card is rendered once; `export` then writes every configured file from
+that canvas – the print TIFF, a web JPEG, WebP thumbnails, a social crop:
+• derivatives sharing an aspect are built as a pyramid, largest first,
+  each size resized from the one above instead of from full resolution
+• encoding runs on a thread pool (Pillow's encoders drop the GIL), so the
+  next size is resized while the previous ones are still being written
+• files are written to a temp name and moved into place; RGB TIFFs go
+  through tiffwriter (tiles, Deflate / LZW with predictor, BigTIFF,
+  compression across threads) and are read back once to time decoding
+• a derivative with an output *profile* (the printer's CMYK press
+  profile) is converted with color.to_cmyk, and can write a soft proof
+  – how it will print, in sRGB – next to it
+
+`open_viewer` replaces the old blocking, macOS‑only `open` call: it starts
+the platform viewer without waiting and does nothing when headless.
+"""
+
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from importlib import import_module
+from pathlib import Path
+from PIL import Image
+from postcard import color, parallel, tiffwriter, trace
+
+# encoder settings per format, overridable per derivative
+FORMAT_OPTIONS = {
+    "JPEG": dict(quality=85, progressive=True, optimize=True),
+    "WEBP": dict(quality=80, method=4),
+    "PNG":  dict(),
+    "TIFF": dict(compression="deflate"),       # see tiffwriter.TiffWriter
+}
+_PIL_TIFF = {"deflate": "tiff_adobe_deflate", "lzw": "tiff_lzw"}
+
+# common suffixes → (format, plugin); importing the one plugin a file needs
+# spares the scan of every Pillow format plugin on the first save
+_PLUGINS = {
+    ".jpg":  ("JPEG", "JpegImagePlugin"),
+    ".jpeg": ("JPEG", "JpegImagePlugin"),
+    ".png":  ("PNG", "PngImagePlugin"),
+    ".webp": ("WEBP", "WebPImagePlugin"),
+    ".tif":  ("TIFF", "TiffImagePlugin"),
+    ".tiff": ("TIFF", "TiffImagePlugin"),
+}
+
+
+@dataclass(frozen=True)
+class Derivative:
+    path:    Path
+    width:   int = None      # px; None = full size (never upscaled)
+    aspect:  tuple = None    # (w, h) centre crop, e.g. (4, 5); None = as rendered
+    options: dict = None     # encoder options over FORMAT_OPTIONS
+    profile: object = None   # CMYK output ICC (path or bytes); None = sRGB
+    intent:  str = "relative"
+    bpc:     bool = True     # black‑point compensation
+    proof:   Path = None     # with *profile*: also write an sRGB soft proof here
+
+    @property
+    def format(self) -> str:
+        return _format(self.path)
+
+
+def _format(path) -> str:
+    """Pillow format for *path*, registering just that format's plugin."""
+    ext = Path(path).suffix.lower()
+    if ext in _PLUGINS:
+        fmt, plugin = _PLUGINS[ext]
+        import_module(f"PIL.{plugin}")
+        return fmt
+    try:
+        return Image.registered_extensions()[ext]
+    except KeyError:
+        raise ValueError(f"no image format for {path}") from None
+
+
+@dataclass
+class Written:
+    path:    Path
+    size:    tuple
+    bytes:   int
+    write_s: float
+    read_s:  float = None    # TIFFs only: time to decode the file again
+
+    def __str__(self):
+        read = f", read {self.read_s:.2f}s" if self.read_s is not None else ""
+        return (f"{Path(self.path).name} {self.size[0]}×{self.size[1]} "
+                f"{self.bytes / 2**20:.1f} MiB (write {self.write_s:.2f}s{read})")
+
+
+@dataclass
+class ExportReport:
+    written: list = field(default_factory=list)   # Written
+    seconds: float = 0.0
+
+    def summary(self) -> str:
+        files = ", ".join(map(str, self.written))
+        return f"{len(self.written)} file(s) in {self.seconds:.1f}s: {files}"
+
+
+def crop_to(img: Image.Image, aspect) -> Image.Image:
+    """Largest centred crop of *img* with *aspect* (w, h)."""
+    ratio = aspect[0] / aspect[1]
+    w, h  = img.size
+    if w / h > ratio:
+        cw, ch = round(h * ratio), h
+    else:
+        cw, ch = w, round(w / ratio)
+    x, y = (w - cw) // 2, (h - ch) // 2
+    return img if (cw, ch) == (w, h) else img.crop((x, y, x + cw, y + ch))
+
+
+def _size(d: Derivative, base) -> tuple:
+    w, h = base
+    if d.width is None or d.width >= w:
+        return w, h
+    return d.width, max(1, round(h * d.width / w))
+
+
+def _write(img: Image.Image, path: Path, opts: dict, icc, dpi) -> Written:
+    fmt = _format(path)
+    t0  = time.perf_counter()
+    if fmt == "TIFF" and img.mode in tiffwriter.PHOTOMETRIC:
+        tiffwriter.save(img, path, dpi or 72, icc, **opts)
+    else:
+        if fmt == "TIFF":                       # other modes: Pillow's strip writer
+            opts = dict(compression=_PIL_TIFF.get(opts.get("compression"), "raw"))
+        if icc:
+            opts["icc_profile"] = icc
+        if dpi:
+            opts["dpi"] = (dpi, dpi)
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        try:
+            img.save(tmp, fmt, **opts)
+            os.replace(tmp, path)
+        except BaseException:
+            tmp.unlink(missing_ok=True)
+            raise
+    out = Written(path, img.size, path.stat().st_size, time.perf_counter() - t0)
+    if fmt == "TIFF":
+        t0 = time.perf_counter()
+        with Image.open(path) as back:
+            back.load()
+        out.read_s = time.perf_counter() - t0
+    return out
+
+
+def _save(img: Image.Image, d: Derivative, icc, dpi, tracer=trace.off) -> list:
+    with tracer("encode", file=Path(d.path).name) as span:
+        span.image(img)
+        return _encode(img, d, icc, dpi)
+
+
+def _encode(img: Image.Image, d: Derivative, icc, dpi) -> list:
+    opts = {**FORMAT_OPTIONS.get(d.format, {}), **(d.options or {})}
+    if d.profile is None:
+        return [_write(img, Path(d.path), opts, icc, dpi)]
+    cmyk, press = color.to_cmyk(img, d.profile, d.intent, d.bpc)
+    out = [_write(cmyk, Path(d.path), opts, press, dpi)]
+    if d.proof:
+        proof = color.soft_proof(cmyk, d.profile)
+        out.append(_write(proof, Path(d.proof), dict(FORMAT_OPTIONS.get(_format(d.proof), {})),
+                          color.profile_bytes(color.SRGB), dpi))
+    return out
+
+
+def export(canvas: Image.Image, derivatives, icc: bytes = None, dpi=None,
+           workers=None, tracer=trace.off) -> ExportReport:
+    """
+    Write every Derivative in *derivatives* from *canvas*. *dpi* is
+    tagged on full‑size, uncropped outputs only (the print files).
+    Resizes and encodes run in *tracer* spans.
+    """
+    t0     = time.perf_counter()
+    chains = {}
+    for d in derivatives:
+        chains.setdefault(d.aspect and d.aspect[0] / d.aspect[1], (d.aspect, []))[1].append(d)
+
+    jobs    = []
+    workers = workers or min(len(derivatives), parallel.workers()) or 1
+    with ThreadPoolExecutor(workers, thread_name_prefix="export") as pool:
+        for aspect, ds in chains.values():
+            img  = canvas if aspect is None else crop_to(canvas, aspect)
+            base = img.size
+            for d in sorted(ds, key=lambda d: -_size(d, base)[0]):
+                size = _size(d, base)
+                if img.size != size:
+                    with tracer("resize") as span:
+                        img = parallel.resize(img, size)   # from the previous, larger level
+                        span.image(img)
+                full = aspect is None and size == canvas.size
+                jobs.append(pool.submit(_save, img, d, icc, dpi if full else None, tracer))
+        report = ExportReport([w for j in jobs for w in j.result()])
+    report.seconds = time.perf_counter() - t0
+    return report
+
+
+# ────────── viewer ───────────────────────────────────────────────────────────
+
+def headless() -> bool:
+    """True without a display (or with POSTCARD_HEADLESS / CI set)."""
+    if os.environ.get("POSTCARD_HEADLESS") or os.environ.get("CI"):
+        return True
+    if sys.platform in ("darwin", "win32"):
+        return False
+    return not (os.environ.get("DISPLAY") or os.environ.get("WAYLAND_DISPLAY"))
+
+
+def open_viewer(path) -> bool:
+    """Open *path* in the platform viewer without waiting; False if it wasn't."""
+    if headless():
+        return False
+    try:
+        if sys.platform == "win32":
+            os.startfile(path)
+        else:
+            cmd = "open" if sys.platform == "darwin" else "xdg-open"
+            subprocess.Popen([cmd, str(path)], stdout=subprocess.DEVNULL,
+                             stderr=subprocess.DEVNULL, start_new_session=True)
+    except OSError:
+        return False
+    return True
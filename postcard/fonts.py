@@ -0,0 +1,221 @@
+"""
+Font catalog.
+
+Configured font directories are scanned once and every face is indexed by
+family, style and path. The index is persisted as JSON under CACHE_DIR and
+re‑read per file only when its mtime changes, so later runs never open
+font files just to learn their names. Loaded `FreeTypeFont` objects are
+kept in an LRU keyed by (path, face index, size).
+
+Lookups accept a path, a file name ("IronickNF.otf"), a family
+("Ironick NF") or "Family Style" ("DejaVu Sans Bold"). A miss raises
+FontNotFoundError instead of silently falling back to `load_default()`.
+"""
+
+import json
+import os
+import sys
+from dataclasses import asdict, dataclass
+from difflib import get_close_matches
+from functools import lru_cache
+from pathlib import Path
+from threading import Lock
+from PIL import ImageFont
+from postcard import CACHE_DIR
+
+FONT_INDEX_FILE = CACHE_DIR / "fonts.json"
+FONT_CACHE_SIZE = 64
+FONT_EXTS       = {".ttf", ".otf", ".ttc", ".otc"}
+REGULAR_STYLES  = ("regular", "book", "roman", "normal", "medium")
+
+if sys.platform == "darwin":
+    DEFAULT_FONT_DIRS = ["~/Library/Fonts", "/Library/Fonts", "/System/Library/Fonts"]
+elif sys.platform == "win32":
+    DEFAULT_FONT_DIRS = [os.path.join(os.environ.get("WINDIR", "C:/Windows"), "Fonts")]
+else:
+    DEFAULT_FONT_DIRS = ["~/.local/share/fonts", "~/.fonts",
+                         "/usr/local/share/fonts", "/usr/share/fonts"]
+
+
+class FontNotFoundError(LookupError):
+    pass
+
+
+@dataclass(frozen=True)
+class FontFace:
+    family: str
+    style:  str
+    path:   str
+    index:  int = 0
+
+    @property
+    def name(self):
+        return f"{self.family} {self.style}"
+
+
+def _read_faces(path: str):
+    """Every face in a font file (collections hold several)."""
+    faces, index = [], 0
+    while True:
+        try:
+            font = ImageFont.truetype(path, 12, index=index)
+        except OSError:
+            break
+        family, style = font.getname()
+        faces.append(FontFace(family or Path(path).stem, style or "Regular", path, index))
+        if Path(path).suffix.lower() not in (".ttc", ".otc"):
+            break
+        index += 1
+    return faces
+
+
+class FontCatalog:
+    """Index of every face under *dirs*, persisted to *index_file*."""
+
+    def __init__(self, dirs=(), index_file: Path = FONT_INDEX_FILE):
+        self.dirs = [Path(d).expanduser() for d in (*dirs, *DEFAULT_FONT_DIRS)]
+        self.index_file = index_file
+        self.faces = []
+        self._resolved = {}
+        self.scan()
+
+    def _load_index(self):
+        try:
+            return json.loads(self.index_file.read_text())
+        except (OSError, ValueError):
+            return {}
+
+    def _save_index(self, index):
+        try:
+            self.index_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.index_file.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_text(json.dumps(index))
+            os.replace(tmp, self.index_file)
+        except OSError:
+            pass  # the index is only a cache
+
+    def scan(self):
+        """Walk the font dirs, re‑reading only files whose mtime changed.
+        Files are indexed by their resolved path, as _face_for_path looks them up."""
+        old, new = self._load_index(), {}
+        for root in self.dirs:
+            if not root.is_dir():
+                continue
+            for dirpath, _, files in os.walk(root):
+                for fn in files:
+                    if Path(fn).suffix.lower() not in FONT_EXTS:
+                        continue
+                    path = os.path.realpath(os.path.join(dirpath, fn))
+                    try:
+                        mtime = os.stat(path).st_mtime_ns
+                    except OSError:
+                        continue                # a broken link, or gone mid‑walk
+                    entry = old.get(path)
+                    if entry is None or entry["mtime_ns"] != mtime:
+                        entry = {"mtime_ns": mtime,
+                                 "faces": [asdict(f) for f in _read_faces(path)]}
+                    new[path] = entry
+        self.faces = [FontFace(**f) for e in new.values() for f in e["faces"]]
+
+        # entries from other dirs / explicit paths stay indexed while unchanged
+        for path, entry in old.items():
+            if path in new:
+                continue
+            try:
+                unchanged = os.stat(path).st_mtime_ns == entry["mtime_ns"]
+            except OSError:
+                continue
+            if unchanged:
+                new[path] = entry
+        if new != old:
+            self._save_index(new)
+        self._index = new
+        self._resolved = {}
+
+    def _face_for_path(self, path: Path) -> FontFace:
+        key = str(path.resolve())
+        entry = self._index.get(key)
+        mtime = path.stat().st_mtime_ns
+        if entry is None or entry["mtime_ns"] != mtime:
+            faces = _read_faces(key)
+            if not faces:
+                raise FontNotFoundError(f"not a usable font file: {path}")
+            self._index[key] = {"mtime_ns": mtime, "faces": [asdict(f) for f in faces]}
+            self._save_index(self._index)
+        return FontFace(**self._index[key]["faces"][0])
+
+    def find(self, name: str) -> FontFace:
+        """Resolve a path, file name, family or "Family Style" to one face."""
+        face = self._resolved.get(name)
+        if face is None:
+            face = self._resolved[name] = self._find(name)
+        return face
+
+    def _find(self, name: str) -> FontFace:
+        path = Path(name).expanduser()
+        if path.is_file():
+            return self._face_for_path(path)
+
+        # a stale absolute path still matches the same file name in the dirs
+        want = (path.name if len(path.parts) > 1 else name).lower()
+        by_file   = [f for f in self.faces if Path(f.path).name.lower() == want
+                     or Path(f.path).stem.lower() == want]
+        by_name   = [f for f in self.faces if f.name.lower() == want]
+        by_family = [f for f in self.faces if f.family.lower() == want]
+        for hits in (by_file, by_name, by_family):
+            if hits:
+                regular = [f for f in hits if f.style.lower() in REGULAR_STYLES]
+                return (regular or hits)[0]
+
+        known = sorted({f.family for f in self.faces} | {Path(f.path).name for f in self.faces})
+        close = get_close_matches(name, known, n=5, cutoff=0.5)
+        hint  = f"; did you mean {', '.join(close)}?" if close else ""
+        dirs  = ", ".join(str(d) for d in self.dirs)
+        raise FontNotFoundError(f"font {name!r} not found in {dirs}{hint}")
+
+    def families(self):
+        return sorted({f.family for f in self.faces})
+
+
+_lock     = Lock()
+_catalogs = {}
+
+
+def catalog(dirs=()) -> FontCatalog:
+    """The (per‑process, scan‑once) catalog for *dirs* + the platform dirs."""
+    key = tuple(str(d) for d in dirs)
+    with _lock:
+        if key not in _catalogs:
+            _catalogs[key] = FontCatalog(dirs)
+        return _catalogs[key]
+
+
+def find(name: str, dirs=()) -> FontFace:
+    return catalog(dirs).find(name)
+
+
+def find_first(names, dirs=()) -> FontFace:
+    """First of *names* that resolves; raises naming every font tried."""
+    cat   = catalog(dirs)
+    names = [n for n in names if n]
+    for name in names:
+        try:
+            return cat.find(name)
+        except FontNotFoundError:
+            continue
+    tried = ", ".join(repr(n) for n in names) or "(none configured)"
+    raise FontNotFoundError(f"none of {tried} found in {', '.join(map(str, cat.dirs))}")
+
+
+@lru_cache(maxsize=FONT_CACHE_SIZE)
+def load_path(path: str, index: int, size: int) -> ImageFont.FreeTypeFont:
+    """Loaded face *index* of *path* at *size* px (LRU‑cached; share, don't mutate)."""
+    return ImageFont.truetype(path, size, index=index)
+
+
+def load(face: FontFace, size: int) -> ImageFont.FreeTypeFont:
+    return load_path(face.path, face.index, int(size))
+
+
+def cache_info():
+    return load_path.cache_info()
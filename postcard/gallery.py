@@ -0,0 +1,262 @@
+"""
+Incremental static gallery.
+
+Rendered cards – by default the print file of each card spec, never
+its web / social derivatives – are thumbnailed and listed on one HTML
+page laid out by styles.css (`main.grid` of `.card`s). Each card gets progressive
+JPEG and WebP thumbnails at several widths, offered through <picture> /
+`srcset` so the browser picks one for its column width, lazily loaded.
+
+Builds are incremental: manifest.json in the output folder records each
+card's content hash and thumbnails. A card whose size and mtime are
+unchanged is not even re‑hashed; one whose hash is unchanged is not
+re‑thumbnailed. Thumbnails are named after the hash, so browsers never
+see a stale one, and thumbnails of changed or removed cards are deleted.
+
+Thumbnailing decodes at reduced resolution (JPEG DCT scaling, integer
+box‑reduce otherwise, see loader.load_cropped) once at the largest width,
+steps down to each smaller width from the previous one, and runs across
+a process pool.
+"""
+
+import html
+import json
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from hashlib import sha1
+from pathlib import Path
+from urllib.parse import quote
+from PIL import Image
+from postcard.color import to_srgb
+from postcard.loader import load_cropped, source_size
+
+CARD_SUFFIXES = {".tif", ".tiff", ".jpg", ".jpeg", ".png", ".webp"}
+WIDTHS        = (320, 640, 1280)    # thumbnail widths, px
+JPEG_QUALITY  = 82
+WEBP_QUALITY  = 80
+WEBP_METHOD   = 2                   # encoder effort 0‑6; 4+ doubles the time for ~1–2 % smaller
+MANIFEST      = "manifest.json"
+THUMB_DIR     = "thumbs"
+SIZES         = "(min-width: 600px) 33vw, 100vw"
+
+
+@dataclass
+class BuildReport:
+    cards: int = 0
+    thumbnailed: int = 0
+    removed: int = 0            # stale thumbnail files deleted
+    written: list = field(default_factory=list)
+
+    def summary(self) -> str:
+        return (f"{self.cards} card(s), {self.thumbnailed} thumbnailed, "
+                f"{self.removed} stale thumbnail(s) removed")
+
+
+# ────────── discovery ────────────────────────────────────────────────────────
+
+def spec_files(path: Path, strict=True):
+    """(print file, every other file it reads or writes) for the card spec
+    at *path*; None when *path* isn't a spec and not *strict*."""
+    from postcard import spec
+    try:
+        s = spec.load(path)
+    except spec.SpecError:
+        if strict:
+            raise
+        return None
+    base   = Path(path).parent
+    others = [d.path for d in s.derivatives] + [s.cmyk.file, s.cmyk.proof, s.pdf, s.input,
+                                                s.texture.file, s.emblem.file]
+    return base / s.output, {(base / p).resolve() for p in others if p}
+
+
+def card_files(paths, exclude=None):
+    """Card images for *paths*: the print file of each card spec (.toml),
+    image files, and folders searched recursively – skipping the source
+    photos, textures and web / thumbnail / social / CMYK / proof files of
+    any spec found there."""
+    exclude = Path(exclude).resolve() if exclude else None
+    for p in map(Path, paths):
+        if p.suffix.lower() == ".toml":
+            card, _ = spec_files(p)
+            if card.is_file():
+                yield card
+        elif p.is_dir():
+            derived = set()
+            for t in p.rglob("*.toml"):
+                files = spec_files(t, strict=False)
+                if files:
+                    derived |= files[1]
+            for f in sorted(p.rglob("*")):
+                if f.suffix.lower() in CARD_SUFFIXES and not f.name.startswith(".") \
+                        and f.resolve() not in derived \
+                        and not (exclude and f.resolve().is_relative_to(exclude)):
+                    yield f
+        elif p.suffix.lower() in CARD_SUFFIXES:
+            yield p
+
+
+def file_hash(path: Path) -> str:
+    h = sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+# ────────── thumbnails ───────────────────────────────────────────────────────
+
+def thumb_widths(width: int, widths=WIDTHS):
+    """*widths* the card can fill, plus its own width if it's smaller than all."""
+    fit = [w for w in sorted(widths) if w <= width]
+    return fit or [width]
+
+
+def make_thumbs(path: Path, out_dir: Path, stem: str, widths=WIDTHS,
+                jpeg_quality=JPEG_QUALITY, webp_quality=WEBP_QUALITY):
+    """Write `<stem>-<w>.jpg/.webp` for each width; returns ((w, h), names)."""
+    w, h   = source_size(path)
+    widths = thumb_widths(w, widths)
+    top    = (widths[-1], max(1, round(h * widths[-1] / w)))
+    img    = load_cropped(path, w / h, size=top, crop_box=(0, 0, w, h))
+    img, _ = to_srgb(img)
+    img    = img.resize(top, Image.LANCZOS)
+
+    names = []
+    for tw in reversed(widths):
+        th  = max(1, round(h * tw / w))
+        img = img if (tw, th) == img.size else img.resize((tw, th), Image.LANCZOS)
+        for ext, opts in (("jpg", dict(quality=jpeg_quality, progressive=True, optimize=True)),
+                          ("webp", dict(quality=webp_quality, method=WEBP_METHOD))):
+            name = f"{stem}-{tw}.{ext}"
+            tmp  = out_dir / f".{name}.{os.getpid()}.tmp"
+            img.save(tmp, "JPEG" if ext == "jpg" else "WEBP", **opts)
+            os.replace(tmp, out_dir / name)
+            names.append(name)
+    return (w, h), names
+
+
+# ────────── page ─────────────────────────────────────────────────────────────
+
+def _srcset(entry, ext):
+    return ", ".join(f"{THUMB_DIR}/{quote(entry['stem'])}-{w}.{ext} {w}w" for w in entry["widths"])
+
+
+def render_page(title: str, entries, stylesheet: str) -> str:
+    cards = []
+    for e in entries:
+        w, h  = e["size"]
+        small = e["widths"][0]
+        name  = html.escape(Path(e["src"]).stem.replace("_", " "))
+        cards.append(f"""\
+    <div class="card">
+      <picture>
+        <source type="image/webp" srcset="{_srcset(e, 'webp')}" sizes="{SIZES}">
+        <img src="{THUMB_DIR}/{quote(e['stem'])}-{small}.jpg" srcset="{_srcset(e, 'jpg')}" sizes="{SIZES}"
+             width="{small}" height="{round(h * small / w)}" alt="{name}" loading="lazy" decoding="async">
+      </picture>
+      <p>{name}</p>
+      <a class="button" href="{html.escape(e['href'])}">Full size</a>
+    </div>""")
+    title = html.escape(title)
+    body  = "\n".join(cards)
+    return f"""\
+<!DOCTYPE html>
+<html lang="en">
+<head>
+  <meta charset="utf-8">
+  <meta name="viewport" content="width=device-width, initial-scale=1">
+  <title>{title}</title>
+  <link rel="stylesheet" href="{html.escape(stylesheet)}">
+</head>
+<body>
+  <header><h1>{title}</h1><p>{len(entries)} postcards</p></header>
+  <main class="grid">
+{body}
+  </main>
+  <footer>Generated by the postcard gallery builder</footer>
+</body>
+</html>
+"""
+
+
+def _write_if_changed(path: Path, text: str) -> bool:
+    if path.is_file() and path.read_text(encoding="utf-8") == text:
+        return False
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(text, encoding="utf-8")
+    os.replace(tmp, path)
+    return True
+
+
+# ────────── build ────────────────────────────────────────────────────────────
+
+def build(paths, out_dir: Path, title="Postcards", stylesheet=None, widths=WIDTHS,
+          jpeg_quality=JPEG_QUALITY, webp_quality=WEBP_QUALITY, workers=None) -> BuildReport:
+    """(Re)build the gallery for the cards under *paths* into *out_dir*."""
+    out_dir = Path(out_dir)
+    thumbs  = out_dir / THUMB_DIR
+    thumbs.mkdir(parents=True, exist_ok=True)
+    report  = BuildReport()
+
+    settings = {"widths": sorted(widths), "jpeg": jpeg_quality, "webp": webp_quality,
+                "webp_method": WEBP_METHOD}
+    try:
+        manifest = json.loads((out_dir / MANIFEST).read_text())
+    except (OSError, ValueError):
+        manifest = {}
+    old = manifest.get("cards", {}) if manifest.get("settings") == settings else {}
+
+    have = set(os.listdir(thumbs))
+    cards, todo = {}, []
+    for src in card_files(paths, exclude=out_dir):
+        key  = str(src.resolve())
+        st   = src.stat()
+        prev = old.get(key)
+        if prev and (prev["bytes"], prev["mtime"]) == (st.st_size, st.st_mtime_ns):
+            digest = prev["hash"]
+        else:
+            digest = file_hash(src)
+        entry = {"src": str(src), "hash": digest, "bytes": st.st_size, "mtime": st.st_mtime_ns,
+                 "stem": f"{src.stem}-{digest[:12]}",
+                 "href": quote(Path(os.path.relpath(src.resolve(), out_dir.resolve())).as_posix())}
+        if prev and prev["hash"] == digest and have.issuperset(prev["thumbs"]):
+            entry.update(size=prev["size"], widths=prev["widths"], thumbs=prev["thumbs"])
+        else:
+            todo.append(key)
+        cards[key] = entry
+    report.cards = len(cards)
+
+    args = [(cards[k]["src"], thumbs, cards[k]["stem"], widths, jpeg_quality, webp_quality)
+            for k in todo]
+    if len(args) <= 1 or workers == 1:
+        results = [make_thumbs(*a) for a in args]
+    else:
+        chunk = max(1, len(args) // (4 * (workers or os.cpu_count() or 1)))
+        with ProcessPoolExecutor(workers) as pool:
+            results = list(pool.map(make_thumbs, *zip(*args), chunksize=chunk))
+    for key, (size, names) in zip(todo, results):
+        cards[key].update(size=list(size), widths=thumb_widths(size[0], widths), thumbs=names)
+    report.thumbnailed = len(todo)
+
+    keep = {n for e in cards.values() for n in e["thumbs"]}
+    for f in thumbs.iterdir():
+        if f.name not in keep:
+            f.unlink()
+            report.removed += 1
+
+    css = "styles.css"
+    if stylesheet:
+        stylesheet = Path(stylesheet)
+        css = stylesheet.name
+        if not (out_dir / css).is_file() or (out_dir / css).read_bytes() != stylesheet.read_bytes():
+            shutil.copyfile(stylesheet, out_dir / css)
+
+    entries = sorted(cards.values(), key=lambda e: e["src"])
+    if _write_if_changed(out_dir / "index.html", render_page(title, entries, css)):
+        report.written.append(out_dir / "index.html")
+    _write_if_changed(out_dir / MANIFEST,
+                      json.dumps({"settings": settings, "cards": cards}, indent=1))
+    return report
@@ -0,0 +1,110 @@
+"""
+Glyph masks for captions.
+
+Each caption line is rasterised once with `font.getmask2` into an "L"
+coverage mask the size of its ink box. That one mask feeds the fill, the
+offset shadow, an optional Gaussian soft shadow (blurred only inside the
+text box padded by 3σ) and, via FreeType's stroker, an optional outline.
+Masks are LRU‑cached by (font, size, text, tracking[, stroke / blur]), so
+a caption repeated across a batch is rasterised once.
+"""
+
+from dataclasses import dataclass
+from functools import lru_cache
+from math import ceil
+from PIL import Image, ImageChops, ImageFilter
+from postcard import fonts, layout
+from postcard.compositor import Layer
+
+GLYPH_CACHE_SIZE = 256
+
+
+@dataclass(frozen=True)
+class TextRun:
+    """What a text layer draws, for exporters that keep text as text."""
+    text:     str
+    xy:       tuple             # draw origin (left, ascender line), px
+    font:     object
+    tracking: float = 0
+    stroke:   int = 0           # outline width, px
+    opacity:  float = 1.0
+
+
+def _wrap(core) -> Image.Image:
+    """getmask2's raw "L" core as an Image, through the public API."""
+    return Image.frombytes("L", core.size, bytes(core))
+
+
+@lru_cache(maxsize=GLYPH_CACHE_SIZE)
+def _mask(path, index, size, text, tracking, stroke):
+    """(mask, (dx, dy)) – mask offset relative to the draw origin."""
+    font = fonts.load_path(path, index, size)
+    if not tracking:
+        core, offset = font.getmask2(text, mode="L", stroke_width=stroke)
+        return _wrap(core), offset
+
+    # tracked text: one getmask2 per character, merged with `lighter`
+    parts = []
+    for ch, cx in zip(text, layout.char_offsets(font, text, tracking)):
+        if ch.isspace():
+            continue
+        core, (ox, oy) = font.getmask2(ch, mode="L", stroke_width=stroke)
+        parts.append((_wrap(core), round(cx) + ox, oy))
+    if not parts:
+        return Image.new("L", (1, 1)), (0, 0)
+    x0 = min(x for _, x, _ in parts)
+    y0 = min(y for _, _, y in parts)
+    x1 = max(x + m.width for m, x, _ in parts)
+    y1 = max(y + m.height for m, _, y in parts)
+    out = Image.new("L", (x1 - x0, y1 - y0))
+    for m, x, y in parts:
+        box = (x - x0, y - y0, x - x0 + m.width, y - y0 + m.height)
+        out.paste(ImageChops.lighter(out.crop(box), m), box[:2])
+    return out, (x0, y0)
+
+
+def glyph_mask(font, text: str, tracking: float = 0, stroke: int = 0):
+    """Cached coverage mask of *text* and its offset from the draw origin."""
+    return _mask(font.path, font.index, font.size, text, tracking, stroke)
+
+
+@lru_cache(maxsize=GLYPH_CACHE_SIZE)
+def _shadow(path, index, size, text, tracking, opacity, blur):
+    mask, (ox, oy) = _mask(path, index, size, text, tracking, 0)
+    if blur > 0:
+        pad  = ceil(3 * blur)
+        soft = Image.new("L", (mask.width + 2 * pad, mask.height + 2 * pad))
+        soft.paste(mask, (pad, pad))
+        mask = soft.filter(ImageFilter.GaussianBlur(blur))
+        ox, oy = ox - pad, oy - pad
+    if opacity < 1:
+        mask = mask.point(lambda v: round(v * opacity))
+    return mask, (ox, oy)
+
+
+def _layer(name, xy, color, mask_offset, run=None) -> Layer:
+    mask, (ox, oy) = mask_offset
+    return Layer(name, (xy[0] + ox, xy[1] + oy), tuple(color), mask, vector=run)
+
+
+def text_layer(text, xy, font, color, tracking=0) -> Layer:
+    """Fill layer for *text* drawn with its origin at *xy*."""
+    return _layer("text", xy, color, glyph_mask(font, text, tracking),
+                  TextRun(text, tuple(xy), font, tracking))
+
+
+def stroke_layer(text, xy, font, color, width: int, tracking=0) -> Layer:
+    """Outline layer (FreeType stroker); stack it under the fill."""
+    return _layer("text stroke", xy, color, glyph_mask(font, text, tracking, width),
+                  TextRun(text, tuple(xy), font, tracking, stroke=width))
+
+
+def shadow_layer(text, xy, font, color, opacity=1.0, blur: float = 0, tracking=0) -> Layer:
+    """Offset shadow at *xy*; blur > 0 gives a Gaussian soft shadow (σ px)."""
+    mo  = _shadow(font.path, font.index, font.size, text, tracking, opacity, blur)
+    run = None if blur > 0 else TextRun(text, tuple(xy), font, tracking, opacity=opacity)
+    return _layer("text shadow", xy, color, mo, run)
+
+
+def cache_info():
+    return {"masks": _mask.cache_info(), "shadows": _shadow.cache_info()}
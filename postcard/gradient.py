@@ -0,0 +1,108 @@
+"""
+Gradient masks for shadows and vignettes.
+
+Masks are "L" coverage images built from Pillow's 256×256
+`linear_gradient` / `radial_gradient` primitives: the primitive is resized
+to the target box and a 256‑entry LUT (`point()`) maps position → opacity
+through an easing curve and any number of stops. Nothing touches pixels
+from Python. Generated masks are LRU‑cached by (size, stops, curve), so a
+batch reusing one look builds each gradient once; treat them as read‑only.
+"""
+
+from functools import lru_cache
+from PIL import Image
+
+GRADIENT_CACHE_SIZE = 64
+RADIAL_EDGE = 181          # radial_gradient value at the mid‑point of an edge
+
+CURVES = {
+    "linear":      lambda t: t,
+    "ease-in":     lambda t: t * t,
+    "ease-out":    lambda t: 1 - (1 - t) * (1 - t),
+    "ease-in-out": lambda t: 3 * t * t - 2 * t * t * t,
+    "exp":         lambda t: (2 ** (6 * t) - 1) / 63,
+}
+
+DIRECTIONS = {
+    "down":  None,
+    "up":    Image.Transpose.FLIP_TOP_BOTTOM,
+    "right": Image.Transpose.ROTATE_90,
+    "left":  Image.Transpose.ROTATE_270,
+}
+
+
+# stops are ((pos 0‑1, opacity 0‑1), …) in increasing pos order
+
+def ramp(opacity: float):
+    """Stops for a plain 0 → *opacity* ramp."""
+    return ((0.0, 0.0), (1.0, opacity))
+
+
+def _interp(stops, t):
+    if t <= stops[0][0]:
+        return stops[0][1]
+    for (p0, v0), (p1, v1) in zip(stops, stops[1:]):
+        if t <= p1:
+            return v0 + (v1 - v0) * (t - p0) / ((p1 - p0) or 1)
+    return stops[-1][1]
+
+
+def _check(stops, curve):
+    stops = tuple((float(p), float(v)) for p, v in stops)
+    if not stops:
+        raise ValueError("gradient needs at least one stop")
+    if any(b[0] < a[0] for a, b in zip(stops, stops[1:])):
+        raise ValueError(f"gradient stops must be in increasing order: {stops}")
+    if curve not in CURVES:
+        raise ValueError(f"unknown gradient curve {curve!r} (choose from {', '.join(CURVES)})")
+    return stops
+
+
+def lut(stops, curve="linear", scale=255):
+    """256‑entry LUT: primitive value (0‑255, `scale` = position 1.0) → opacity."""
+    ease = CURVES[curve]
+    out = []
+    for v in range(256):
+        t = v / scale
+        e = ease(t) if t <= 1 else t
+        out.append(max(0, min(255, round(255 * _interp(stops, e)))))
+    return out
+
+
+@lru_cache(maxsize=GRADIENT_CACHE_SIZE)
+def _linear(size, stops, curve, direction):
+    w, h = size
+    turn = DIRECTIONS[direction]
+    length = h if direction in ("down", "up") else w
+    mask = Image.linear_gradient("L").crop((0, 0, 1, 256)).point(lut(stops, curve))
+    mask = mask.resize((1, length), Image.BILINEAR)
+    if turn is not None:
+        mask = mask.transpose(turn)
+    return mask.resize(size, Image.NEAREST)
+
+
+@lru_cache(maxsize=GRADIENT_CACHE_SIZE)
+def _radial(size, stops, curve):
+    mask = Image.radial_gradient("L").point(lut(stops, curve, RADIAL_EDGE))
+    return mask.resize(size, Image.BILINEAR)
+
+
+def linear(size, stops, curve="linear", direction="down") -> Image.Image:
+    """Linear mask over *size*; position 0 → 1 runs in *direction*."""
+    if direction not in DIRECTIONS:
+        raise ValueError(f"unknown gradient direction {direction!r}")
+    return _linear(tuple(size), _check(stops, curve), curve, direction)
+
+
+def radial(size, stops, curve="linear") -> Image.Image:
+    """Elliptical vignette; position 0 at the centre, 1 at the edge mid‑points."""
+    return _radial(tuple(size), _check(stops, curve), curve)
+
+
+def cache_info():
+    return {"linear": _linear.cache_info(), "radial": _radial.cache_info()}
+
+
+def cache_clear():
+    _linear.cache_clear()
+    _radial.cache_clear()
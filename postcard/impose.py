@@ -0,0 +1,254 @@
+"""
+Print‑sheet imposition.
+
+Rendered cards are ganged onto press sheets:
+• `plan` fits the most trim‑size slots (plus bleed and gap) inside the
+  sheet margins, trying the slot both ways round, and centres the grid;
+  each card is turned 90° when its orientation doesn't match the slot
+• bleed is made by mirroring the card's outer edge, so a slightly off cut
+  never shows paper
+• crop marks sit in the margin on every trim line, with registration
+  targets at the middle of each side
+• for double‑sided runs the back sheet mirrors the front about the axis
+  the sheet is turned over on ("left-right" or "top-bottom"); each back is
+  fitted to its slot as a front would be, then turned so its head ends up
+  on the same sheet edge; *back_offset* nudges the whole back side to
+  correct a press's registration error
+
+Sheets are written band by band through tiffwriter.TiffWriter: a card is
+decoded (at reduced resolution, see loader.load_cropped) only when the
+first band reaches it and dropped once the band passes its bottom edge,
+so at most one row of cards and one band of sheet are in memory.
+"""
+
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from PIL import Image, ImageDraw
+from postcard import parallel
+from postcard.color import SRGB, profile_bytes, to_srgb
+from postcard.loader import load_cropped, source_size
+from postcard.tiffwriter import TiffWriter
+
+BAND_ROWS = 256
+FLIPS     = ("left-right", "top-bottom")
+
+_TRANSPOSE = {90: Image.Transpose.ROTATE_90, 180: Image.Transpose.ROTATE_180,
+              270: Image.Transpose.ROTATE_270}
+
+
+@dataclass
+class Placement:
+    src:    object
+    trim:   tuple           # trim box on the sheet, px
+    rotate: int = 0         # degrees counter‑clockwise
+
+
+@dataclass
+class SheetLayout:
+    size:  tuple            # sheet (w, h) px
+    slot:  tuple            # trim (w, h) of every slot, as placed
+    bleed: int
+    cols:  int
+    rows:  int
+    slots: list             # trim boxes, row by row
+
+    @property
+    def per_sheet(self) -> int:
+        return len(self.slots)
+
+
+@dataclass
+class ImposeReport:
+    sheets: list = field(default_factory=list)   # output paths
+    cards: int = 0
+    seconds: float = 0.0
+    peak_bytes: int = 0                          # decoded cards + band, at most
+
+    def summary(self) -> str:
+        return (f"{self.cards} card(s) on {len(self.sheets)} sheet file(s) in "
+                f"{self.seconds:.1f}s, peak {self.peak_bytes / 2**20:.0f} MiB decoded")
+
+
+# ────────── layout ───────────────────────────────────────────────────────────
+
+def plan(sheet, card, bleed=0, gap=0, margin=0) -> SheetLayout:
+    """Most slots of *card* (trim w, h px) on *sheet*, either way round."""
+    best = None
+    for slot in (card, card[::-1]):
+        pw, ph = slot[0] + 2 * bleed + gap, slot[1] + 2 * bleed + gap
+        cols = max(0, (sheet[0] - 2 * margin + gap) // pw)
+        rows = max(0, (sheet[1] - 2 * margin + gap) // ph)
+        if best is None or cols * rows > best[0] * best[1]:
+            best = cols, rows, slot
+    cols, rows, slot = best
+    if not cols * rows:
+        raise ValueError("the card does not fit on the sheet inside the margins")
+
+    pw, ph = slot[0] + 2 * bleed + gap, slot[1] + 2 * bleed + gap
+    x0 = (sheet[0] - (cols * pw - gap)) // 2 + bleed
+    y0 = (sheet[1] - (rows * ph - gap)) // 2 + bleed
+    slots = [(x0 + c * pw, y0 + r * ph, x0 + c * pw + slot[0], y0 + r * ph + slot[1])
+             for r in range(rows) for c in range(cols)]
+    return SheetLayout(tuple(sheet), tuple(slot), bleed, cols, rows, slots)
+
+
+def fit_rotation(src_size, slot) -> int:
+    """0, or 90 when the card's orientation doesn't match the slot's."""
+    return 0 if (src_size[0] >= src_size[1]) == (slot[0] >= slot[1]) else 90
+
+
+def turn_over(p: Placement, sheet, flip="left-right", offset=(0, 0)) -> Placement:
+    """*p* as placed on the other side of the sheet, head to the same edge."""
+    x0, y0, x1, y1 = p.trim
+    W, H = sheet
+    dx, dy = offset
+    if flip == "left-right":
+        box, rot = (W - x1, y0, W - x0, y1), -p.rotate % 360
+    elif flip == "top-bottom":
+        box, rot = (x0, H - y1, x1, H - y0), (180 - p.rotate) % 360
+    else:
+        raise ValueError(f"flip must be one of {FLIPS}")
+    return Placement(p.src, (box[0] + dx, box[1] + dy, box[2] + dx, box[3] + dy), rot)
+
+
+def crop_marks(trims, bleed, sheet, length, offset, reg_size=0):
+    """Line segments for crop marks on every trim line, outside the bleed,
+    plus registration targets as (cx, cy, r) between grid and sheet edge."""
+    left   = min(b[0] for b in trims) - bleed
+    top    = min(b[1] for b in trims) - bleed
+    right  = max(b[2] for b in trims) + bleed
+    bottom = max(b[3] for b in trims) + bleed
+    lines  = []
+    for x in sorted({b[0] for b in trims} | {b[2] for b in trims}):
+        lines.append((x, top - offset - length, x, top - offset))
+        lines.append((x, bottom + offset, x, bottom + offset + length))
+    for y in sorted({b[1] for b in trims} | {b[3] for b in trims}):
+        lines.append((left - offset - length, y, left - offset, y))
+        lines.append((right + offset, y, right + offset + length, y))
+
+    targets = []
+    if reg_size:
+        cx, cy = (left + right) // 2, (top + bottom) // 2
+        for x, y, room in ((left // 2, cy, left), ((right + sheet[0]) // 2, cy, sheet[0] - right),
+                           (cx, top // 2, top), (cx, (bottom + sheet[1]) // 2, sheet[1] - bottom)):
+            if room >= 2 * reg_size + offset:
+                targets.append((x, y, reg_size))
+    return lines, targets
+
+
+# ────────── cards ────────────────────────────────────────────────────────────
+
+def add_bleed(img: Image.Image, bleed: int) -> Image.Image:
+    """*img* grown by *bleed* px a side with its edges mirrored outwards."""
+    if bleed <= 0:
+        return img
+    w, h = img.size
+    b    = min(bleed, w, h)
+    W    = w + 2 * bleed
+    lr, tb = Image.Transpose.FLIP_LEFT_RIGHT, Image.Transpose.FLIP_TOP_BOTTOM
+    out  = Image.new("RGB", (W, h + 2 * bleed))
+    out.paste(img, (bleed, bleed))
+    out.paste(img.crop((0, 0, b, h)).transpose(lr), (bleed - b, bleed))
+    out.paste(img.crop((w - b, 0, w, h)).transpose(lr), (w + bleed, bleed))
+    out.paste(out.crop((0, bleed, W, bleed + b)).transpose(tb), (0, bleed - b))
+    out.paste(out.crop((0, h + bleed - b, W, h + bleed)).transpose(tb), (0, h + bleed))
+    return out
+
+
+def prepare(p: Placement, bleed: int) -> Image.Image:
+    """The card for *p*: sRGB, turned, at trim size, with bleed."""
+    tw, th = p.trim[2] - p.trim[0], p.trim[3] - p.trim[1]
+    size   = (th, tw) if p.rotate in (90, 270) else (tw, th)
+    img    = load_cropped(p.src, size[0] / size[1], size=size)
+    img, _ = to_srgb(img)
+    if img.size != size:
+        img = img.resize(size, Image.LANCZOS)
+    if p.rotate:
+        img = img.transpose(_TRANSPOSE[p.rotate])
+    return add_bleed(img, bleed)
+
+
+# ────────── output ───────────────────────────────────────────────────────────
+
+def write_sheet(path, size, placements, bleed, marks=((), ()), dpi=300, icc=None,
+                compression="deflate", paper=(255, 255, 255), mark_width=1,
+                band_rows=BAND_ROWS) -> int:
+    """Stream one sheet to *path*; returns the peak bytes held decoded."""
+    lines, targets = marks
+    loaded, peak = {}, 0
+    with TiffWriter(path, size, dpi, icc, compression) as out:
+        for y0 in range(0, size[1], band_rows):
+            y1   = min(y0 + band_rows, size[1])
+            band = Image.new("RGB", (size[0], y1 - y0), paper)
+            need = [i for i, p in enumerate(placements)
+                    if i not in loaded and p.trim[1] - bleed < y1 and p.trim[3] + bleed > y0]
+            for i, img in zip(need, parallel.run(lambda i: prepare(placements[i], bleed), need)):
+                loaded[i] = img
+            peak = max(peak, band.width * band.height * 3
+                       + sum(im.width * im.height * 3 for im in loaded.values()))
+
+            for i, img in loaded.items():
+                x, y = placements[i].trim[:2]
+                band.paste(img, (x - bleed, y - bleed - y0))
+            draw = ImageDraw.Draw(band)
+            for x_a, y_a, x_b, y_b in lines:
+                if min(y_a, y_b) < y1 and max(y_a, y_b) >= y0:
+                    draw.line((x_a, y_a - y0, x_b, y_b - y0), fill=(0, 0, 0), width=mark_width)
+            for cx, cy, r in targets:
+                if cy - r < y1 and cy + r >= y0:
+                    draw.ellipse((cx - r // 2, cy - r // 2 - y0, cx + r // 2, cy + r // 2 - y0),
+                                 outline=(0, 0, 0), width=mark_width)
+                    draw.line((cx - r, cy - y0, cx + r, cy - y0), fill=(0, 0, 0), width=mark_width)
+                    draw.line((cx, cy - r - y0, cx, cy + r - y0), fill=(0, 0, 0), width=mark_width)
+            out.write(band)
+
+            for i in [i for i in loaded if placements[i].trim[3] + bleed <= y1]:
+                del loaded[i]
+    return peak
+
+
+def impose(cards, out_path, sheet, card, dpi=300, bleed=0, gap=0, margin=0,
+           backs=None, flip="left-right", back_offset=(0, 0), mark_length=0,
+           mark_offset=0, compression="deflate", paper=(255, 255, 255)) -> ImposeReport:
+    """
+    Gang *cards* onto as many sheets as needed; sizes are in px. *backs*
+    is None, one path for every card, or a list matching *cards*. Files are
+    `<stem>-NN-front/back<suffix>` (just *out_path* for a single one‑sided
+    sheet).
+    """
+    t0     = time.perf_counter()
+    out    = Path(out_path)
+    layout = plan(sheet, card, bleed, gap, margin)
+    if backs is not None and not isinstance(backs, (list, tuple)):
+        backs = [backs] * len(cards)
+    if backs is not None and len(backs) != len(cards):
+        raise ValueError(f"{len(backs)} backs for {len(cards)} cards")
+
+    icc    = profile_bytes(SRGB)
+    width  = max(1, round(dpi * 0.5 / 72))                  # ½ pt hairline
+    report = ImposeReport(cards=len(cards))
+    n      = layout.per_sheet
+    chunks = [range(i, min(i + n, len(cards))) for i in range(0, len(cards), n)]
+    single = len(chunks) == 1 and backs is None
+
+    for k, idx in enumerate(chunks, 1):
+        front = [Placement(cards[i], layout.slots[j],
+                           fit_rotation(source_size(cards[i]), layout.slot))
+                 for j, i in enumerate(idx)]
+        sides = [("front", front)]
+        if backs is not None:
+            sides.append(("back", [
+                turn_over(Placement(backs[i], p.trim, fit_rotation(source_size(backs[i]), layout.slot)),
+                          layout.size, flip, back_offset)
+                for p, i in zip(front, idx)]))
+        for side, placements in sides:
+            marks = crop_marks([p.trim for p in placements], bleed, layout.size,
+                               mark_length, mark_offset, reg_size=mark_length // 2)
+            path  = out if single else out.with_name(f"{out.stem}-{k:02d}-{side}{out.suffix}")
+            peak  = write_sheet(path, layout.size, placements, bleed, marks, dpi, icc,
+                                compression, paper, width)
+            report.peak_bytes = max(report.peak_bytes, peak)
+            report.sheets.append(path)
+    report.seconds = time.perf_counter() - t0
+    return report
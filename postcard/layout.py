@@ -0,0 +1,221 @@
+"""
+Caption layout.
+
+Lines are measured once at REF_SIZE; glyph metrics scale linearly with
+the pixel size, so the auto‑fit size is *predicted* from those numbers and
+only confirmed with one or two exact measurements (vs. ~10 font loads and
+2 × lines `textbbox` calls per step for a 6‥600 binary search).
+Measurements are cached by (font, size, text, tracking).
+
+Also handles greedy/balanced word wrapping, tracking (letter spacing, in
+1/1000 em) and per‑line (dx, dy) offsets.
+"""
+
+from dataclasses import dataclass, field
+from functools import lru_cache
+from postcard import fonts
+
+REF_SIZE     = 100
+LINE_SPACING = 0.15    # extra leading, fraction of the font size
+MIN_SIZE, MAX_SIZE = 6, 600
+MEASURE_CACHE_SIZE = 4096
+
+
+@dataclass
+class PlacedLine:
+    text:  str
+    x:     int
+    y:     int
+    width: int
+    height: int
+
+
+@dataclass
+class Caption:
+    font:     object
+    tracking: float
+    lines:    list = field(default_factory=list)
+
+    @property
+    def size(self):
+        return self.font.size
+
+    @property
+    def box(self):
+        return (min(l.x for l in self.lines), min(l.y for l in self.lines),
+                max(l.x + l.width for l in self.lines), max(l.y + l.height for l in self.lines))
+
+
+def tracking_px(font, tracking: float) -> float:
+    return font.size * tracking / 1000
+
+
+@lru_cache(maxsize=MEASURE_CACHE_SIZE)
+def _measure(path, index, size, text, tracking):
+    font = fonts.load_path(path, index, size)
+    x0, y0, x1, y1 = font.getbbox(text)
+    extra = tracking_px(font, tracking) * max(len(text) - 1, 0)
+    return x0, y0, x1 + round(extra), y1
+
+
+def measure(font, text: str, tracking: float = 0):
+    """Cached `getbbox` (widened by tracking) for a catalog‑loaded font."""
+    return _measure(font.path, font.index, font.size, text, tracking)
+
+
+def text_size(font, text: str, tracking: float = 0):
+    x0, y0, x1, y1 = measure(font, text, tracking)
+    return x1 - x0, y1 - y0
+
+
+def line_height(font) -> int:
+    return measure(font, "Hg")[3]
+
+
+def block_height(font, n: int, spacing: float = LINE_SPACING) -> int:
+    return int(n * line_height(font) + (n - 1) * spacing * font.size)
+
+
+def char_offsets(font, text: str, tracking: float = 0):
+    """x of each character when drawn one by one (keeps kerning via prefixes)."""
+    extra = tracking_px(font, tracking)
+    return [font.getlength(text[:i]) + i * extra for i in range(len(text))]
+
+
+# ────────── wrapping ─────────────────────────────────────────────────────────
+
+def _greedy(words, widths, space, max_w):
+    lines, cur, cur_w = [], [], 0.0
+    for word, w in zip(words, widths):
+        add = w if not cur else cur_w + space + w
+        if cur and add > max_w:
+            lines.append(" ".join(cur))
+            cur, cur_w = [word], w
+        else:
+            cur, cur_w = cur + [word], add
+    if cur:
+        lines.append(" ".join(cur))
+    return lines
+
+
+def wrap(font, text: str, max_w: float, tracking: float = 0):
+    """Greedy word wrap of *text* so every line fits *max_w* at *font*'s size."""
+    words  = text.split()
+    widths = [text_size(font, w, tracking)[0] for w in words]
+    return _greedy(words, widths, font.getlength(" "), max_w)
+
+
+def balanced_wraps(font, text: str, max_lines: int, tracking: float = 0):
+    """{n: lines} – the narrowest greedy wrap into n lines, for n = 1‥max_lines."""
+    words  = text.split()
+    widths = [text_size(font, w, tracking)[0] for w in words]
+    space  = font.getlength(" ")
+    out = {}
+    lo, hi = max(widths, default=0), sum(widths) + space * max(len(words) - 1, 0)
+    for n in range(1, min(max_lines, len(words)) + 1):
+        a, b = lo, hi
+        while b - a > 1:                       # narrowest width giving ≤ n lines
+            mid = (a + b) / 2
+            if len(_greedy(words, widths, space, mid)) <= n:
+                b = mid
+            else:
+                a = mid
+        out[n] = _greedy(words, widths, space, b)
+    return out
+
+
+# ────────── fitting ──────────────────────────────────────────────────────────
+
+def fits(face, size: int, lines, max_w, max_h, tracking=0, spacing=LINE_SPACING):
+    font = fonts.load(face, size)
+    return (max((text_size(font, l, tracking)[0] for l in lines), default=0) <= max_w
+            and block_height(font, len(lines), spacing) <= max_h)
+
+
+def fit_size(face, lines, max_w, max_h, tracking=0, spacing=LINE_SPACING,
+             lo=MIN_SIZE, hi=MAX_SIZE) -> int:
+    """Largest size in [lo, hi] at which *lines* fit max_w × max_h."""
+    if not lines:
+        return hi                       # nothing to fit (wrapped away, or no caption)
+    ref = fonts.load(face, REF_SIZE)
+    w   = max((text_size(ref, l, tracking)[0] for l in lines), default=0) or 1
+    h   = len(lines) * line_height(ref) / REF_SIZE + (len(lines) - 1) * spacing
+    size = int(min(max_w * REF_SIZE / w, max_h / h))
+    size = max(lo, min(hi, size))
+    while size > lo and not fits(face, size, lines, max_w, max_h, tracking, spacing):
+        size -= 1
+    while size < hi and fits(face, size + 1, lines, max_w, max_h, tracking, spacing):
+        size += 1
+    return size
+
+
+def fit_wrapped(face, text: str, max_w, max_h, max_lines=3, tracking=0,
+                spacing=LINE_SPACING):
+    """Best (size, lines) over wrapping *text* into 1‥max_lines lines."""
+    ref  = fonts.load(face, REF_SIZE)
+    best = None
+    for lines in balanced_wraps(ref, text, max_lines, tracking).values():
+        size = fit_size(face, lines, max_w, max_h, tracking, spacing)
+        if best is None or size > best[0]:
+            best = size, lines
+    return best or (fit_size(face, [], max_w, max_h, tracking, spacing), [])
+
+
+# ────────── placement ────────────────────────────────────────────────────────
+
+def scale_offsets(offsets, k: float):
+    """Per‑line dx / (dx, dy) offsets scaled by *k* and rounded to pixels."""
+    return [tuple(round(v * k) for v in o) if isinstance(o, (tuple, list)) else round(o * k)
+            for o in offsets]
+
+
+def layout_caption(face, lines, canvas_size, border_px=0, *, size=None,
+                   fit_box=None, pos="bottom", align="center", offset=0,
+                   line_offsets=(), tracking=0, wrap_width=None, max_lines=3,
+                   spacing=LINE_SPACING) -> Caption:
+    """
+    Size and place caption *lines* on a canvas.
+
+    size=None auto‑fits into *fit_box* (max_w, max_h). With *wrap_width* the
+    lines are joined and re‑wrapped (balanced when auto‑fitting). *offset*
+    moves the block up (bottom) / down (top); *line_offsets* are per‑line
+    dx or (dx, dy).
+    """
+    W, H = canvas_size
+    if isinstance(lines, str):
+        lines = [lines]
+
+    auto = size is None
+    if auto:
+        max_w, max_h = fit_box
+        if wrap_width:
+            size, lines = fit_wrapped(face, " ".join(lines), min(max_w, wrap_width),
+                                      max_h, max_lines, tracking, spacing)
+        else:
+            size = fit_size(face, lines, max_w, max_h, tracking, spacing)
+    font = fonts.load(face, size)
+    if wrap_width and not auto:
+        lines = wrap(font, " ".join(lines), wrap_width, tracking)
+
+    if pos == "bottom":
+        ty = H - border_px - block_height(font, len(lines), spacing) + offset
+    else:
+        ty = border_px + offset
+
+    cap = Caption(font, tracking)
+    advance = int(line_height(font) + spacing * font.size)
+    for i, line in enumerate(lines):
+        dx, dy = 0, 0
+        if i < len(line_offsets):
+            off = line_offsets[i]
+            dx, dy = off if isinstance(off, (tuple, list)) else (off, 0)
+        tw, th = text_size(font, line, tracking)
+        if align == "center":
+            tx = (W - tw) // 2 + dx
+        elif align == "right":
+            tx = W - border_px - tw + dx
+        else:
+            tx = border_px + dx
+        cap.lines.append(PlacedLine(line, tx, ty + dy, tw, th))
+        ty += advance
+    return cap
@@ -0,0 +1,140 @@
+"""
+Reduced‑resolution source loading.
+
+The crop box and output pixel size are worked out *before* decoding, so:
+• JPEGs are decoded at the largest DCT scale (1/2, 1/4, 1/8) that still
+  covers REDUCING_GAP× the output size (`Image.draft`)
+• other formats are box‑reduced by an integer factor inside the crop box,
+  keeping the same REDUCING_GAP× headroom for the final LANCZOS pass
+• the crop happens in the file's stored orientation and only the cropped
+  region is transposed by the EXIF orientation tag
+"""
+
+from math import ceil
+from pathlib import Path
+from PIL import Image
+from postcard.resample import REDUCING_GAP
+
+ORIENTATION_TAG = 0x0112
+
+# EXIF orientation → transpose that brings the stored pixels upright
+_TRANSPOSE = {
+    2: Image.Transpose.FLIP_LEFT_RIGHT,
+    3: Image.Transpose.ROTATE_180,
+    4: Image.Transpose.FLIP_TOP_BOTTOM,
+    5: Image.Transpose.TRANSPOSE,
+    6: Image.Transpose.ROTATE_270,
+    7: Image.Transpose.TRANSVERSE,
+    8: Image.Transpose.ROTATE_90,
+}
+
+
+def center_crop_box(size, ratio):
+    """Largest centred box of aspect *ratio* (w/h) inside *size*, as ints."""
+    w, h = size
+    if w / h > ratio:
+        nw   = int(h * ratio)
+        left = 0.5 * (w - nw)
+        return round(left), 0, round(left + nw), h
+    nh  = int(w / ratio)
+    top = 0.5 * (h - nh)
+    return 0, round(top), w, round(top + nh)
+
+
+def upright_size(size, orientation):
+    w, h = size
+    return (h, w) if orientation in (5, 6, 7, 8) else (w, h)
+
+
+def stored_box(box, size, orientation):
+    """Map a box in upright coords to the stored (pre‑transpose) pixel grid."""
+    x0, y0, x1, y1 = box
+    W, H = size
+    return {
+        1: (x0, y0, x1, y1),
+        2: (W - x1, y0, W - x0, y1),
+        3: (W - x1, H - y1, W - x0, H - y0),
+        4: (x0, H - y1, x1, H - y0),
+        5: (y0, x0, y1, x1),
+        6: (y0, H - x1, y1, H - x0),
+        7: (W - y1, H - x1, W - y0, H - x0),
+        8: (W - y1, x0, W - y0, x1),
+    }[orientation]
+
+
+def source_size(path: Path):
+    """Full‑resolution upright size of the image (reads the header only)."""
+    with Image.open(path) as im:
+        return upright_size(im.size, im.getexif().get(ORIENTATION_TAG, 1))
+
+
+def crop_size(path: Path, ratio: float, crop_box=None):
+    """Full‑resolution upright size of the crop (reads the header only)."""
+    if crop_box:
+        return crop_box[2] - crop_box[0], crop_box[3] - crop_box[1]
+    with Image.open(path) as im:
+        orientation = im.getexif().get(ORIENTATION_TAG, 1)
+        x0, y0, x1, y1 = center_crop_box(upright_size(im.size, orientation), ratio)
+    return x1 - x0, y1 - y0
+
+
+def load_cropped(path: Path, ratio: float, size=None, crop_box=None):
+    """
+    Open *path* and return the upright crop of aspect *ratio*.
+
+    *size* is the final (w, h) the crop will be resampled to; when given the
+    decoder is allowed to drop resolution as long as the crop still covers
+    REDUCING_GAP× that. *crop_box* overrides the centred crop (upright, full‑res coords).
+    The source `icc_profile` is kept in `.info`.
+    """
+    with Image.open(path) as im:
+        orientation = im.getexif().get(ORIENTATION_TAG, 1)
+        if orientation not in _TRANSPOSE:
+            orientation = 1
+
+        full = im.size
+        box  = crop_box or center_crop_box(upright_size(full, orientation), ratio)
+        box  = stored_box(box, full, orientation)
+        cw, ch = box[2] - box[0], box[3] - box[1]
+
+        if size:
+            tw, th = upright_size(size, orientation)
+            gap    = REDUCING_GAP
+            if im.format == "JPEG":
+                im.draft(im.mode, (ceil(full[0] * gap * tw / cw), ceil(full[1] * gap * th / ch)))
+                sx, sy = im.size[0] / full[0], im.size[1] / full[1]
+                box = (box[0] * sx, box[1] * sy, box[2] * sx, box[3] * sy)
+                out = im.crop(box)
+            else:
+                factor = int(min(cw / tw, ch / th) / gap)
+                if factor >= 2:
+                    out = im.reduce(factor, box)
+                else:
+                    out = im.crop(box)
+        else:
+            out = im.crop(box)
+
+        if orientation != 1:
+            out = out.transpose(_TRANSPOSE[orientation])
+        out.load()                      # independent of the file, which closes here
+    return out
+
+
+def load_proxy(path: Path, max_side: int):
+    """
+    Small upright RGB preview (longest side ≤ *max_side*) and the upright
+    full‑resolution size. JPEGs are decoded at 1/8 scale where possible.
+    """
+    with Image.open(path) as im:
+        orientation = im.getexif().get(ORIENTATION_TAG, 1)
+        if orientation not in _TRANSPOSE:
+            orientation = 1
+        full = im.size
+        k    = min(1.0, max_side / max(full))
+        size = (max(1, round(full[0] * k)), max(1, round(full[1] * k)))
+        if im.format == "JPEG":
+            im.draft("RGB", size)
+        out = im.convert("RGB").resize(size, Image.BOX)
+    if orientation != 1:
+        out = out.transpose(_TRANSPOSE[orientation])
+    return out, upright_size(full, orientation)
@@ -0,0 +1,140 @@
+"""
+Automatic shadow and caption colours.
+
+The caption / shadow band of the (cropped, sRGB) photo is shrunk to a
+THUMB_SIZE thumbnail and median‑cut quantised to a few colours; the
+histogram (`getcolors`) gives the band's dominant colour and the whole
+photo's thumbnail gives the accents:
+• shadow  – the band's dominant hue, deepened to SHADOW_VALUE
+• caption – the most saturated photo colour, tinted towards white (or
+  shaded towards black) just far enough to reach *min_contrast* (WCAG
+  ratio) against the band as it looks under the shadow
+
+Results are memoised per source file hash (+ crop and options) in memory
+and in CACHE_DIR/palettes.json, so re‑renders skip the analysis.
+"""
+
+import colorsys
+import json
+import os
+from pathlib import Path
+from PIL import Image, ImageStat
+from postcard import CACHE_DIR
+from postcard.stagecache import file_digest
+
+PALETTE_FILE   = CACHE_DIR / "palettes.json"
+PALETTE_COLORS = 6
+THUMB_SIZE     = 64
+SHADOW_VALUE   = 0.28      # HSV value of the picked shadow colour
+MIN_CONTRAST   = 3.0       # WCAG ratio for large text
+TINT_STEPS     = 20
+
+_memo = None
+
+
+# ────────── colour maths ─────────────────────────────────────────────────────
+
+def luminance(rgb) -> float:
+    """WCAG relative luminance of an sRGB colour."""
+    def lin(c):
+        c /= 255
+        return c / 12.92 if c <= 0.04045 else ((c + 0.055) / 1.055) ** 2.4
+    r, g, b = (lin(c) for c in rgb)
+    return 0.2126 * r + 0.7152 * g + 0.0722 * b
+
+
+def contrast(a, b) -> float:
+    la, lb = sorted((luminance(a), luminance(b)), reverse=True)
+    return (la + 0.05) / (lb + 0.05)
+
+
+def mix(a, b, t: float):
+    return tuple(round(x + (y - x) * t) for x, y in zip(a, b))
+
+
+# ────────── analysis ─────────────────────────────────────────────────────────
+
+def _thumb(img: Image.Image, box=None) -> Image.Image:
+    region = img.convert("RGB").crop(box) if box else img.convert("RGB")
+    region.thumbnail((THUMB_SIZE, THUMB_SIZE), Image.BOX)
+    return region
+
+
+def dominant(img: Image.Image, colors=PALETTE_COLORS):
+    """[(count, rgb), …] most common first, from a median‑cut quantise."""
+    q   = img.quantize(colors, Image.Quantize.MEDIANCUT)
+    pal = q.getpalette()
+    return sorted(((n, tuple(pal[3 * i:3 * i + 3])) for n, i in q.getcolors()), reverse=True)
+
+
+def shadow_for(band_colors):
+    """Band's dominant hue, slightly richer, at SHADOW_VALUE."""
+    r, g, b = band_colors[0][1]
+    h, s, _ = colorsys.rgb_to_hsv(r / 255, g / 255, b / 255)
+    return tuple(round(c * 255) for c in colorsys.hsv_to_rgb(h, min(1.0, s * 1.25),
+                                                             SHADOW_VALUE))
+
+
+def caption_for(photo_colors, background, min_contrast=MIN_CONTRAST):
+    """Least‑altered photo accent reaching *min_contrast* on *background*."""
+    def saturation(rgb):
+        return colorsys.rgb_to_hsv(*(c / 255 for c in rgb))[1]
+
+    accents = sorted((rgb for _, rgb in photo_colors), key=saturation, reverse=True)
+    target  = (255, 255, 255) if luminance(background) < 0.18 else (0, 0, 0)
+    for step in range(TINT_STEPS + 1):
+        for rgb in accents:
+            cand = mix(rgb, target, step / TINT_STEPS)
+            if contrast(cand, background) >= min_contrast:
+                return cand
+    return target
+
+
+def analyse(photo: Image.Image, pos="bottom", band=0.45, shade=0.0,
+            min_contrast=MIN_CONTRAST):
+    """(shadow_rgb, caption_rgb) for *photo*; *band* is the fraction of the
+    height at *pos*, *shade* the shadow opacity over the caption."""
+    w, h = photo.size
+    bh   = max(1, int(h * band))
+    box  = (0, h - bh, w, h) if pos == "bottom" else (0, 0, w, bh)
+    thumb = _thumb(photo, box)
+    band_colors = dominant(thumb)
+    shadow = shadow_for(band_colors)
+    mean   = tuple(round(c) for c in ImageStat.Stat(thumb).mean)
+    caption = caption_for(dominant(_thumb(photo)), mix(mean, shadow, shade), min_contrast)
+    return shadow, caption
+
+
+# ────────── memo ─────────────────────────────────────────────────────────────
+
+def _load_memo():
+    global _memo
+    if _memo is None:
+        try:
+            _memo = json.loads(PALETTE_FILE.read_text())
+        except (OSError, ValueError):
+            _memo = {}
+    return _memo
+
+
+def _save_memo(memo):
+    try:
+        PALETTE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        tmp = PALETTE_FILE.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(memo))
+        os.replace(tmp, PALETTE_FILE)
+    except OSError:
+        pass  # only a cache
+
+
+def auto(photo, source: Path, crop=None, pos="bottom", band=0.45, shade=0.0,
+         min_contrast=MIN_CONTRAST):
+    """`analyse`, memoised by the hash of *source* plus *crop* and options."""
+    key  = f"{file_digest(source)}:{crop}:{pos}:{band}:{shade}:{min_contrast}"
+    memo = _load_memo()
+    if key not in memo:
+        shadow, caption = analyse(photo, pos, band, shade, min_contrast)
+        memo[key] = {"shadow": shadow, "caption": caption}
+        _save_memo(memo)
+    hit = memo[key]
+    return tuple(hit["shadow"]), tuple(hit["caption"])
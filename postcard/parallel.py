@@ -0,0 +1,120 @@
+"""
+Strip‑parallel pixel stages.
+
+Pillow drops the GIL inside its C loops (resample, reduce, paste, filters,
+LittleCMS transforms), so one large render can be cut into horizontal
+strips and run on a thread pool. Filters with a support radius get `halo`
+extra rows above and below each strip, trimmed before stitching, so strip
+edges never show as seams. Resizes use `resize(box=…)`, which samples the
+full source around each strip and is therefore seam‑free by construction.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from PIL import Image
+
+MIN_STRIP_PIXELS = 256 * 1024   # smaller strips aren't worth a thread hop
+
+_lock    = Lock()
+_pool    = None
+_workers = os.cpu_count() or 1
+
+
+def set_workers(n=None):
+    """Use *n* threads for strip work (None = every core, 1 = serial)."""
+    global _pool, _workers
+    with _lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True)
+            _pool = None
+        _workers = max(1, n or os.cpu_count() or 1)
+
+
+def workers() -> int:
+    return _workers
+
+
+def _executor() -> ThreadPoolExecutor:
+    global _pool
+    with _lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(_workers, thread_name_prefix="strip")
+        return _pool
+
+
+def run(fn, items) -> list:
+    """`map(fn, items)` on the strip pool (inline when there's nothing to split)."""
+    items = list(items)
+    if len(items) <= 1 or _workers <= 1:
+        return [fn(i) for i in items]
+    return list(_executor().map(fn, items))
+
+
+def strip_bounds(height: int, width: int, align: int = 1):
+    """Split *height* rows into ≤ workers() strips of ≥ MIN_STRIP_PIXELS each."""
+    if height <= 0:
+        return []
+    n = min(_workers, height, max(1, width * height // MIN_STRIP_PIXELS))
+    step = -(-height // max(n, 1))
+    step = -(-step // align) * align
+    return [(y, min(y + step, height)) for y in range(0, height, step)]
+
+
+def map_strips(img: Image.Image, fn, halo: int = 0) -> Image.Image:
+    """Apply a size‑preserving *fn* to horizontal strips of *img* and stitch."""
+    bounds = strip_bounds(img.height, img.width)
+    if len(bounds) <= 1:
+        return fn(img)
+    img.load()
+
+    def one(rows):
+        y0, y1 = rows
+        top = max(y0 - halo, 0)
+        out = fn(img.crop((0, top, img.width, min(y1 + halo, img.height))))
+        return out.crop((0, y0 - top, out.width, y1 - top)) if halo else out
+
+    parts = run(one, bounds)
+    out = Image.new(parts[0].mode, img.size)
+    for (y0, _), part in zip(bounds, parts):
+        out.paste(part, (0, y0))
+    out.info = dict(img.info)
+    return out
+
+
+def resize(img: Image.Image, size, resample=Image.LANCZOS) -> Image.Image:
+    """`img.resize(size, resample)` computed in output strips."""
+    tw, th = size
+    bounds = strip_bounds(th, tw)
+    if len(bounds) <= 1:
+        return img.resize(size, resample)
+    img.load()
+    sy = img.height / th
+
+    def one(rows):
+        y0, y1 = rows
+        return img.resize((tw, y1 - y0), resample, box=(0, y0 * sy, img.width, y1 * sy))
+
+    out = Image.new(img.mode, size)
+    for (y0, _), part in zip(bounds, run(one, bounds)):
+        out.paste(part, (0, y0))
+    return out
+
+
+def reduce(img: Image.Image, factor: int) -> Image.Image:
+    """`img.reduce(factor)` computed in output strips."""
+    w, h = -(-img.width // factor), -(-img.height // factor)
+    bounds = strip_bounds(h, w)
+    if len(bounds) <= 1:
+        return img.reduce(factor)
+    img.load()
+
+    def one(rows):
+        y0, y1 = rows
+        return img.reduce(factor, (0, y0 * factor, img.width, min(y1 * factor, img.height)))
+
+    out = Image.new(img.mode, (w, h))
+    for (y0, _), part in zip(bounds, run(one, bounds)):
+        out.paste(part, (0, y0))
+    return out
+
@@ -0,0 +1,395 @@
+"""
+PDF print export.
+
+A card's compositor layers are written as PDF drawing operations instead
+of being flattened into pixels:
+• photo – when the source is a plain JPEG (RGB or grey, upright, no
+  sharpening) its bytes are embedded as‑is (DCTDecode, with the source
+  ICC profile) and the crop is a clip path, so nothing is decoded or
+  re‑encoded; otherwise the processed photo is JPEG‑compressed once
+• captions – real text in the caption font, embedded as a CID font
+  (TrueType outlines subset to the glyphs used, CFF fonts whole); every
+  glyph is placed where the raster path puts it, tracking and kerning
+  included, and strokes / hard shadows stay vector too
+• gradients, emblems – a colour with the layer's mask as a soft mask;
+  paper texture – a grey image drawn with the matching blend mode
+  (Multiply, Overlay, SoftLight) at the texture strength
+
+Images, soft masks, ICC profiles and fonts are stored once per document,
+keyed by content hash, so in a multi‑card PDF a shared texture, emblem or
+gradient is one XObject that every page references. Pages carry a
+TrimBox and the document an sRGB output intent, PDF/X style.
+"""
+
+import os
+import zlib
+from dataclasses import dataclass
+from hashlib import sha1
+from io import BytesIO
+from pathlib import Path
+from PIL import Image
+from postcard import layout, sfnt
+from postcard.color import SRGB, profile_bytes
+from postcard.glyphs import TextRun
+from postcard.loader import ORIENTATION_TAG, center_crop_box
+
+PDF_VERSION      = "1.6"
+PDF_JPEG_QUALITY = 92          # photo / texture when they must be re‑encoded
+DCT_LAYERS       = ("photo", "texture")
+BLEND_MODES      = {"multiply": "Multiply", "overlay": "Overlay", "soft-light": "SoftLight"}
+
+
+class Name(str):
+    pass
+
+
+class Ref(int):
+    pass
+
+
+def _pdf(v) -> bytes:
+    """Serialise a Python value as a PDF object."""
+    if v is None:
+        return b"null"
+    if isinstance(v, bool):
+        return b"true" if v else b"false"
+    if isinstance(v, Ref):
+        return b"%d 0 R" % v
+    if isinstance(v, Name):
+        return b"/" + v.encode("ascii")
+    if isinstance(v, int):
+        return b"%d" % v
+    if isinstance(v, float):
+        return (b"%.4f" % v).rstrip(b"0").rstrip(b".") or b"0"
+    if isinstance(v, str):
+        s = v.encode("latin-1", "replace")
+        return b"(" + s.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)") + b")"
+    if isinstance(v, bytes):
+        return b"<" + v.hex().encode() + b">"
+    if isinstance(v, (list, tuple)):
+        return b"[" + b" ".join(map(_pdf, v)) + b"]"
+    if isinstance(v, dict):
+        return b"<<" + b"".join(b"/" + k.encode() + b" " + _pdf(x) for k, x in v.items()) + b">>"
+    raise TypeError(f"can't write {type(v).__name__} to PDF")
+
+
+def _num(v: float) -> str:
+    return _pdf(float(v)).decode()
+
+
+@dataclass(frozen=True)
+class PhotoSource:
+    """Photo layer drawn straight from a JPEG file, clipped to *box*."""
+    path: str
+    box:  tuple             # crop box in the file's pixels
+
+
+def passthrough(path: Path, ratio: float, crop_box=None):
+    """PhotoSource for *path* if its JPEG data can be embedded unchanged."""
+    with Image.open(path) as im:
+        if im.format != "JPEG" or im.mode not in ("RGB", "L") \
+                or im.getexif().get(ORIENTATION_TAG, 1) != 1:
+            return None
+        box = crop_box or center_crop_box(im.size, ratio)
+    return PhotoSource(str(path), tuple(box))
+
+
+class _Font:
+    def __init__(self, ref, path, index):
+        self.ref  = ref
+        self.sfnt = sfnt.Font(path, index)
+        self.name = "".join(c for c in Path(path).stem if c.isalnum() or c in "-_") or "Font"
+        self.used = {}                                      # gid → text
+
+
+class PdfWriter:
+    """Collects pages and shared resources; writes the file on `close()`."""
+
+    def __init__(self, path, title: str = None):
+        self.path   = Path(path)
+        self.title  = title
+        self._objs  = [None, None]                          # 1 catalog, 2 page tree
+        self._pages = []
+        self._memo  = {}                                    # content hash → Ref
+        self._fonts = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+
+    # ────────── objects ──────────────────────────────────────────────────────
+
+    def _add(self, body: bytes = None) -> Ref:
+        self._objs.append(body)
+        return Ref(len(self._objs))
+
+    def _set(self, ref: Ref, body: bytes):
+        self._objs[ref - 1] = body
+
+    def _stream(self, d: dict, data: bytes, compress=True) -> Ref:
+        if compress:
+            data = zlib.compress(data, 6)
+            d = {**d, "Filter": Name("FlateDecode")}
+        d = {**d, "Length": len(data)}
+        return self._add(_pdf(d) + b"\nstream\n" + data + b"\nendstream")
+
+    def _once(self, key, make) -> Ref:
+        if key not in self._memo:
+            self._memo[key] = make()
+        return self._memo[key]
+
+    # ────────── resources ────────────────────────────────────────────────────
+
+    def icc(self, icc: bytes, channels: int = 3) -> Ref:
+        return self._once(("icc", sha1(icc).digest()),
+                          lambda: self._stream({"N": channels}, icc))
+
+    def _colorspace(self, mode, icc=None):
+        if mode == "L":
+            return [Name("ICCBased"), self.icc(icc, 1)] if icc else Name("DeviceGray")
+        return [Name("ICCBased"), self.icc(icc or profile_bytes(SRGB))]
+
+    def image(self, img: Image.Image, smask: Image.Image = None, dct=False) -> Ref:
+        """Image XObject (Flate, or DCT with *dct*) with an optional soft mask."""
+        if img.mode not in ("RGB", "L"):
+            img = img.convert("RGB")
+        key = ("image", img.mode, img.size, dct, sha1(img.tobytes()).digest(),
+               smask and sha1(smask.tobytes()).digest())
+
+        def make():
+            d = {"Type": Name("XObject"), "Subtype": Name("Image"), "Width": img.width,
+                 "Height": img.height, "BitsPerComponent": 8,
+                 "ColorSpace": self._colorspace(img.mode)}
+            if smask is not None:
+                d["SMask"] = self.image(smask.convert("L"))
+            if dct:
+                buf = BytesIO()
+                img.save(buf, "JPEG", quality=PDF_JPEG_QUALITY)
+                return self._stream({**d, "Filter": Name("DCTDecode")}, buf.getvalue(), False)
+            return self._stream(d, img.tobytes())
+
+        return self._once(key, make)
+
+    def jpeg(self, path) -> Ref:
+        """The JPEG file at *path* as an image XObject, bytes unchanged."""
+        data = Path(path).read_bytes()
+
+        def make():
+            with Image.open(BytesIO(data)) as im:
+                size, mode, icc = im.size, im.mode, im.info.get("icc_profile")
+            d = {"Type": Name("XObject"), "Subtype": Name("Image"), "Width": size[0],
+                 "Height": size[1], "BitsPerComponent": 8,
+                 "ColorSpace": self._colorspace(mode, icc), "Filter": Name("DCTDecode")}
+            return self._stream(d, data, False)
+
+        return self._once(("jpeg", sha1(data).digest()), make)
+
+    def gstate(self, **entries) -> Ref:
+        return self._once(("gs", tuple(sorted(entries.items()))),
+                          lambda: self._add(_pdf({"Type": Name("ExtGState"), **entries})))
+
+    def font(self, font) -> _Font:
+        """Embedded font for a catalog‑loaded FreeTypeFont (written at close)."""
+        key = (font.path, getattr(font, "index", 0))
+        if key not in self._fonts:
+            self._fonts[key] = _Font(self._add(), *key)
+        return self._fonts[key]
+
+    def add_page(self, size, content: bytes, resources: dict):
+        """Append a page of *size* (w, h) pt."""
+        box = [0, 0, float(size[0]), float(size[1])]
+        ref = self._stream({}, content)
+        self._pages.append(self._add(_pdf({
+            "Type": Name("Page"), "Parent": Ref(2), "MediaBox": box, "TrimBox": box,
+            "Resources": resources, "Contents": ref})))
+
+    # ────────── output ───────────────────────────────────────────────────────
+
+    def _write_font(self, f: _Font):
+        s     = f.sfnt
+        gids  = sorted(f.used)
+        tag   = "".join(chr(65 + b % 26) for b in sha1(repr(gids).encode()).digest()[:6])
+        base  = Name(f"{tag}+{f.name}" if not s.cff else f.name)
+        k     = 1000 / s.units_per_em
+        if s.cff:
+            prog = self._stream({"Subtype": Name("OpenType")}, s.standalone())
+            file_key, subtype = "FontFile3", "CIDFontType0"
+        else:
+            data = s.subset(gids)
+            prog = self._stream({"Length1": len(data)}, data)
+            file_key, subtype = "FontFile2", "CIDFontType2"
+        desc = self._add(_pdf({
+            "Type": Name("FontDescriptor"), "FontName": base, "Flags": 32,
+            "FontBBox": [round(v * k) for v in s.bbox], "ItalicAngle": float(s.italic_angle),
+            "Ascent": round(s.ascent * k), "Descent": round(s.descent * k),
+            "CapHeight": round(s.cap_height * k), "StemV": 80, file_key: prog}))
+        widths = []
+        for g in gids:
+            widths += [g, [round(s.advance(g) * k)]]
+        cid = {"Type": Name("Font"), "Subtype": Name(subtype), "BaseFont": base,
+               "CIDSystemInfo": {"Registry": "Adobe", "Ordering": "Identity", "Supplement": 0},
+               "FontDescriptor": desc, "W": widths}
+        if subtype == "CIDFontType2":
+            cid["CIDToGIDMap"] = Name("Identity")
+        cid_ref = self._add(_pdf(cid))
+
+        bf = "".join(f"<{g:04X}> <{f.used[g].encode('utf-16-be').hex().upper()}>\n" for g in gids)
+        cmap = ("/CIDInit /ProcSet findresource begin\n12 dict begin\nbegincmap\n"
+                "/CIDSystemInfo << /Registry (Adobe) /Ordering (UCS) /Supplement 0 >> def\n"
+                "/CMapName /Adobe-Identity-UCS def\n/CMapType 2 def\n"
+                "1 begincodespacerange\n<0000> <FFFF>\nendcodespacerange\n"
+                f"{len(gids)} beginbfchar\n{bf}endbfchar\n"
+                "endcmap\nCMapName currentdict /CMap defineresource pop\nend\nend\n")
+        to_unicode = self._stream({}, cmap.encode())
+        self._set(f.ref, _pdf({"Type": Name("Font"), "Subtype": Name("Type0"), "BaseFont": base,
+                               "Encoding": Name("Identity-H"), "DescendantFonts": [cid_ref],
+                               "ToUnicode": to_unicode}))
+
+    def close(self):
+        for f in self._fonts.values():
+            self._write_font(f)
+        intent = {"Type": Name("OutputIntent"), "S": Name("GTS_PDFX"),
+                  "OutputConditionIdentifier": "sRGB IEC61966-2.1", "Info": "sRGB",
+                  "DestOutputProfile": self.icc(profile_bytes(SRGB))}
+        self._set(Ref(1), _pdf({"Type": Name("Catalog"), "Pages": Ref(2),
+                                "OutputIntents": [intent]}))
+        self._set(Ref(2), _pdf({"Type": Name("Pages"), "Kids": self._pages,
+                                "Count": len(self._pages)}))
+        info = self._add(_pdf({"Producer": "postcard", "Trapped": Name("False"),
+                               **({"Title": self.title} if self.title else {})}))
+
+        tmp = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+        try:
+            with open(tmp, "wb") as out:
+                out.write(f"%PDF-{PDF_VERSION}\n%\xe2\xe3\xcf\xd3\n".encode("latin-1"))
+                offsets = []
+                for i, body in enumerate(self._objs, 1):
+                    offsets.append(out.tell())
+                    out.write(b"%d 0 obj\n" % i + body + b"\nendobj\n")
+                xref = out.tell()
+                out.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(offsets) + 1))
+                out.write(b"".join(b"%010d 00000 n \n" % o for o in offsets))
+                out.write(b"trailer\n" + _pdf({"Size": len(offsets) + 1, "Root": Ref(1),
+                                               "Info": info}))
+                out.write(b"\nstartxref\n%d\n%%%%EOF\n" % xref)
+            os.replace(tmp, self.path)
+        except BaseException:
+            tmp.unlink(missing_ok=True)
+            raise
+
+
+# ────────── cards ────────────────────────────────────────────────────────────
+
+class _Page:
+    """Content stream and resource names for one page."""
+
+    def __init__(self, pdf: PdfWriter, height_px, k):
+        self.pdf, self.h, self.k = pdf, height_px, k
+        self.ops = []
+        self.res = {"XObject": {}, "Font": {}, "ExtGState": {}}
+
+    def name(self, kind, ref) -> str:
+        names = self.res[kind]
+        for n, r in names.items():
+            if r == ref:
+                return n
+        n = f"{kind[0]}{len(names)}"
+        names[n] = ref
+        return n
+
+    def rect(self, box):
+        """(x, y, w, h) in pt for a px box (y flipped)."""
+        x0, y0, x1, y1 = box
+        k = self.k
+        return x0 * k, (self.h - y1) * k, (x1 - x0) * k, (y1 - y0) * k
+
+    def draw(self, ref, box, gs=None):
+        x, y, w, h = map(_num, self.rect(box))
+        gs = f"/{self.name('ExtGState', gs)} gs " if gs else ""
+        self.ops.append(f"q {gs}{w} 0 0 {h} {x} {y} cm /{self.name('XObject', ref)} Do Q")
+
+    def fill_rect(self, box, rgb):
+        self.ops.append(f"q {_rgb(rgb)} rg {' '.join(map(_num, self.rect(box)))} re f Q")
+
+
+def _rgb(rgb) -> str:
+    return " ".join(_num(c / 255) for c in rgb[:3])
+
+
+def _photo(page: _Page, layer, src: PhotoSource):
+    bx0, by0, bx1, by1 = src.box
+    with Image.open(src.path) as im:
+        fw, fh = im.size
+    x, y, w, h = page.rect(layer.box)
+    sx, sy = w / (bx1 - bx0), h / (by1 - by0)
+    ref  = page.pdf.jpeg(src.path)
+    clip = " ".join(map(_num, (x, y, w, h)))
+    cm   = " ".join(map(_num, (fw * sx, 0, 0, fh * sy, x - bx0 * sx, y - (fh - by1) * sy)))
+    page.ops.append(f"q {clip} re W n {cm} cm /{page.name('XObject', ref)} Do Q")
+
+
+def _text(page: _Page, layer, run: TextRun):
+    font  = run.font
+    f     = page.pdf.font(font)
+    s     = f.sfnt
+    gids  = [s.glyph_id(ch) for ch in run.text]
+    for g, ch in zip(gids, run.text):
+        f.used.setdefault(g, ch)
+    offs  = layout.char_offsets(font, run.text, run.tracking)
+    em    = 1000 / s.units_per_em
+    parts = []
+    for i, g in enumerate(gids):
+        parts.append(f"<{g:04X}>")
+        if i + 1 < len(gids):
+            adj = s.advance(g) * em - (offs[i + 1] - offs[i]) * 1000 / font.size
+            if abs(adj) > 0.01:
+                parts.append(_num(adj))
+
+    k  = page.k
+    x  = run.xy[0] * k
+    y  = (page.h - run.xy[1] - font.getmetrics()[0]) * k
+    gs = ""
+    if run.opacity < 1:
+        gs = f"/{page.name('ExtGState', page.pdf.gstate(ca=float(run.opacity)))} gs "
+    paint = f"{_rgb(layer.fill)} rg "
+    if run.stroke:
+        paint += f"{_rgb(layer.fill)} RG {_num(2 * run.stroke * k)} w 1 j 1 J 2 Tr "
+    page.ops.append(f"q {gs}{paint}BT /{page.name('Font', f.ref)} {_num(font.size * k)} Tf "
+                    f"{_num(x)} {_num(y)} Td [{' '.join(parts)}] TJ ET Q")
+
+
+def add_card(pdf: PdfWriter, comp, dpi: int):
+    """Append *comp* (a Compositor with its layers) as one page."""
+    w, h = comp.canvas.size
+    page = _Page(pdf, h, 72 / dpi)
+    page.fill_rect((0, 0, w, h), comp.background)
+    for layer in comp.layers:
+        v = layer.vector
+        if isinstance(v, TextRun):
+            _text(page, layer, v)
+        elif isinstance(v, PhotoSource):
+            _photo(page, layer, v)
+        elif layer.blend is not None:
+            mode = getattr(layer.blend, "mode", None)
+            if mode not in BLEND_MODES:
+                raise ValueError(f"layer {layer.name!r} has a blend PDF can't express")
+            ref = pdf.image(layer.fill.convert("L"), layer.mask, dct=layer.name in DCT_LAYERS)
+            gs  = pdf.gstate(BM=Name(BLEND_MODES[mode]), ca=float(layer.blend.strength))
+            page.draw(ref, layer.box, gs)
+        elif isinstance(layer.fill, Image.Image):
+            page.draw(pdf.image(layer.fill, layer.mask, dct=layer.name in DCT_LAYERS), layer.box)
+        elif layer.mask is None:
+            page.fill_rect(layer.box, layer.fill)
+        else:
+            page.draw(pdf.image(Image.new("RGB", (1, 1), tuple(layer.fill)), layer.mask), layer.box)
+    res = {k: v for k, v in page.res.items() if v}
+    pdf.add_page((w * page.k, h * page.k), "\n".join(page.ops).encode("latin-1"), res)
+
+
+def save_card(path: Path, comp, dpi: int, title: str = None):
+    """Write *comp* as a one‑page PDF."""
+    with PdfWriter(path, title) as pdf:
+        add_card(pdf, comp, dpi)
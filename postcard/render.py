@@ -0,0 +1,226 @@
+"""
+The card pipeline, driven by a spec.RenderPlan.
+
+This is the body the card scripts used to carry in copies: decode the
+crop at reduced resolution, convert to sRGB, resample to print size, then
+stack photo, vignette, gradient shadow, emblem, paper texture and caption
+in a Compositor and export the result (TIFF, derivatives, CMYK, PDF).
+The finished photo is kept in the stage cache (postcard.stagecache), so
+a re‑render after editing only the overlays never decodes the source.
+
+Stages a card doesn't use are never imported – the SVG emblem renderer,
+smart crop, palette analysis and the PDF writer each cost import time
+that a plain card shouldn't pay.
+"""
+
+import time
+from dataclasses import dataclass
+from PIL import Image
+from postcard import export, glyphs, gradient, layout, stagecache, texture, trace
+from postcard.color import SRGB, profile_bytes, to_srgb
+from postcard.compositor import Compositor, Layer
+from postcard.loader import crop_size, load_cropped
+from postcard.resample import resample_to
+from postcard.spec import RenderPlan
+
+
+@dataclass
+class RenderResult:
+    comp:   Compositor
+    canvas: Image.Image
+    export: export.ExportReport
+
+
+# ────────── layers ───────────────────────────────────────────────────────────
+
+def add_shadow_gradient(comp: Compositor, plan: RenderPlan, color):
+    s = plan.spec.shadow
+    if not s.enabled or s.opacity <= 0 or s.height_frac <= 0:
+        return
+    (inner_w, inner_h), b = plan.inner, plan.border
+    grad_h = int(inner_h * s.height_frac)
+    mask   = gradient.linear((inner_w, grad_h), gradient.ramp(s.opacity), s.curve)
+    comp.add(Layer("gradient", (b, b + inner_h - grad_h), color, mask))
+
+
+def add_vignette(comp: Compositor, plan: RenderPlan):
+    v = plan.spec.vignette
+    if v.opacity <= 0:
+        return
+    mask = gradient.radial(plan.inner, ((0.6, 0.0), (1.0, v.opacity)), "ease-in")
+    comp.add(Layer("gradient", (plan.border, plan.border), v.color, mask))
+
+
+def add_emblem(comp: Compositor, plan: RenderPlan):
+    e = plan.spec.emblem
+    if not e.file or e.opacity <= 0:
+        return
+    from postcard import emblem
+
+    (w, h), (inner_w, inner_h), b = plan.size, plan.inner, plan.border
+    color  = None if e.own_colors else e.color
+    margin = round(e.margin_in * plan.spec.card.dpi)
+    size   = (max(1, round(inner_w * e.width_frac)), inner_h - 2 * margin)
+    ew, eh = emblem.rasterize(e.file, size, color)[1].size
+
+    x = {"left": b + margin, "right": w - b - margin - ew}
+    y = {"top": b + margin, "bottom": h - b - margin - eh}
+    if e.pos == "center":
+        xy = ((w - ew) // 2, (h - eh) // 2)
+    else:
+        vert, horiz = e.pos.split("-")
+        xy = (x[horiz], y[vert])
+    comp.add(emblem.emblem_layer(e.file, xy, size, color, e.opacity))
+
+
+def add_texture(comp: Compositor, plan: RenderPlan):
+    t = plan.spec.texture
+    if not t.enabled or not t.file or t.strength <= 0:
+        return
+    tex = texture.prepare(t.file, comp.canvas.size, t.fit, t.blend)
+    comp.add(Layer("texture", (0, 0), tex, blend=texture.blender(t.blend, t.strength)))
+
+
+def add_caption(comp: Compositor, plan: RenderPlan, px: float, fill):
+    c = plan.spec.caption
+    cap = layout.layout_caption(
+        plan.font, c.lines, plan.size, plan.border,
+        size=round(c.font_size * px) if c.font_size else None,
+        fit_box=(plan.inner[0], int(c.fit_height * plan.size[1])),
+        pos=c.pos, align=c.align, offset=round(c.offset_px * px),
+        line_offsets=layout.scale_offsets(c.line_offsets, px),
+        tracking=c.tracking, wrap_width=plan.inner[0] if c.wrap else None,
+    )
+    sdx, sdy = layout.scale_offsets(c.shadow.offset, px)
+    stroke   = round(c.stroke.width * px)
+    for line in cap.lines:
+        xy = (line.x, line.y)
+        if c.shadow.enabled:
+            comp.add(glyphs.shadow_layer(line.text, (line.x + sdx, line.y + sdy), cap.font,
+                                         c.shadow.color, c.shadow.opacity,
+                                         c.shadow.blur * px, cap.tracking))
+        if stroke:
+            comp.add(glyphs.stroke_layer(line.text, xy, cap.font, c.stroke.color,
+                                         stroke, cap.tracking))
+        comp.add(glyphs.text_layer(line.text, xy, cap.font, fill, cap.tracking))
+
+
+# ────────── outputs ──────────────────────────────────────────────────────────
+
+def derivatives(plan: RenderPlan) -> list:
+    """The export.Derivatives for *plan*: print TIFF first, then the rest."""
+    s, t = plan.spec, plan.spec.tiff
+    tif  = export.Derivative(s.output, options=dict(
+        compression=None if t.compression == "none" else t.compression,
+        predictor=t.predictor, tile=t.tile or None, bigtiff=t.bigtiff))
+    out  = [tif]
+    for d in s.derivatives:
+        out.append(export.Derivative(d.path, d.width, d.aspect,
+                                     dict(quality=d.quality) if d.quality else None))
+    if s.cmyk.file:
+        out.append(export.Derivative(s.cmyk.file, options=tif.options, profile=s.cmyk.profile,
+                                     intent=s.cmyk.intent, bpc=s.cmyk.bpc, proof=s.cmyk.proof))
+    return out
+
+
+# ────────── pipeline ─────────────────────────────────────────────────────────
+
+def _photo(plan: RenderPlan, tracer) -> tuple:
+    """Crop, decode, convert and resample the source; returns (img, icc, crop box, px)."""
+    s, c = plan.spec, plan.spec.card
+    box = None
+    with tracer("crop"):
+        if s.crop.smart:
+            from postcard import smartcrop
+            box = smartcrop.crop_box(s.input, plan.ratio, s.caption.pos, min_scale=s.crop.min_scale)
+        px = plan.inner[0] / crop_size(s.input, plan.ratio, box)[0]
+
+    with tracer("decode") as span:
+        img = load_cropped(s.input, plan.ratio, size=plan.inner, crop_box=box)   # crop() decodes
+        span.image(img)
+    with tracer("color") as span:
+        img, icc = to_srgb(img, c.color_intent)
+        span.image(img)
+    with tracer("resample") as span:
+        img = resample_to(img, plan.inner, c.sharpen, c.dpi)
+        span.image(img)
+    return img, icc, box, px
+
+
+def photo_key(plan: RenderPlan) -> str:
+    """Stage cache key of the photo: the source bytes and every setting _photo reads."""
+    s, c = plan.spec, plan.spec.card
+    smart = dict(pos=s.caption.pos, min_scale=s.crop.min_scale) if s.crop.smart else None
+    return stagecache.key("photo", source=stagecache.file_digest(s.input), ratio=plan.ratio,
+                          size=plan.inner, smart=smart, intent=c.color_intent,
+                          sharpen=c.sharpen, dpi=c.dpi if c.sharpen else None)
+
+
+def photo(plan: RenderPlan, tracer=trace.off, cache=True) -> tuple:
+    """_photo, through the stage cache unless *cache* is off."""
+    if not cache:
+        return _photo(plan, tracer)
+    with tracer("photo cache") as span:
+        k   = photo_key(plan)
+        hit = stagecache.get(k)
+        if hit:
+            span.image(hit[0])
+    if hit:
+        img, meta = hit
+        # to_srgb always hands back sRGB
+        return img, profile_bytes(SRGB), meta["box"] and tuple(meta["box"]), meta["px"]
+    t0 = time.perf_counter()
+    img, icc, box, px = _photo(plan, tracer)
+    stagecache.put(k, img, dict(box=box, px=px), time.perf_counter() - t0)
+    return img, icc, box, px
+
+
+def compose(plan: RenderPlan, tracer=trace.off, cache=True) -> tuple:
+    """Build the layer stack for *plan*; returns (compositor, icc bytes).
+    Each stage runs in a *tracer* span (see postcard.trace); the photo
+    comes from the stage cache when *cache* is on."""
+    s, c = plan.spec, plan.spec.card
+    img, icc, box, px = photo(plan, tracer, cache)
+
+    shadow_rgb, fill_rgb = s.shadow.color, s.caption.fill
+    if s.palette.auto:
+        with tracer("palette"):
+            from postcard import palette
+            shade = s.shadow.opacity if s.shadow.enabled and s.caption.pos == "bottom" else 0.0
+            shadow_rgb, fill_rgb = palette.auto(img, s.input, box, s.caption.pos,
+                                                s.shadow.height_frac, shade, s.palette.min_contrast)
+
+    comp   = Compositor(plan.size, c.border_color)
+    vector = None
+    if s.pdf and not c.sharpen:
+        with tracer("pdf"):
+            from postcard import pdf
+            vector = pdf.passthrough(s.input, plan.ratio, box)
+    comp.add(Layer("photo", (plan.border, plan.border), img, vector=vector))
+    with tracer("vignette"):
+        add_vignette(comp, plan)
+    with tracer("shadow gradient"):
+        add_shadow_gradient(comp, plan, shadow_rgb)
+    with tracer("emblem"):
+        add_emblem(comp, plan)
+    with tracer("texture"):
+        add_texture(comp, plan)
+    with tracer("caption", lines=len(s.caption.lines)):
+        add_caption(comp, plan, px, fill_rgb)
+    return comp, icc
+
+
+def render(plan: RenderPlan, tracer=trace.off, cache=True) -> RenderResult:
+    """Render and write every output of *plan*."""
+    with tracer("card", name=plan.name):
+        comp, icc = compose(plan, tracer, cache)
+        with tracer("composite") as span:
+            canvas = comp.render()
+            span.image(canvas)
+        with tracer("export"):
+            report = export.export(canvas, derivatives(plan), icc, plan.spec.card.dpi, tracer=tracer)
+        if plan.spec.pdf:
+            with tracer("pdf"):
+                from postcard import pdf
+                pdf.save_card(plan.spec.pdf, comp, plan.spec.card.dpi, title=plan.title)
+    return RenderResult(comp, canvas, report)
@@ -0,0 +1,199 @@
+"""
+Minimal OpenType reader for embedding caption fonts in PDFs.
+
+Only what a CID‑keyed PDF font needs is read: units per em, vertical
+metrics and bounding box, the Unicode cmap (formats 4 and 12), advance
+widths and whether outlines are TrueType (`glyf`) or CFF. One face is cut
+out of a collection (.ttc / .otc) as a standalone font. TrueType fonts
+can be subset: glyphs the caption doesn't use are emptied but keep their
+ids, so the PDF can address glyphs by their original ids and no tables
+that refer to glyph ids need rewriting.
+"""
+
+import struct
+from pathlib import Path
+
+# tables a PDF viewer needs from an embedded TrueType font
+PDF_TABLES = (b"head", b"hhea", b"hmtx", b"loca", b"glyf", b"maxp", b"cvt ", b"fpgm", b"prep",
+              b"cmap")
+
+# composite glyph flags
+_ARG_WORDS, _SCALE, _MORE, _XY_SCALE, _TWO_BY_TWO = 0x1, 0x8, 0x20, 0x40, 0x80
+
+
+def _u16(b, o):
+    return struct.unpack_from(">H", b, o)[0]
+
+
+def _i16(b, o):
+    return struct.unpack_from(">h", b, o)[0]
+
+
+def _u32(b, o):
+    return struct.unpack_from(">I", b, o)[0]
+
+
+def _checksum(data: bytes) -> int:
+    data += b"\0" * (-len(data) % 4)
+    return sum(struct.unpack(f">{len(data) // 4}I", data)) & 0xFFFFFFFF
+
+
+class Font:
+    """One face of the font file at *path* (face *index* in collections)."""
+
+    def __init__(self, path, index: int = 0):
+        data = Path(path).read_bytes()
+        off  = 0
+        if data[:4] == b"ttcf":
+            if index >= _u32(data, 8):
+                raise ValueError(f"{path} has no face {index}")
+            off = _u32(data, 12 + 4 * index)
+        self.version = data[off:off + 4]
+        self.tables  = {}
+        for i in range(_u16(data, off + 4)):
+            rec = off + 12 + 16 * i
+            tag, _, start, length = struct.unpack_from(">4sIII", data, rec)
+            self.tables[tag] = data[start:start + length]
+
+        head, hhea = self.tables[b"head"], self.tables[b"hhea"]
+        self.units_per_em = _u16(head, 18)
+        self.bbox         = tuple(_i16(head, o) for o in (36, 38, 40, 42))
+        self.ascent       = _i16(hhea, 4)
+        self.descent      = _i16(hhea, 6)
+        self.num_glyphs   = _u16(self.tables[b"maxp"], 4)
+        os2 = self.tables.get(b"OS/2", b"")
+        self.cap_height   = _i16(os2, 88) if len(os2) >= 90 else self.ascent
+        post = self.tables.get(b"post", b"")
+        self.italic_angle = struct.unpack_from(">i", post, 4)[0] / 65536 if len(post) >= 8 else 0.0
+
+        n_hm = _u16(hhea, 34)
+        hmtx = self.tables[b"hmtx"]
+        self._advances = [_u16(hmtx, 4 * i) for i in range(n_hm)]
+        self._cmap = self._read_cmap(self.tables.get(b"cmap", b""))
+
+    @property
+    def cff(self) -> bool:
+        return b"CFF " in self.tables or b"CFF2" in self.tables
+
+    # ────────── lookups ──────────────────────────────────────────────────────
+
+    def glyph_id(self, ch: str) -> int:
+        return self._cmap.get(ord(ch), 0)
+
+    def advance(self, gid: int) -> int:
+        """Advance width of *gid* in font units."""
+        adv = self._advances
+        return adv[gid] if gid < len(adv) else adv[-1]
+
+    @staticmethod
+    def _read_cmap(cmap: bytes) -> dict:
+        if not cmap:
+            return {}
+        subtables = {}
+        for i in range(_u16(cmap, 2)):
+            pid, eid, off = struct.unpack_from(">HHI", cmap, 4 + 8 * i)
+            subtables[(pid, eid)] = off
+        for key in ((3, 10), (0, 6), (0, 4), (3, 1), (0, 3), (0, 2), (0, 1), (0, 0)):
+            if key in subtables:
+                off = subtables[key]
+                break
+        else:
+            return {}
+
+        out, fmt = {}, _u16(cmap, off)
+        if fmt == 4:
+            segs = _u16(cmap, off + 6) // 2
+            ends, starts = off + 14, off + 16 + 2 * segs
+            deltas, ranges = starts + 2 * segs, starts + 4 * segs
+            for s in range(segs):
+                end, start = _u16(cmap, ends + 2 * s), _u16(cmap, starts + 2 * s)
+                delta, ro  = _i16(cmap, deltas + 2 * s), _u16(cmap, ranges + 2 * s)
+                for c in range(start, min(end, 0xFFFE) + 1):
+                    if ro == 0:
+                        gid = (c + delta) & 0xFFFF
+                    else:
+                        gid = _u16(cmap, ranges + 2 * s + ro + 2 * (c - start))
+                        gid = (gid + delta) & 0xFFFF if gid else 0
+                    if gid:
+                        out[c] = gid
+        elif fmt == 12:
+            for g in range(_u32(cmap, off + 12)):
+                start, end, gid = struct.unpack_from(">III", cmap, off + 16 + 12 * g)
+                for c in range(start, end + 1):
+                    out[c] = gid + c - start
+        return out
+
+    # ────────── output ───────────────────────────────────────────────────────
+
+    def _components(self, glyph: bytes):
+        """Glyph ids a composite glyph refers to."""
+        if len(glyph) < 10 or _i16(glyph, 0) >= 0:
+            return
+        o = 10
+        while True:
+            flags, gid = _u16(glyph, o), _u16(glyph, o + 2)
+            yield gid
+            o += 4 + (4 if flags & _ARG_WORDS else 2)
+            o += 2 if flags & _SCALE else 4 if flags & _XY_SCALE else 8 if flags & _TWO_BY_TWO else 0
+            if not flags & _MORE:
+                break
+
+    def subset(self, gids) -> bytes:
+        """TrueType font keeping only *gids* (plus .notdef and components)."""
+        if self.cff:
+            return self.standalone()
+        head = self.tables[b"head"]
+        loca, glyf = self.tables[b"loca"], self.tables[b"glyf"]
+        n = self.num_glyphs
+        if _i16(head, 50) == 0:
+            offsets = [2 * _u16(loca, 2 * i) for i in range(n + 1)]
+        else:
+            offsets = [_u32(loca, 4 * i) for i in range(n + 1)]
+
+        keep, todo = set(), [0, *gids]
+        while todo:
+            gid = todo.pop()
+            if gid in keep or gid >= n:
+                continue
+            keep.add(gid)
+            todo.extend(self._components(glyf[offsets[gid]:offsets[gid + 1]]))
+
+        new_glyf, new_loca = bytearray(), []
+        for gid in range(n):
+            new_loca.append(len(new_glyf))
+            if gid in keep:
+                new_glyf += glyf[offsets[gid]:offsets[gid + 1]]
+                new_glyf += b"\0" * (-len(new_glyf) % 4)
+        new_loca.append(len(new_glyf))
+
+        tables = {t: self.tables[t] for t in PDF_TABLES if t in self.tables}
+        tables[b"glyf"] = bytes(new_glyf)
+        tables[b"loca"] = struct.pack(f">{n + 1}I", *new_loca)
+        tables[b"head"] = head[:50] + struct.pack(">h", 1) + head[52:]    # long loca
+        return self._build(tables)
+
+    def standalone(self) -> bytes:
+        """The face as a self‑contained font file."""
+        return self._build(self.tables)
+
+    def _build(self, tables) -> bytes:
+        tags = sorted(tables)
+        n    = len(tags)
+        es   = max(n.bit_length() - 1, 0)
+        sr   = 16 << es
+        out  = bytearray(self.version + struct.pack(">HHHH", n, sr, es, n * 16 - sr))
+        body = bytearray()
+        base = 12 + 16 * n
+        head_at = None
+        for tag in tags:
+            data = tables[tag]
+            if tag == b"head":
+                data = data[:8] + b"\0\0\0\0" + data[12:]
+                head_at = base + len(body)
+            out += struct.pack(">4sIII", tag, _checksum(data), base + len(body), len(data))
+            body += data + b"\0" * (-len(data) % 4)
+        out += body
+        if head_at is not None:
+            adjust = (0xB1B0AFBA - _checksum(bytes(out))) & 0xFFFFFFFF
+            out[head_at + 8:head_at + 12] = struct.pack(">I", adjust)
+        return bytes(out)
@@ -0,0 +1,139 @@
+"""
+Content‑aware crop.
+
+The source is decoded as a small proxy (PROXY_SIZE px on the long side,
+JPEG 1/8 DCT scale where possible) and turned into an energy map: edge
+strength plus a little colour saturation. A summed‑area table over that
+map gives the energy of any window in four lookups, so every candidate
+window of the target aspect ratio – each position, at each scale down to
+*min_scale* – is scored in O(1). A whole row of placements is scored at
+once, with map() over slices of two table rows, so Python loops over
+rows and scales but never over single windows.
+
+Optionally the caption band (the bottom or top CAPTION_BAND of the window)
+is kept over low‑detail areas: its energy is subtracted again, weighted by
+*caption_weight*. Windows scoring within TIE_TOLERANCE of the best resolve
+to the one nearest the centre, so flat images crop exactly as before. The
+winner is mapped back to full‑resolution upright coords for
+`loader.load_cropped(crop_box=…)`.
+"""
+
+from functools import lru_cache
+from itertools import accumulate, repeat
+from operator import add, mul, sub, truediv
+from pathlib import Path
+from PIL import Image, ImageChops, ImageFilter, ImageOps
+from postcard.loader import center_crop_box, load_proxy
+
+PROXY_SIZE     = 160
+CAPTION_BAND   = 0.25      # fraction of the window height under the caption
+SATURATION_MIX = 0.5       # weight of colour saturation vs. edges
+TIE_TOLERANCE  = 0.02
+SCALE_STEPS    = 8
+
+
+def energy_map(proxy: Image.Image) -> Image.Image:
+    """"L" energy: edge magnitude + SATURATION_MIX × saturation."""
+    w, h  = proxy.size
+    edges = proxy.convert("L").filter(ImageFilter.FIND_EDGES)
+    edges = ImageOps.expand(edges.crop((1, 1, w - 1, h - 1)), 1)   # filter copies the rim
+    sat   = proxy.convert("HSV").getchannel("S")
+    return ImageChops.add(edges, sat.point(lambda v: round(v * SATURATION_MIX)))
+
+
+def summed_area(img: Image.Image):
+    """(h + 1) rows of (w + 1) prefix sums; sat[y][x] = Σ img[<y, <x]."""
+    w, h = img.size
+    data = img.tobytes()
+    prev = [0] * (w + 1)
+    rows = [prev]
+    for y in range(h):
+        prev = list(map(add, prev, accumulate(data[y * w:(y + 1) * w], initial=0)))
+        rows.append(prev)
+    return rows
+
+
+def window_sum(sat, x0, y0, x1, y1):
+    return sat[y1][x1] - sat[y0][x1] - sat[y1][x0] + sat[y0][x0]
+
+
+def _window_sums(sat, y0, y1, win_w):
+    """Energy of every win_w‑wide window over rows y0 ≤ y < y1, left to right."""
+    cols = list(map(sub, sat[y1], sat[y0]))
+    return map(sub, cols[win_w:], cols[:-win_w])
+
+
+def _scores(sat, size, win_w, win_h, caption_pos, caption_weight):
+    """
+    Scores of every placement of a win_w × win_h window, one list per y0
+    with one score per x0: mean energy, minus the caption band's mean ×
+    CAPTION_BAND × weight.
+    """
+    W, H  = size
+    band  = round(win_h * CAPTION_BAND) if caption_weight else 0
+    area  = win_w * win_h
+    k     = caption_weight * CAPTION_BAND / (win_w * band) if band else 0
+    rows  = []
+    for y0 in range(H - win_h + 1):
+        y1    = y0 + win_h
+        score = map(truediv, _window_sums(sat, y0, y1, win_w), repeat(area))
+        if band:
+            by0, by1 = (y1 - band, y1) if caption_pos == "bottom" else (y0, y0 + band)
+            score = map(sub, score, map(mul, repeat(k), _window_sums(sat, by0, by1, win_w)))
+        rows.append(list(score))
+    return rows
+
+
+@lru_cache(maxsize=32)
+def _search(path: str, mtime_ns: int, ratio: float, caption_pos, caption_weight, min_scale):
+    proxy, full = load_proxy(Path(path), PROXY_SIZE)
+    sat = summed_area(energy_map(proxy))
+    pw, ph = proxy.size
+
+    cx0, cy0, cx1, cy1 = center_crop_box(proxy.size, ratio)
+    steps  = 1 if min_scale >= 1 else SCALE_STEPS
+    scales = []
+    for i in range(steps):
+        s = 1 - (1 - min_scale) * i / max(steps - 1, 1)
+        ww, wh = max(1, round((cx1 - cx0) * s)), max(1, round((cy1 - cy0) * s))
+        scales.append((s, ww, wh, _scores(sat, proxy.size, ww, wh, caption_pos, caption_weight)))
+
+    # near‑ties go to the largest scale, then to the window nearest the centre
+    best = max(max(r) for *_, rows in scales for r in rows)
+    near = best - abs(best) * TIE_TOLERANCE
+    mx, my = (cx0 + cx1) / 2, (cy0 + cy1) / 2
+    for s, ww, wh, rows in scales:
+        hits = [(abs(x0 + ww / 2 - mx) + abs(y0 + wh / 2 - my), y0, x0)
+                for y0, row in enumerate(rows) if max(row) >= near
+                for x0, v in enumerate(row) if v >= near]
+        if hits:
+            _, y0, x0 = min(hits)
+            break
+
+    # back to full resolution; scale 1 keeps the exact centred‑crop size
+    fx0, fy0, fx1, fy1 = center_crop_box(full, ratio)
+    fw, fh = fx1 - fx0, fy1 - fy0
+    if s < 1:
+        fw = round(fw * s)
+        fh = round(fw / ratio)
+    x = fx0 if (x0, ww) == (cx0, cx1 - cx0) else min(round(x0 * full[0] / pw), full[0] - fw)
+    y = fy0 if (y0, wh) == (cy0, cy1 - cy0) else min(round(y0 * full[1] / ph), full[1] - fh)
+    return x, y, x + fw, y + fh
+
+
+def crop_box(path: Path, ratio: float, caption_pos=None, caption_weight=2.0,
+             min_scale=1.0):
+    """
+    Best upright, full‑res crop box of aspect *ratio* for *path*.
+
+    *caption_pos* ("bottom" / "top" / None) keeps that band of the window
+    over low‑detail areas; *min_scale* < 1 also tries tighter crops (down to
+    that fraction of the largest window).
+    """
+    if not 0 < min_scale <= 1:
+        raise ValueError(f"min_scale must be in (0, 1], got {min_scale}")
+    if caption_pos not in (None, "bottom", "top"):
+        raise ValueError(f"unknown caption position {caption_pos!r}")
+    path = Path(path).resolve()
+    return _search(str(path), path.stat().st_mtime_ns, float(ratio),
+                   caption_pos, float(caption_weight if caption_pos else 0), float(min_scale))
@@ -0,0 +1,391 @@
+"""
+Declarative card specs.
+
+A card is described by a TOML file instead of a copy of the render script
+with its CONFIG block edited:
+
+    input  = "badlands.jpg"
+    output = "badlands.tif"
+
+    [card]
+    size_in = [6, 4]
+
+    [caption]
+    lines     = ["Badlands National Park"]
+    font_size = 200
+
+    [[derivatives]]
+    path  = "badlands-web.jpg"
+    width = 1600
+
+Every table and key is optional except `input`, `output` and
+`caption.lines`; defaults are the ones the card scripts shipped with. `load` checks every value against
+the spec dataclasses below (types, ranges, choices, unknown keys) and
+reports all problems at once; `compile` then resolves paths against the
+spec's folder, the font through the font catalog and the pixel geometry,
+once, into a RenderPlan for render.render().
+
+Parsing and validation import nothing from Pillow.
+"""
+
+import tomllib
+from dataclasses import dataclass, field, fields, is_dataclass, replace
+from pathlib import Path
+from typing import Optional, Union, get_args, get_origin, get_type_hints
+
+Color = tuple[int, int, int]
+Pair  = tuple[float, float]
+
+INTENTS     = ("perceptual", "relative", "saturation", "absolute")
+CURVES      = ("linear", "ease-in", "ease-out", "ease-in-out", "exp")
+BLENDS      = ("multiply", "overlay", "soft-light")
+EMBLEM_POS  = ("top-left", "top-right", "bottom-left", "bottom-right", "center")
+
+
+class SpecError(ValueError):
+    """Raised with every problem found in a spec, one per line."""
+
+
+def _opt(default=None, *, choices=None, lo=None, hi=None, required=False):
+    return field(default=default, metadata=dict(choices=choices, lo=lo, hi=hi, required=required))
+
+
+def _list(*default):
+    return field(default_factory=lambda: list(default), metadata={})
+
+
+# ────────── spec tables ──────────────────────────────────────────────────────
+
+@dataclass(frozen=True)
+class CardSection:
+    dpi:          int = _opt(300, lo=72, hi=2400)
+    size_in:      Pair = _opt((6.0, 4.0), lo=0.5, hi=120)
+    border_in:    float = _opt(0.0, lo=0)
+    border_color: Color = (195, 197, 184)
+    sharpen:      Optional[str] = _opt(None, choices=("low", "medium", "high"))
+    color_intent: str = _opt("perceptual", choices=INTENTS)
+
+
+@dataclass(frozen=True)
+class CropSection:
+    smart:     bool = False                 # content‑aware crop, caption over calm areas
+    min_scale: float = _opt(1.0, lo=0.1, hi=1.0)
+
+
+@dataclass(frozen=True)
+class TextShadowSection:
+    enabled: bool = True
+    color:   Color = (0, 0, 0)
+    opacity: float = _opt(0.5, lo=0, hi=1)
+    offset:  Pair = (3.0, 3.0)              # source‑photo px
+    blur:    float = _opt(0.0, lo=0)        # σ in source‑photo px; 0 = hard offset shadow
+
+
+@dataclass(frozen=True)
+class StrokeSection:
+    width: float = _opt(0.0, lo=0)          # source‑photo px; 0 = off
+    color: Color = (0, 0, 0)
+
+
+@dataclass(frozen=True)
+class CaptionSection:
+    lines:        list[str] = _list()       # or one string
+    pos:          str = _opt("bottom", choices=("bottom", "top"))
+    align:        str = _opt("center", choices=("center", "left", "right"))
+    offset_px:    int = 0                   # source‑photo px; +ve moves text up (bottom) / down (top)
+    font_size:    Optional[int] = _opt(None, lo=1)      # source‑photo px; None = auto fit
+    fit_height:   float = _opt(0.12, lo=0.01, hi=1)     # auto fit: fraction of card height
+    line_offsets: list[object] = _list()    # per‑line dx, or [dx, dy]
+    wrap:         bool = False              # re‑wrap the caption to the photo width
+    tracking:     float = 0.0               # letter spacing, 1/1000 em
+    fill:         Color = (235, 202, 174)
+    shadow:       TextShadowSection = field(default_factory=TextShadowSection)
+    stroke:       StrokeSection = field(default_factory=StrokeSection)
+
+
+@dataclass(frozen=True)
+class FontSection:
+    name:      str = "VenturaRegular.otf"   # path, file name or family
+    dirs:      list[str] = _list("~/Downloads/Fonts")
+    fallbacks: list[str] = _list()          # tried in order when *name* isn't installed
+
+
+@dataclass(frozen=True)
+class ShadowSection:
+    enabled:     bool = True
+    color:       Color = (51, 68, 45)
+    opacity:     float = _opt(1.0, lo=0, hi=1)
+    height_frac: float = _opt(0.45, lo=0, hi=1)
+    curve:       str = _opt("linear", choices=CURVES)
+
+
+@dataclass(frozen=True)
+class VignetteSection:
+    opacity: float = _opt(0.0, lo=0, hi=1)
+    color:   Color = (0, 0, 0)
+
+
+@dataclass(frozen=True)
+class TextureSection:
+    file:     Optional[Path] = Path("paper-fibers.png")
+    enabled:  bool = True
+    blend:    str = _opt("multiply", choices=BLENDS)
+    strength: float = _opt(0.35, lo=0, hi=1)
+    fit:      str = _opt("tile", choices=("tile", "scale"))
+
+
+@dataclass(frozen=True)
+class EmblemSection:
+    file:       Optional[Path] = None
+    width_frac: float = _opt(0.2, lo=0.01, hi=1)
+    pos:        str = _opt("top-right", choices=EMBLEM_POS)
+    margin_in:  float = _opt(0.15, lo=0)
+    color:      Color = (255, 255, 255)
+    own_colors: bool = False                # keep the SVG's colours instead of *color*
+    opacity:    float = _opt(0.8, lo=0, hi=1)
+
+
+@dataclass(frozen=True)
+class PaletteSection:
+    auto:         bool = False              # pick shadow / caption colours from the photo
+    min_contrast: float = _opt(3.0, lo=1, hi=21)
+
+
+@dataclass(frozen=True)
+class TiffSection:
+    compression: str = _opt("deflate", choices=("none", "deflate", "lzw"))
+    predictor:   bool = False
+    tile:        int = _opt(0, lo=0)        # px, a multiple of 16; 0 = strips
+    bigtiff:     Optional[bool] = None      # unset = only when the pixels exceed 4 GB
+
+
+@dataclass(frozen=True)
+class CmykSection:
+    file:    Optional[Path] = None
+    profile: Optional[Path] = None          # the printer's press ICC profile
+    intent:  str = _opt("relative", choices=INTENTS)
+    bpc:     bool = True
+    proof:   Optional[Path] = None          # sRGB soft proof of the CMYK file
+
+
+@dataclass(frozen=True)
+class DerivativeSection:
+    path:    Path = _opt(required=True)
+    width:   Optional[int] = _opt(None, lo=16)
+    aspect:  Optional[Pair] = _opt(None, lo=0.01)
+    quality: Optional[int] = _opt(None, lo=1, hi=100)
+
+
+@dataclass(frozen=True)
+class CardSpec:
+    input:       Path = _opt(required=True)
+    output:      Path = _opt(required=True)
+    pdf:         Optional[Path] = None
+    open_viewer: bool = False
+    card:        CardSection = field(default_factory=CardSection)
+    crop:        CropSection = field(default_factory=CropSection)
+    caption:     CaptionSection = field(default_factory=CaptionSection)
+    font:        FontSection = field(default_factory=FontSection)
+    shadow:      ShadowSection = field(default_factory=ShadowSection)
+    vignette:    VignetteSection = field(default_factory=VignetteSection)
+    texture:     TextureSection = field(default_factory=TextureSection)
+    emblem:      EmblemSection = field(default_factory=EmblemSection)
+    palette:     PaletteSection = field(default_factory=PaletteSection)
+    tiff:        TiffSection = field(default_factory=TiffSection)
+    cmyk:        CmykSection = field(default_factory=CmykSection)
+    derivatives: list[DerivativeSection] = _list()
+
+
+# ────────── validation ───────────────────────────────────────────────────────
+
+def _name(typ) -> str:
+    if typ == Color:
+        return "an [r, g, b] colour"
+    if get_origin(typ) is tuple:
+        return f"a list of {len(get_args(typ))} numbers"
+    if get_origin(typ) is list:
+        return "a list"
+    return {bool: "true or false", int: "an integer", float: "a number",
+            str: "a string", Path: "a path"}.get(typ, typ.__name__)
+
+
+def _coerce(value, typ, where, errors):
+    origin, args = get_origin(typ), get_args(typ)
+    if origin is Union:
+        typ = next(a for a in args if a is not type(None))
+        origin, args = get_origin(typ), get_args(typ)
+
+    if is_dataclass(typ):
+        if not isinstance(value, dict):
+            errors.append(f"{where}: must be a table")
+            return typ()
+        return _build(typ, value, where, errors)
+    if origin is list:
+        if args[0] is str and isinstance(value, str):
+            value = [value]
+        if not isinstance(value, list):
+            errors.append(f"{where}: must be {_name(typ)}")
+            return []
+        return [_coerce(v, args[0], f"{where}[{i}]", errors) for i, v in enumerate(value)]
+    if origin is tuple:
+        if not isinstance(value, list) or len(value) != len(args):
+            errors.append(f"{where}: must be {_name(typ)}")
+            return None
+        out = tuple(_coerce(v, a, where, errors) for v, a in zip(value, args))
+        if typ == Color and any(isinstance(c, int) and not 0 <= c <= 255 for c in out):
+            errors.append(f"{where}: colour channels must be 0–255")
+        return out
+    if typ is object:
+        ok = isinstance(value, (int, float)) and not isinstance(value, bool) or \
+            isinstance(value, list) and len(value) == 2
+        if not ok:
+            errors.append(f"{where}: must be a number or [dx, dy]")
+        return tuple(value) if isinstance(value, list) else value
+
+    if typ is bool:
+        ok = isinstance(value, bool)
+    elif typ is int:
+        ok = isinstance(value, int) and not isinstance(value, bool)
+    elif typ is float:
+        ok = isinstance(value, (int, float)) and not isinstance(value, bool)
+        value = float(value) if ok else value
+    elif typ in (str, Path):
+        ok = isinstance(value, str) and (typ is str or value != "")
+        value = Path(value).expanduser() if ok and typ is Path else value
+    else:
+        ok = False
+    if not ok:
+        errors.append(f"{where}: must be {_name(typ)} (got {value!r})")
+    return value
+
+
+def _check_meta(value, meta, where, errors):
+    choices, lo, hi = meta.get("choices"), meta.get("lo"), meta.get("hi")
+    if value is None:
+        return
+    if choices and value not in choices:
+        errors.append(f"{where}: must be one of {', '.join(choices)} (got {value!r})")
+    for v in value if isinstance(value, tuple) else (value,):
+        if not isinstance(v, (int, float)):
+            continue
+        if lo is not None and v < lo or hi is not None and v > hi:
+            bound = f"between {lo} and {hi}" if lo is not None and hi is not None \
+                else f"at least {lo}" if lo is not None else f"at most {hi}"
+            errors.append(f"{where}: must be {bound} (got {v})")
+            break
+
+
+def _build(cls, table: dict, prefix: str, errors):
+    hints = get_type_hints(cls)
+    known = {f.name: f for f in fields(cls)}
+    for key in table.keys() - known.keys():
+        errors.append(f"{prefix}{'.' if prefix else ''}{key}: unknown setting")
+    values = {}
+    for name, f in known.items():
+        where = f"{prefix}{'.' if prefix else ''}{name}"
+        if name not in table:
+            if f.metadata.get("required"):
+                errors.append(f"{where}: required")
+            continue
+        value = _coerce(table[name], hints[name], where, errors)
+        _check_meta(value, f.metadata, where, errors)
+        values[name] = value
+    try:
+        return cls(**values)
+    except TypeError:
+        return cls()
+
+
+def parse(table: dict, source="spec") -> CardSpec:
+    """A CardSpec from a TOML *table*; raises SpecError listing every problem."""
+    errors = []
+    spec = _build(CardSpec, table, "", errors)
+    if spec.cmyk.file and not spec.cmyk.profile:
+        errors.append("cmyk.profile: required when cmyk.file is set (the printer's press profile)")
+    if spec.tiff.tile % 16:
+        errors.append("tiff.tile: must be a multiple of 16")
+    if not spec.caption.lines:
+        errors.append("caption.lines: required")
+    if errors:
+        raise SpecError("\n".join(f"{source}: {e}" for e in errors))
+    return spec
+
+
+def load(path) -> CardSpec:
+    path = Path(path)
+    try:
+        with open(path, "rb") as f:
+            table = tomllib.load(f)
+    except OSError as e:
+        raise SpecError(f"{path}: {e.strerror}") from None
+    except tomllib.TOMLDecodeError as e:
+        raise SpecError(f"{path}: {e}") from None
+    return parse(table, str(path))
+
+
+# ────────── render plan ──────────────────────────────────────────────────────
+
+@dataclass(frozen=True)
+class RenderPlan:
+    """Everything render() needs, resolved once from a spec."""
+    spec:      CardSpec             # with absolute paths
+    name:      str                  # spec file stem
+    font:      object               # fonts.FontFace
+    size:      tuple                # card (w, h) px
+    inner:     tuple                # photo (w, h) px
+    border:    int                  # px
+    ratio:     float                # photo aspect
+
+    @property
+    def title(self) -> str:
+        return " ".join(self.spec.caption.lines)
+
+
+def _resolve(spec, base: Path):
+    """*spec* with every relative Path made relative to *base*."""
+    if isinstance(spec, Path):
+        return spec if spec.is_absolute() else base / spec
+    if isinstance(spec, list):
+        return [_resolve(s, base) for s in spec]
+    if is_dataclass(spec):
+        return replace(spec, **{f.name: _resolve(getattr(spec, f.name), base) for f in fields(spec)})
+    return spec
+
+
+def compile(spec: CardSpec, base=".", name="card") -> RenderPlan:
+    """Resolve *spec* (paths relative to *base*) into a RenderPlan."""
+    from postcard import fonts
+
+    base = Path(base).resolve()
+    spec = _resolve(spec, base)
+    problems = []
+    for label, p in (("input", spec.input), ("texture.file", spec.texture.file if spec.texture.enabled else None),
+                     ("emblem.file", spec.emblem.file), ("cmyk.profile", spec.cmyk.profile)):
+        if p is not None and not p.is_file():
+            problems.append(f"{label}: file not found: {p}")
+
+    font = None
+    dirs = [str(_resolve(Path(d).expanduser(), base)) for d in spec.font.dirs]
+    names = [str(base / n) if (base / n).is_file() else n for n in (spec.font.name, *spec.font.fallbacks)]
+    try:
+        font = fonts.find_first(names, dirs) if spec.font.fallbacks else fonts.find(names[0], dirs)
+    except fonts.FontNotFoundError as e:
+        problems.append(f"font: {e}")
+    if problems:
+        raise SpecError("\n".join(f"{name}: {p}" for p in problems))
+
+    c = spec.card
+    w_in, h_in = c.size_in
+    border = int(c.border_in * c.dpi)
+    inner  = int((w_in - 2 * c.border_in) * c.dpi), int((h_in - 2 * c.border_in) * c.dpi)
+    if min(inner) <= 0:
+        raise SpecError(f"{name}: card.border_in leaves no room for the photo")
+    # the photo is cropped to its own box's aspect, not the card's
+    return RenderPlan(spec, name, font, (inner[0] + 2 * border, inner[1] + 2 * border),
+                      inner, border, inner[0] / inner[1])
+
+
+def load_plan(path) -> RenderPlan:
+    """`load` + `compile` for the spec file at *path*."""
+    path = Path(path)
+    return compile(load(path), path.parent, path.stem)
@@ -0,0 +1,200 @@
+"""
+Content‑addressed cache of pipeline stage results.
+
+The expensive part of a card is the photo – decode, colour conversion,
+crop and resample – and it depends only on the source bytes and a few
+settings, never on the caption, shadow, texture or emblem. Its result is
+kept on disk under a key hashing the source file's contents, the stage
+name and every parameter that stage reads, so editing a caption or a
+shadow colour re‑runs just the overlay layers, while a changed photo or
+print size can never be served stale.
+
+Entries are raw pixel buffers behind a page‑sized JSON header. A hit
+maps the file and Pillow unpacks the pixels straight from the page cache
+– no decoder, no intermediate copy. The cache is bounded: every hit
+touches the entry's mtime and each store evicts least recently used
+entries past STAGE_CACHE_BYTES (POSTCARD_STAGE_CACHE_MB). Hits, misses,
+evictions and the render time hits saved are counted in stats.json for
+`postcard cache stats`.
+
+Like the other disk caches this is best effort: an unreadable or
+unwritable entry is a miss, never an error.
+"""
+
+import json
+import mmap
+import os
+import time
+from hashlib import sha1
+from pathlib import Path
+from PIL import Image
+from postcard import CACHE_DIR
+
+STAGE_CACHE_DIR   = CACHE_DIR / "stages"
+STAGE_CACHE_BYTES = int(float(os.environ.get("POSTCARD_STAGE_CACHE_MB", 2048)) * 2**20)
+STATS_FILE        = STAGE_CACHE_DIR / "stats.json"
+VERSION           = 3               # bump when a cached stage's output changes
+HEADER            = 4096            # pixels start page aligned
+MAGIC             = b"PCSTAGE1"
+_SUFFIX           = ".px"
+
+_digests = {}
+
+
+def file_digest(path: Path) -> str:
+    """sha1 of the file contents (memoised per path, size and mtime)."""
+    st  = os.stat(path)
+    key = (str(Path(path).resolve()), st.st_size, st.st_mtime_ns)
+    if key not in _digests:
+        h = sha1()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+        _digests[key] = h.hexdigest()
+    return _digests[key]
+
+
+def key(stage: str, **params) -> str:
+    """Cache key for *stage* run with *params* (include a source's file digest)."""
+    text = json.dumps(dict(params, stage=stage, version=VERSION), sort_keys=True, default=str)
+    return sha1(text.encode()).hexdigest()
+
+
+def _path(k: str) -> Path:
+    return STAGE_CACHE_DIR / f"{k}{_SUFFIX}"
+
+
+def _entries():
+    try:
+        return [p for p in STAGE_CACHE_DIR.iterdir() if p.suffix == _SUFFIX]
+    except OSError:
+        return []
+
+
+def _count(**deltas):
+    """Add *deltas* to the counters in stats.json."""
+    try:
+        stats = json.loads(STATS_FILE.read_text())
+    except (OSError, ValueError):
+        stats = {}
+    for name, d in deltas.items():
+        stats[name] = stats.get(name, 0) + d
+    try:
+        STAGE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp = STATS_FILE.with_name(f".{STATS_FILE.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(stats))
+        os.replace(tmp, STATS_FILE)
+    except OSError:
+        pass
+
+
+def get(k: str):
+    """(image, meta) cached under *k*, or None."""
+    path = _path(k)
+    try:
+        with open(path, "rb") as f:
+            head = f.read(HEADER)
+            if not head.startswith(MAGIC):
+                raise ValueError("not a stage cache entry")
+            meta = json.loads(head[len(MAGIC):].rstrip(b"\0"))
+            mode, size = meta["mode"], tuple(meta["size"])
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                with memoryview(mm)[HEADER:] as pixels:
+                    img = Image.frombytes(mode, size, pixels)
+        os.utime(path)                                      # most recently used
+    except (OSError, ValueError, KeyError):
+        _count(misses=1)
+        return None
+    _count(hits=1, saved_s=meta.get("seconds", 0.0))
+    return img, meta["meta"]
+
+
+def put(k: str, img: Image.Image, meta: dict, seconds: float = 0.0):
+    """Store *img* (and JSON‑able *meta*) under *k*; *seconds* is what it took to make."""
+    head = MAGIC + json.dumps(dict(mode=img.mode, size=img.size, meta=meta,
+                                   seconds=round(seconds, 3))).encode()
+    if len(head) > HEADER:
+        raise ValueError("stage cache metadata is too large")
+    path = _path(k)
+    try:
+        STAGE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        with open(tmp, "wb") as f:
+            f.write(head.ljust(HEADER, b"\0"))
+            f.write(img.tobytes())
+        os.replace(tmp, path)
+    except OSError:
+        return
+    evict(STAGE_CACHE_BYTES, keep=path)
+
+
+def evict(limit: int = STAGE_CACHE_BYTES, keep: Path = None) -> int:
+    """Drop least recently used entries until the cache fits *limit* bytes."""
+    files = []
+    for p in _entries():
+        try:
+            st = p.stat()
+        except OSError:
+            continue
+        files.append((st.st_mtime, st.st_size, p))
+    total   = sum(size for _, size, _ in files)
+    removed = 0
+    for _, size, p in sorted(files):
+        if total <= limit:
+            break
+        if p == keep:
+            continue
+        try:
+            p.unlink()
+        except OSError:
+            continue
+        total   -= size
+        removed += 1
+    if removed:
+        _count(evictions=removed)
+    return removed
+
+
+def stats() -> dict:
+    """Entries, bytes, limit and the lifetime counters."""
+    files = []
+    for p in _entries():
+        try:
+            files.append(p.stat())
+        except OSError:
+            pass
+    try:
+        counters = json.loads(STATS_FILE.read_text())
+    except (OSError, ValueError):
+        counters = {}
+    return dict(dir=str(STAGE_CACHE_DIR), entries=len(files), bytes=sum(s.st_size for s in files),
+                limit=STAGE_CACHE_BYTES,
+                oldest=min((s.st_mtime for s in files), default=None),
+                newest=max((s.st_mtime for s in files), default=None),
+                hits=counters.get("hits", 0), misses=counters.get("misses", 0),
+                evictions=counters.get("evictions", 0), saved_s=counters.get("saved_s", 0.0))
+
+
+def clear() -> int:
+    """Remove every entry and reset the counters; returns the entries removed."""
+    removed = 0
+    for p in _entries():
+        try:
+            p.unlink()
+            removed += 1
+        except OSError:
+            pass
+    STATS_FILE.unlink(missing_ok=True)
+    return removed
+
+
+def summary() -> str:
+    s     = stats()
+    ago   = lambda t: "–" if t is None else f"{(time.time() - t) / 3600:.1f} h ago"
+    looks = s["hits"] + s["misses"]
+    rate  = f" ({s['hits'] / looks:.0%})" if looks else ""
+    return (f"{s['dir']}\n"
+            f"  {s['entries']} entries, {s['bytes'] / 2**20:.1f} of {s['limit'] / 2**20:.0f} MiB\n"
+            f"  last used {ago(s['newest'])}, least recently {ago(s['oldest'])}\n"
+            f"  {s['hits']} hits{rate}, {s['misses']} misses, {s['evictions']} evicted; "
+            f"hits saved {s['saved_s']:.1f}s")
@@ -0,0 +1,155 @@
+"""
+Streaming SVG recolouring.
+
+Colour values in `fill` / `stroke` / `stop-color` / `flood-color` /
+`color` attributes and in style declarations (inline `style="…"` and
+<style> CSS) are mapped through a palette: an ordered {key: replacement}
+dict whose keys are any CSS colour Pillow understands (hex, rgb(), hsl(),
+named) plus "*" as the catch‑all. A colour matches a key when every
+channel is within *tolerance* of it; the first match wins and a None
+replacement removes the declaration. Values that are not colours
+("none", "currentColor", "url(#grad)") are left alone – gradients are
+recoloured through their <stop> colours instead.
+
+Files are streamed in CHUNK_SIZE pieces, cut after the last '>' or '}'
+so no declaration is split, which keeps memory bounded on huge traces.
+One regex pass covers attributes and declarations, and since traced SVGs
+reuse a handful of colours each distinct value string is classified once.
+Output goes to a temp file beside the target and is moved into place only
+if something changed.
+"""
+
+import os
+import re
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from PIL import ImageColor
+
+CHUNK_SIZE = 1 << 20
+PROPS = "fill|stroke|stop-color|flood-color|color"
+
+DEFAULT_PALETTE = {
+    "white": None,          # near‑white → removed
+    "*":     "#001f3f",     # everything else → navy
+}
+
+# prop="value" (attribute) or prop: value (style declaration / CSS)
+_DECL_RE  = re.compile(rf"""(?<![\w-])({PROPS})\s*(?:=\s*(["'])([^"']*)\2"""
+                       rf"""|:\s*([^;"'}}>]*?)\s*(;|(?=["'}}])))""")
+_BARE_HEX = re.compile(r"[0-9a-fA-F]{3}|[0-9a-fA-F]{6}")
+
+
+def parse_color(value: str):
+    """(r, g, b) for a CSS colour value, or None if it isn't one."""
+    value = value.strip()
+    if _BARE_HEX.fullmatch(value):
+        value = "#" + value          # traced files sometimes drop the '#'
+    try:
+        return ImageColor.getrgb(value)[:3]
+    except ValueError:
+        return None
+
+
+class Recolorer:
+    """Palette mapping with a per‑value memo; `.counts` tallies the results."""
+
+    def __init__(self, palette=None, tolerance: int = 20):
+        palette = DEFAULT_PALETTE if palette is None else palette
+        self.rules = []
+        for key, new in palette.items():
+            rgb = None if key == "*" else parse_color(key)
+            if key != "*" and rgb is None:
+                raise ValueError(f"palette key {key!r} is not a colour")
+            self.rules.append((rgb, new))
+        self.tolerance = tolerance
+        self.counts = Counter()
+        self._memo = {}
+
+    def map(self, value: str):
+        """Replacement for *value*: a colour string, None (remove) or *value*."""
+        try:
+            return self._memo[value]
+        except KeyError:
+            pass
+        new, rgb = value, parse_color(value)
+        if rgb is not None:
+            for key, repl in self.rules:
+                if key is None or all(abs(a - b) < self.tolerance for a, b in zip(rgb, key)):
+                    new = repl
+                    break
+        self._memo[value] = new
+        return new
+
+    def _decl(self, m):
+        prop, quote, attr_value, style_value, end = m.groups()
+        value = attr_value if quote else style_value
+        new = self.map(value)
+        if new == value:
+            return m.group(0)
+        self.counts["removed" if new is None else "recoloured"] += 1
+        if new is None:
+            return ""
+        return f"{prop}={quote}{new}{quote}" if quote else f"{prop}:{new}{end}"
+
+    def sub(self, text: str) -> str:
+        return _DECL_RE.sub(self._decl, text)
+
+    def stream(self, src, dst):
+        """Recolour text file object *src* into *dst* chunk by chunk."""
+        tail = ""
+        while chunk := src.read(CHUNK_SIZE):
+            buf = tail + chunk
+            cut = max(buf.rfind(">"), buf.rfind("}")) + 1
+            dst.write(self.sub(buf[:cut]))
+            tail = buf[cut:]
+        dst.write(self.sub(tail))
+
+
+def recolor_file(path, palette=None, tolerance: int = 20, suffix: str = ""):
+    """
+    Recolour one SVG; writes `<stem><suffix>.svg` (in place when suffix is
+    "") atomically and only when changed. Returns (output path or None,
+    counts).
+    """
+    path = Path(path)
+    out  = path.with_name(f"{path.stem}{suffix}{path.suffix}")
+    rc   = Recolorer(palette, tolerance)
+    tmp  = out.with_name(f".{out.name}.{os.getpid()}.tmp")
+    try:
+        with open(path, encoding="utf-8", newline="") as src, \
+                open(tmp, "w", encoding="utf-8", newline="") as dst:
+            rc.stream(src, dst)
+        if not rc.counts and out == path:
+            tmp.unlink()
+            return None, rc.counts
+        os.replace(tmp, out)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    return out, rc.counts
+
+
+def svg_files(paths, suffix: str = ""):
+    """Expand *paths* (files or directories, searched recursively)."""
+    for p in map(Path, paths):
+        if p.is_dir():
+            for f in sorted(p.rglob("*.svg")):
+                if not (suffix and f.stem.endswith(suffix)):
+                    yield f
+        else:
+            yield p
+
+
+def recolor_all(paths, palette=None, tolerance: int = 20, suffix: str = "", workers=None):
+    """Recolour every SVG under *paths* across a process pool; yields
+    (source, output or None, counts) in file order."""
+    files = list(svg_files(paths, suffix))
+    if len(files) <= 1 or workers == 1:
+        for f in files:
+            yield (f, *recolor_file(f, palette, tolerance, suffix))
+        return
+    with ProcessPoolExecutor(workers) as pool:
+        jobs = [(f, pool.submit(recolor_file, f, palette, tolerance, suffix)) for f in files]
+        for f, job in jobs:
+            yield (f, *job.result())
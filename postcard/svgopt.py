@@ -0,0 +1,605 @@
+"""
+SVG path optimiser for traced vector assets.
+
+Every <path> is parsed to absolute segments and rewritten:
+• a `translate()` transform is baked into the coordinates
+• curves whose control points lie on the chord become lines, runs of
+  collinear lines are merged and zero‑length segments dropped – all
+  within the simplification share of *tolerance*
+• numbers are rounded to the precision the other share allows; each
+  segment is written relative or absolute, whichever is shorter, with
+  H/V/S/T shorthands and repeated command letters omitted
+• adjacent sibling paths with identical attributes are merged when their
+  bounding boxes don't overlap (so fill‑rule semantics can't change)
+• invisible shapes and a leading full‑canvas background rectangle are
+  dropped
+
+Rounding is applied to absolute positions and relative offsets are taken
+between rounded points, so errors never accumulate along a path. The
+reported max error is a bound: simplification error plus the largest
+rounding displacement of any point (a Bézier moves no further than its
+control points do). `optimize_file` can recolour first (svgcolor palette
+map), so freshly unified fills merge, and still writes each file once.
+"""
+
+import os
+import re
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from io import StringIO
+from math import ceil, hypot, log10, sqrt
+from pathlib import Path
+from postcard.svgcolor import Recolorer, svg_files
+
+SVG_NS = "http://www.w3.org/2000/svg"
+DEFAULT_TOLERANCE = 0.1    # px
+
+_CONTAINERS = {"svg", "g", "a"}
+_TEXTISH    = {"text", "tspan", "textPath", "style", "script", "title", "desc"}
+_NUMBER     = re.compile(r"[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?")
+_TRANSLATE  = re.compile(r"\s*translate\(\s*([^,\s)]+)(?:[\s,]+([^\s)]+))?\s*\)\s*")
+_ARGS = {"M": 2, "L": 2, "H": 1, "V": 1, "C": 6, "S": 4, "Q": 4, "T": 2, "A": 7, "Z": 0}
+
+
+@dataclass
+class OptimizeReport:
+    path:       Path
+    bytes_in:   int = 0
+    bytes_out:  int = 0
+    max_error:  float = 0.0
+    paths_in:   int = 0
+    paths_out:  int = 0
+    dropped:    int = 0
+
+    def summary(self):
+        saved = self.bytes_in - self.bytes_out
+        pct   = 100 * saved / (self.bytes_in or 1)
+        return (f"{self.bytes_in:,} → {self.bytes_out:,} bytes ({saved:,} saved, {pct:.0f}%), "
+                f"{self.paths_in} → {self.paths_out} paths, {self.dropped} dropped, "
+                f"max error {self.max_error:.3g}px")
+
+
+# ────────── path data ────────────────────────────────────────────────────────
+
+def parse_path(d: str):
+    """Path data → absolute segments: (M x y) (L x y) (C x1 y1 x2 y2 x y)
+    (Q x1 y1 x y) (A rx ry rot large sweep x y) (Z); S/T/H/V are expanded."""
+    segs, i, n = [], 0, len(d)
+    cmd = None
+    cx = cy = sx = sy = 0.0
+    prev_c = prev_q = None
+
+    def number():
+        nonlocal i
+        while i < n and d[i] in " \t\r\n,":
+            i += 1
+        m = _NUMBER.match(d, i)
+        if not m:
+            raise ValueError(f"bad path data near {d[i:i + 20]!r}")
+        i = m.end()
+        return float(m.group())
+
+    def flag():
+        nonlocal i
+        while i < n and d[i] in " \t\r\n,":
+            i += 1
+        if i >= n or d[i] not in "01":
+            raise ValueError(f"bad arc flag near {d[i:i + 20]!r}")
+        i += 1
+        return int(d[i - 1])
+
+    while True:
+        while i < n and d[i] in " \t\r\n,":
+            i += 1
+        if i >= n:
+            break
+        if d[i].isalpha():
+            cmd = d[i]
+            i += 1
+            if cmd.upper() not in _ARGS:
+                raise ValueError(f"unknown path command {cmd!r}")
+        elif cmd is None:
+            raise ValueError("path data must start with a command")
+        up, rel = cmd.upper(), cmd.islower()
+        ox, oy = (cx, cy) if rel else (0.0, 0.0)
+
+        if up == "Z":
+            segs.append(("Z",))
+            cx, cy = sx, sy
+            prev_c = prev_q = None
+            continue
+        if up == "A":
+            rx, ry, rot = number(), number(), number()
+            large, sweep = flag(), flag()
+            x, y = number() + ox, number() + oy
+            segs.append(("A", abs(rx), abs(ry), rot, large, sweep, x, y))
+            cx, cy = x, y
+            prev_c = prev_q = None
+            continue
+
+        args = [number() for _ in range(_ARGS[up])]
+        if up == "H":
+            args = [args[0] + ox, cy]
+        elif up == "V":
+            args = [cx, args[0] + oy]
+        else:
+            args = [v + (ox if k % 2 == 0 else oy) for k, v in enumerate(args)]
+
+        if up == "M":
+            segs.append(("M", *args))
+            sx, sy = args
+            cmd = "l" if rel else "L"           # implicit lineto after moveto
+        elif up in ("L", "H", "V"):
+            segs.append(("L", *args))
+        elif up in ("C", "S"):
+            if up == "S":
+                r = prev_c or (cx, cy)
+                args = [2 * cx - r[0], 2 * cy - r[1], *args]
+            segs.append(("C", *args))
+        else:
+            if up == "T":
+                r = prev_q or (cx, cy)
+                args = [2 * cx - r[0], 2 * cy - r[1], *args]
+            segs.append(("Q", *args))
+        cx, cy = args[-2], args[-1]
+        prev_c = (args[2], args[3]) if up in ("C", "S") else None
+        prev_q = (args[0], args[1]) if up in ("Q", "T") else None
+    return segs
+
+
+def translate(segs, tx, ty):
+    out = []
+    for s in segs:
+        if s[0] == "A":
+            out.append((*s[:6], s[6] + tx, s[7] + ty))
+        else:
+            out.append((s[0], *(v + (tx if k % 2 == 0 else ty) for k, v in enumerate(s[1:]))))
+    return out
+
+
+def points(segs):
+    """Every end and control point (the convex‑hull superset of the path)."""
+    for s in segs:
+        if s[0] == "A":
+            yield s[6], s[7]
+        else:
+            yield from zip(s[1::2], s[2::2])
+
+
+def bbox(segs):
+    pts = list(points(segs))
+    if not pts:
+        return None
+    xs, ys = [p[0] for p in pts], [p[1] for p in pts]
+    # arcs can bulge past their end points by up to their radii
+    pad = max((max(s[1], s[2]) for s in segs if s[0] == "A"), default=0)
+    return min(xs) - pad, min(ys) - pad, max(xs) + pad, max(ys) + pad
+
+
+def _dist_to_segment(p, a, b):
+    (px, py), (ax, ay), (bx, by) = p, a, b
+    dx, dy = bx - ax, by - ay
+    L2 = dx * dx + dy * dy
+    t  = 0.0 if L2 == 0 else max(0.0, min(1.0, ((px - ax) * dx + (py - ay) * dy) / L2))
+    return hypot(px - ax - t * dx, py - ay - t * dy)
+
+
+def simplify(segs, tol: float):
+    """
+    Collapse straight curves, collinear line runs and zero‑length segments.
+    Curves and line runs each get half of *tol*; returns (segments, bound
+    on the displacement).
+    """
+    out = []
+    curve_err = line_err = 0.0
+    cur = start = (0.0, 0.0)
+    run = []            # original vertices along the trailing run of lines
+
+    for s in segs:
+        kind = s[0]
+        if kind == "M":
+            if out and out[-1][0] == "M":
+                out.pop()                               # empty subpath
+            out.append(s)
+            cur = start = s[1:]
+            run = []
+            continue
+        if kind == "Z":
+            if out and out[-1][0] == "L" and out[-1][1:] == start:
+                out.pop()                               # Z draws that line
+            out.append(s)
+            cur, run = start, []
+            continue
+
+        end = (s[-2], s[-1])
+        if kind in ("C", "Q"):
+            ctrl = list(zip(s[1:-2:2], s[2:-2:2]))
+            d = max(_dist_to_segment(c, cur, end) for c in ctrl)
+            if d <= tol / 2:
+                curve_err = max(curve_err, d)
+                kind, s = "L", ("L", *end)
+        elif kind == "A" and (s[1] == 0 or s[2] == 0):
+            kind, s = "L", ("L", *end)              # zero radius: a straight line
+
+        if kind == "L":
+            if end == cur:
+                continue
+            if run and out[-1][0] == "L":
+                d = max(_dist_to_segment(p, run[0], end) for p in run[1:] + [cur])
+                if d <= tol / 2:
+                    line_err = max(line_err, d)
+                    run.append(cur)
+                    out[-1] = s
+                    cur = end
+                    continue
+            run = [cur]
+        elif end == cur and kind == "A":
+            continue                                    # spec: arc to itself is omitted
+        else:
+            run = []
+        out.append(s)
+        cur = end
+    if out and out[-1][0] == "M":
+        out.pop()
+    return out, curve_err + line_err
+
+
+def _fmt(v: float, digits: int) -> str:
+    s = f"{v:.{digits}f}"
+    if "." in s:
+        s = s.rstrip("0").rstrip(".")
+    if s in ("-0", ""):
+        s = "0"
+    if s.startswith("0."):
+        s = s[1:]
+    elif s.startswith("-0."):
+        s = "-" + s[2:]
+    return s
+
+
+def _pack(tokens, prev=None):
+    """Concatenate command letters and numbers with the fewest separators.
+    *prev* is the last token already written; returns (text, last token)."""
+    out = []
+    for t in tokens:
+        if prev is not None and not t[0].isalpha() and not prev[-1].isalpha():
+            if not (t[0] == "-" or (t[0] == "." and "." in prev and "e" not in prev.lower())):
+                out.append(" ")
+        out.append(t)
+        prev = t
+    return "".join(out), prev
+
+
+def serialize(segs, digits: int):
+    """Shortest path data for absolute *segs*; returns (d, max rounding error)."""
+    def rnd(v):
+        return round(v, digits)
+
+    parts, err = [], 0.0
+    last_cmd = last_tok = None
+    cx = cy = sx = sy = 0.0
+    prev_c = prev_q = None
+
+    for s in segs:
+        kind = s[0]
+        if kind == "Z":
+            if last_cmd != "z":
+                parts.append("z")
+                last_cmd = last_tok = "z"
+            cx, cy, prev_c, prev_q = sx, sy, None, None
+            continue
+
+        if kind == "A":
+            vals = [rnd(s[1]), rnd(s[2]), rnd(s[3]), s[4], s[5], rnd(s[6]), rnd(s[7])]
+            xys  = [(5, 6)]
+        else:
+            vals = [rnd(v) for v in s[1:]]
+            xys  = [(k, k + 1) for k in range(0, len(vals), 2)]
+        for kx, ky in xys:
+            err = max(err, hypot(vals[kx] - s[kx + 1], vals[ky] - s[ky + 1]))
+
+        cmd, args = kind, vals
+        if kind == "L" and vals[1] == cy:
+            cmd, args = "H", [vals[0]]
+        elif kind == "L" and vals[0] == cx:
+            cmd, args = "V", [vals[1]]
+        elif kind == "C" and prev_c and \
+                vals[:2] == [rnd(2 * cx - prev_c[0]), rnd(2 * cy - prev_c[1])]:
+            cmd, args = "S", vals[2:]
+        elif kind == "Q":
+            r = prev_q or (cx, cy)
+            if vals[:2] == [rnd(2 * cx - r[0]), rnd(2 * cy - r[1])]:
+                cmd, args = "T", vals[2:]
+
+        if cmd == "H":
+            rel = [args[0] - cx]
+        elif cmd == "V":
+            rel = [args[0] - cy]
+        elif cmd == "A":
+            rel = args[:5] + [args[5] - cx, args[6] - cy]
+        else:
+            rel = [v - (cx if k % 2 == 0 else cy) for k, v in enumerate(args)]
+
+        best = None
+        for letter, values in ((cmd, args), (cmd.lower(), [rnd(v) for v in rel])):
+            nums = [str(int(v)) if cmd == "A" and k in (3, 4) else _fmt(v, digits)
+                    for k, v in enumerate(values)]
+            implicit = {"M": "L", "m": "l"}.get(last_cmd, last_cmd)
+            head = [] if letter == implicit else [letter]
+            text, tok = _pack(head + nums, last_tok)
+            if best is None or len(text) < len(best[0]):
+                best = text, tok, letter
+        parts.append(best[0])
+        last_tok, last_cmd = best[1], best[2]
+
+        if kind == "M":
+            sx, sy = vals
+        cx, cy = vals[-2], vals[-1]
+        prev_c = (vals[2], vals[3]) if kind == "C" else None
+        prev_q = (vals[0], vals[1]) if kind == "Q" else None
+    return "".join(parts), err
+
+
+# ────────── document ─────────────────────────────────────────────────────────
+
+def local_name(tag) -> str:
+    return tag.rsplit("}", 1)[-1] if isinstance(tag, str) else ""
+
+
+def style_prop(el, name):
+    """Presentation property from `style` (wins) or the attribute."""
+    for decl in el.get("style", "").split(";"):
+        k, _, v = decl.partition(":")
+        if k.strip() == name:
+            return v.strip()
+    return el.get(name)
+
+
+def _zero(v) -> bool:
+    try:
+        return v is not None and float(v.rstrip("%")) == 0
+    except ValueError:
+        return False
+
+
+# inherited presentation properties, with their initial values
+_INHERITED = {"fill": "black", "fill-opacity": "1", "stroke": "none", "stroke-opacity": "1",
+              "stroke-width": "1", "visibility": "visible"}
+_ROOT      = dict(_INHERITED, hidden=False, unresolved=False)
+
+
+def computed(el, inherited=_ROOT) -> dict:
+    """*el*'s inherited properties given its parent's *inherited* ones.
+    `hidden` carries an ancestor's display:none / opacity 0 down the tree;
+    `unresolved` marks anything a style sheet could restyle: a node with a
+    class, or every node once the document has a <style> (see optimize_svg)."""
+    props = dict(inherited)
+    for name in _INHERITED:
+        v = style_prop(el, name)
+        if v is not None and v != "inherit":
+            props[name] = v
+    if style_prop(el, "display") == "none" or _zero(style_prop(el, "opacity")):
+        props["hidden"] = True
+    if el.get("class"):
+        props["unresolved"] = True
+    return props
+
+
+def invisible(el, inherited=_ROOT) -> bool:
+    """True if *el* paints nothing, judged on computed values; anything a
+    class could still change counts as visible."""
+    p = computed(el, inherited)
+    if p["unresolved"]:
+        return False
+    if p["hidden"] or p["visibility"] in ("hidden", "collapse"):
+        return True
+    no_fill   = p["fill"] in ("none", "transparent") or _zero(p["fill-opacity"])
+    no_stroke = p["stroke"] in ("none", "transparent") \
+        or _zero(p["stroke-opacity"]) or _zero(p["stroke-width"])
+    return no_fill and no_stroke
+
+
+def _canvas(root):
+    """(x0, y0, x1, y1) of the drawing area, or None if it can't be told."""
+    vb = root.get("viewBox")
+    try:
+        if vb:
+            x, y, w, h = (float(v) for v in vb.replace(",", " ").split())
+            return x, y, x + w, y + h
+        w, h = (float(root.get(k, "").removesuffix("px")) for k in ("width", "height"))
+        return 0.0, 0.0, w, h
+    except ValueError:
+        return None
+
+
+def _covers(box, canvas, tol) -> bool:
+    return (box[0] <= canvas[0] + tol and box[1] <= canvas[1] + tol
+            and box[2] >= canvas[2] - tol and box[3] >= canvas[3] - tol)
+
+
+def _is_background(el, segs, canvas, tol) -> bool:
+    """A plain rectangle (path or <rect>) covering the whole canvas."""
+    if canvas is None:
+        return False
+    if local_name(el.tag) == "rect":
+        if el.get("transform") or el.get("rx") or el.get("ry"):
+            return False
+        try:
+            x, y = float(el.get("x", 0)), float(el.get("y", 0))
+            box = (x, y, x + float(el.get("width")), y + float(el.get("height")))
+        except (TypeError, ValueError):
+            return False
+        return _covers(box, canvas, tol)
+    if segs is None or sum(s[0] == "M" for s in segs) != 1 \
+            or any(s[0] not in ("M", "L", "Z") for s in segs):
+        return False
+    box = bbox(segs)
+    return _covers(box, canvas, tol) and all(
+        min(abs(x - box[0]), abs(x - box[2]), abs(y - box[1]), abs(y - box[3])) <= tol
+        for x, y in points(segs))
+
+
+def _disjoint(a, b) -> bool:
+    return a[2] < b[0] or b[2] < a[0] or a[3] < b[1] or b[3] < a[1]
+
+
+class _Pass:
+    def __init__(self, root, tolerance, drop_background):
+        self.tol      = tolerance
+        self.digits   = max(0, ceil(log10(sqrt(2) / tolerance)))   # rounding ≤ tol / 2
+        self.canvas   = _canvas(root)
+        self.drop_bg  = drop_background
+        self.painted  = False
+        self.error    = 0.0     # simplification bound
+        self.rounding = 0.0     # largest rounding displacement
+        self.dropped  = 0
+        self.segs     = {}      # path element → simplified absolute segments
+
+    def _path(self, el):
+        try:
+            segs = parse_path(el.get("d", ""))
+        except ValueError:
+            return None                                 # leave malformed data alone
+        m = _TRANSLATE.fullmatch(el.get("transform", "")) if el.get("transform") else None
+        if m:
+            try:
+                tx, ty = float(m.group(1)), float(m.group(2) or 0)
+            except ValueError:
+                tx = ty = None
+            if tx is not None:
+                segs = translate(segs, tx, ty)
+                del el.attrib["transform"]
+        segs, err = simplify(segs, self.tol / 2)
+        self.error = max(self.error, err)
+        return segs
+
+    def visit(self, parent, inherited=_ROOT):
+        for el in list(parent):
+            kind = local_name(el.tag)
+            if kind in ("path", "rect", "circle", "ellipse", "polygon", "polyline", "line"):
+                segs = self._path(el) if kind == "path" else None
+                empty = kind == "path" and segs is not None and \
+                    not any(s[0] not in ("M", "Z") for s in segs)
+                drop = el.get("id") is None and (
+                    empty or invisible(el, inherited) or
+                    (self.drop_bg and not self.painted
+                     and _is_background(el, segs, self.canvas, self.tol)))
+                if drop:
+                    parent.remove(el)
+                    self.dropped += 1
+                    continue
+                if segs is not None:
+                    self.segs[el] = segs
+                self.painted = True
+            elif kind in _CONTAINERS:
+                self.visit(el, computed(el, inherited))
+            elif kind not in ("defs", "title", "desc", "metadata", "style", "script"):
+                self.painted = True
+        self._merge(parent, inherited)
+
+    def _merge(self, parent, inherited=_ROOT):
+        """Fold runs of sibling paths with equal attributes and disjoint boxes."""
+        group, boxes = None, []
+        for el in list(parent):
+            segs = self.segs.get(el)
+            p  = segs is not None and computed(el, inherited)
+            ok = segs is not None and el.get("id") is None and \
+                p["stroke"] in ("none", "transparent") and not p["unresolved"]
+            box = bbox(segs) if ok else None
+            if ok and group is not None and box and \
+                    {k: v for k, v in el.attrib.items() if k != "d"} == \
+                    {k: v for k, v in group.attrib.items() if k != "d"} and \
+                    all(_disjoint(box, b) for b in boxes):
+                self.segs[group] = self.segs[group] + segs
+                boxes.append(box)
+                group.tail = el.tail
+                parent.remove(el)
+                del self.segs[el]
+                continue
+            group, boxes = (el, [box]) if ok and box else (None, [])
+
+    def write_paths(self):
+        for el, segs in self.segs.items():
+            d, err = serialize(segs, self.digits)
+            el.set("d", d)
+            self.rounding = max(self.rounding, err)
+
+
+def _register_namespaces(text: str):
+    for _, (prefix, uri) in ET.iterparse(StringIO(text), events=("start-ns",)):
+        try:
+            ET.register_namespace(prefix, uri)
+        except ValueError:
+            pass            # reserved "nsN" prefixes
+
+
+def optimize_svg(text: str, tolerance: float = DEFAULT_TOLERANCE, drop_background=True):
+    """Optimised SVG text and an OptimizeReport (path left as None)."""
+    _register_namespaces(text)
+    root = ET.fromstring(text)
+    report = OptimizeReport(None, bytes_in=len(text.encode()))
+    report.paths_in = sum(1 for el in root.iter() if local_name(el.tag) == "path")
+
+    # a <style> sheet can restyle any node (type selectors need no class)
+    sheet = any(local_name(el.tag) == "style" for el in root.iter())
+    p = _Pass(root, tolerance, drop_background)
+    p.visit(root, computed(root, dict(_ROOT, unresolved=sheet)))
+    p.write_paths()
+
+    parents = {c: el for el in root.iter() for c in el}
+    for el in root.iter():
+        textish = local_name(el.tag) in _TEXTISH
+        if el.text and not el.text.strip() and not textish:
+            el.text = None
+        up = parents.get(el)
+        if el.tail and not el.tail.strip() and (up is None or local_name(up.tag) not in _TEXTISH):
+            el.tail = None
+
+    out = ET.tostring(root, encoding="unicode")
+    report.bytes_out = len(out.encode())
+    report.paths_out = sum(1 for el in root.iter() if local_name(el.tag) == "path")
+    report.dropped   = p.dropped
+    report.max_error = p.error + p.rounding
+    return out, report
+
+
+def optimize_file(path, palette=None, color_tolerance: int = 20, suffix: str = "",
+                  tolerance: float = DEFAULT_TOLERANCE, drop_background=True):
+    """
+    Recolour (when *palette* is given) and optimise one SVG, writing
+    `<stem><suffix>.svg` once, atomically, and only when it changed.
+    """
+    path = Path(path)
+    out  = path.with_name(f"{path.stem}{suffix}{path.suffix}")
+    text = path.read_text(encoding="utf-8")
+    new  = Recolorer(palette, color_tolerance).sub(text) if palette is not None else text
+    new, report = optimize_svg(new, tolerance, drop_background)
+    report.path, report.bytes_in = out, len(text.encode())
+    if new == text and out == path:
+        report.path = None
+        return report
+    tmp = out.with_name(f".{out.name}.{os.getpid()}.tmp")
+    try:
+        tmp.write_text(new, encoding="utf-8")
+        os.replace(tmp, out)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    return report
+
+
+def optimize_all(paths, palette=None, color_tolerance: int = 20, suffix: str = "",
+                 tolerance: float = DEFAULT_TOLERANCE, drop_background=True, workers=None):
+    """`optimize_file` over every SVG under *paths* (process pool); yields
+    (source, OptimizeReport) in file order."""
+    files = list(svg_files(paths, suffix))
+    args  = (palette, color_tolerance, suffix, tolerance, drop_background)
+    if len(files) <= 1 or workers == 1:
+        for f in files:
+            yield f, optimize_file(f, *args)
+        return
+    with ProcessPoolExecutor(workers) as pool:
+        jobs = [(f, pool.submit(optimize_file, f, *args)) for f in files]
+        for f, job in jobs:
+            yield f, job.result()
@@ -0,0 +1,104 @@
+"""
+Paper‑texture overlay.
+
+A texture tile (e.g. paper-fibers.png) is flattened to grey, tiled or
+scaled to the output size and levelled for its blend mode:
+• multiply     – fibres darken from white (range 191‥255)
+• overlay      – centred on neutral 128 (range 96‥160)
+• soft-light   – as overlay, gentler falloff
+Prepared textures are cached per (texture file, size, fit, mode) in memory
+and as PNGs on disk, so a batch builds each one once.
+"""
+
+import os
+from functools import lru_cache
+from hashlib import sha1
+from pathlib import Path
+from PIL import Image, ImageChops, ImageOps
+from postcard import CACHE_DIR
+
+TEXTURE_CACHE_DIR = CACHE_DIR / "textures"
+TEXTURE_CACHE_SIZE = 8
+
+BLENDS = {
+    "multiply":   (ImageChops.multiply,   (191, 255)),
+    "overlay":    (ImageChops.overlay,    (96, 160)),
+    "soft-light": (ImageChops.soft_light, (96, 160)),
+}
+FITS = ("tile", "scale")
+
+
+def _flatten(path: Path) -> Image.Image:
+    """Texture → "L", alpha composited over white."""
+    with Image.open(path) as im:
+        im = im.convert("RGBA")
+    paper = Image.new("RGBA", im.size, (255, 255, 255, 255))
+    return Image.alpha_composite(paper, im).convert("L")
+
+
+def _fit(tex: Image.Image, size, fit: str) -> Image.Image:
+    if fit == "scale":
+        return ImageOps.fit(tex, size, Image.LANCZOS)
+    out = Image.new("L", size)
+    tw, th = tex.size
+    for y in range(0, size[1], th):
+        for x in range(0, size[0], tw):
+            out.paste(tex, (x, y))
+    return out
+
+
+def _level(tex: Image.Image, mode: str) -> Image.Image:
+    lo, hi = BLENDS[mode][1]
+    tmin, tmax = tex.getextrema()
+    span = (tmax - tmin) or 1
+    return tex.point(lambda v: lo + (v - tmin) * (hi - lo) // span)
+
+
+def _disk_path(key: str) -> Path:
+    return TEXTURE_CACHE_DIR / f"{sha1(key.encode()).hexdigest()}.png"
+
+
+@lru_cache(maxsize=TEXTURE_CACHE_SIZE)
+def _prepared(path: str, mtime_ns: int, size, fit: str, mode: str) -> Image.Image:
+    key  = f"{path}:{mtime_ns}:{size[0]}x{size[1]}:{fit}:{mode}"
+    disk = _disk_path(key)
+    if disk.is_file():
+        with Image.open(disk) as im:
+            return im.convert("RGB")
+
+    tex = _level(_fit(_flatten(Path(path)), size, fit), mode).convert("RGB")
+    try:
+        disk.parent.mkdir(parents=True, exist_ok=True)
+        tmp = disk.with_suffix(f".{os.getpid()}.tmp")
+        tex.convert("L").save(tmp, "PNG", compress_level=1)
+        os.replace(tmp, disk)
+    except OSError:
+        pass  # disk cache is best‑effort
+    return tex
+
+
+def prepare(path: Path, size, fit="tile", mode="multiply") -> Image.Image:
+    """Prepared RGB texture for *size* and blend *mode* (cached; read‑only)."""
+    if mode not in BLENDS:
+        raise ValueError(f"unknown texture blend {mode!r} (choose from {', '.join(BLENDS)})")
+    if fit not in FITS:
+        raise ValueError(f"unknown texture fit {fit!r} (choose from {', '.join(FITS)})")
+    path = Path(path).resolve()
+    if not path.is_file():
+        raise FileNotFoundError(f"texture not found: {path}")
+    return _prepared(str(path), path.stat().st_mtime_ns, tuple(size), fit, mode)
+
+
+def blender(mode: str, strength: float):
+    """fn(region, texture) for a compositor `Layer.blend`."""
+    op = BLENDS[mode][0]
+
+    def blend(region, tex):
+        return Image.blend(region, op(region, tex), strength)
+
+    blend.mode, blend.strength = mode, strength     # for vector export
+    return blend
+
+
+def cache_info():
+    return _prepared.cache_info()
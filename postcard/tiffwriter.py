@@ -0,0 +1,227 @@
+"""
+Streaming TIFF writer.
+
+Pillow's TIFF encoder needs the whole image in memory, writes strips
+only and compresses on one core. `TiffWriter` instead takes rows top to
+bottom and writes them out as they come:
+• as strips or as square tiles (`tile=256`), 8‑bit RGB or CMYK
+• uncompressed, Deflate or LZW, optionally with the horizontal
+  differencing predictor (a big win for LZW, rarely for Deflate)
+• chunks (strips / tiles) are compressed on the `parallel` thread pool –
+  zlib and libtiff drop the GIL – and written in order
+• as BigTIFF (64‑bit offsets) when the pixels alone would not fit in the
+  classic format's 4 GB, or when asked to
+The IFD goes after the pixel data, so the file is written in one forward
+pass and only the IFD pointer in the header is patched at the end.
+Output goes to a temp file and is moved into place on `close()`.
+"""
+
+import os
+import struct
+import zlib
+from io import BytesIO
+from pathlib import Path
+from PIL import Image, ImageChops, TiffImagePlugin, features   # noqa: F401 – registers TIFF
+from postcard import parallel
+
+ROWS_PER_STRIP = 64
+COMPRESSIONS   = {None: 1, "lzw": 5, "deflate": 8}
+CLASSIC_LIMIT  = 2**32 - 2**26      # pixel bytes beyond which BigTIFF is chosen
+PHOTOMETRIC    = {"RGB": 2, "CMYK": 5}
+
+# TIFF field types
+_SHORT, _LONG, _RATIONAL, _UNDEFINED, _LONG8 = 3, 4, 5, 7, 16
+_SIZES = {_SHORT: 2, _LONG: 4, _RATIONAL: 8, _UNDEFINED: 1, _LONG8: 8}
+_PACK  = {_SHORT: "H", _LONG: "I", _LONG8: "Q"}
+
+
+def difference(img: Image.Image) -> Image.Image:
+    """TIFF predictor 2: each sample minus the one to its left, mod 256."""
+    left = Image.new(img.mode, img.size)
+    left.paste(img.crop((0, 0, img.width - 1, img.height)), (1, 0))
+    return ImageChops.subtract_modulo(img, left)
+
+
+def _lzw(img: Image.Image) -> bytes:
+    """LZW‑compressed pixels of *img*, by way of libtiff in one strip."""
+    buf = BytesIO()
+    img.save(buf, "TIFF", compression="tiff_lzw", tiffinfo={278: img.height})
+    with Image.open(buf) as t:
+        off, count = t.tag_v2[273][0], t.tag_v2[279][0]
+    return buf.getbuffer()[off:off + count].tobytes()
+
+
+class TiffWriter:
+    """Write an RGB (or CMYK) TIFF of *size* row band by row band:
+    `write(img)` each band (full width, any height) in order, then `close()`."""
+
+    def __init__(self, path, size, dpi=300, icc: bytes = None, compression=None,
+                 rows_per_strip=ROWS_PER_STRIP, level=6, tile=None, predictor=False,
+                 bigtiff=None, mode="RGB"):
+        if mode not in PHOTOMETRIC:
+            raise ValueError(f"unsupported mode {mode!r}")
+        if compression not in COMPRESSIONS:
+            raise ValueError(f"unsupported compression {compression!r}")
+        if compression == "lzw" and not features.check("libtiff"):
+            raise ValueError("LZW output needs Pillow built with libtiff")
+        if tile is not None and (tile <= 0 or tile % 16):
+            raise ValueError("tile size must be a positive multiple of 16")
+        self.path  = Path(path)
+        self.mode  = mode
+        self.size  = size
+        self.dpi   = dpi
+        self.icc   = icc
+        self.compression = compression
+        self.level = level
+        self.tile  = tile
+        self.predictor = predictor and compression is not None
+        self.bigtiff = size[0] * size[1] * len(mode) > CLASSIC_LIMIT if bigtiff is None else bigtiff
+        self.rows_per_strip = rows_per_strip
+        self.offsets, self.counts = [], []
+        self.rows  = 0
+        self._unit = tile or rows_per_strip     # rows gathered before chunks are cut
+        self._buf, self._filled = None, 0
+        self._pending = []
+        self._tmp  = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+        self._f    = open(self._tmp, "wb")
+        # IFD offset patched in close()
+        self._f.write(b"II+\0\x08\0\0\0" + bytes(8) if self.bigtiff else b"II*\0\0\0\0\0")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def write(self, band):
+        """Append *band* (an image as wide as the sheet) below the rows so far."""
+        if band.mode != self.mode or band.width != self.size[0]:
+            raise ValueError(f"band must be {self.mode} and {self.size[0]} px wide")
+        if self.rows + band.height > self.size[1]:
+            raise ValueError("more rows than the image height")
+        w, y = self.size[0], 0
+        while y < band.height:
+            n = min(self._unit - self._filled, band.height - y)
+            if self._filled == 0 and n == self._unit:
+                self._cut(band.crop((0, y, w, y + n)))
+            else:
+                if self._buf is None:
+                    self._buf = Image.new(self.mode, (w, self._unit))
+                self._buf.paste(band.crop((0, y, w, y + n)), (0, self._filled))
+                self._filled += n
+                if self._filled == self._unit:
+                    self._cut(self._buf)
+                    self._buf, self._filled = None, 0
+            y += n
+        self.rows += band.height
+        if len(self._pending) >= 4 * parallel.workers():
+            self._flush()
+
+    def _cut(self, rows: Image.Image):
+        """Queue *rows* (one strip, or one row of tiles) for encoding."""
+        if not self.tile:
+            self._pending.append(rows)
+            return
+        t = self.tile
+        for x in range(0, self.size[0], t):
+            self._pending.append(rows.crop((x, 0, x + t, t)))     # zero‑padded at the edges
+
+    def _encode(self, chunk: Image.Image) -> bytes:
+        if self.predictor:
+            chunk = difference(chunk)
+        if self.compression == "lzw":
+            return _lzw(chunk)
+        data = chunk.tobytes()
+        return zlib.compress(data, self.level) if self.compression == "deflate" else data
+
+    def _flush(self):
+        for data in parallel.run(self._encode, self._pending):
+            self.offsets.append(self._f.tell())
+            self.counts.append(len(data))
+            self._f.write(data)
+            if self._f.tell() & 1:
+                self._f.write(b"\0")                 # keep offsets word aligned
+        self._pending.clear()
+
+    def close(self):
+        if self.rows != self.size[1]:
+            raise ValueError(f"wrote {self.rows} of {self.size[1]} rows")
+        if self._buf is not None:
+            self._cut(self._buf if self.tile else self._buf.crop((0, 0, self.size[0], self._filled)))
+            self._buf, self._filled = None, 0
+        self._flush()
+
+        w, h = self.size
+        off  = _LONG8 if self.bigtiff else _LONG
+        res  = struct.pack("<II", round(self.dpi * 100), 100)
+        if self.tile:
+            layout = [(322, _LONG, [self.tile]), (323, _LONG, [self.tile]),
+                      (324, off, self.offsets), (325, off, self.counts)]
+        else:
+            layout = [(273, off, self.offsets), (278, _LONG, [self.rows_per_strip]),
+                      (279, off, self.counts)]
+        tags = [
+            (256, _LONG, [w]),
+            (257, _LONG, [h]),
+            (258, _SHORT, [8] * len(self.mode)),
+            (259, _SHORT, [COMPRESSIONS[self.compression]]),
+            (262, _SHORT, [PHOTOMETRIC[self.mode]]),
+            (277, _SHORT, [len(self.mode)]),
+            (282, _RATIONAL, res),
+            (283, _RATIONAL, res),
+            (284, _SHORT, [1]),                      # chunky
+            (296, _SHORT, [2]),                      # inch
+            *layout,
+        ]
+        if self.predictor:
+            tags.append((317, _SHORT, [2]))          # horizontal differencing
+        if self.mode == "CMYK":
+            tags.append((332, _SHORT, [1]))          # InkSet: CMYK
+        if self.icc:
+            tags.append((34675, _UNDEFINED, self.icc))
+        self._write_ifd(sorted(tags, key=lambda t: t[0]))
+        self._f.close()
+        os.replace(self._tmp, self.path)
+
+    def abort(self):
+        self._pending.clear()
+        self._f.close()
+        self._tmp.unlink(missing_ok=True)
+
+    def _write_ifd(self, tags):
+        f     = self._f
+        big   = self.bigtiff
+        inner = 8 if big else 4
+        # out‑of‑line values first, then the IFD pointing at them
+        entries = []
+        for tag, typ, values in tags:
+            if typ in (_RATIONAL, _UNDEFINED):
+                raw, count = bytes(values), len(values) // _SIZES[typ]
+            else:
+                raw, count = struct.pack(f"<{len(values)}{_PACK[typ]}", *values), len(values)
+            if len(raw) <= inner:
+                entries.append((tag, typ, count, raw.ljust(inner, b"\0")))
+            else:
+                pos = f.tell()
+                f.write(raw)
+                if f.tell() & 1:
+                    f.write(b"\0")
+                entries.append((tag, typ, count, struct.pack("<Q" if big else "<I", pos)))
+        ifd = f.tell()
+        if not big and ifd + 6 + 12 * len(entries) > 2**32:
+            raise ValueError(f"{self.path} is over 4 GB; write it with bigtiff=True")
+        f.write(struct.pack("<Q" if big else "<H", len(entries)))
+        for tag, typ, count, value in entries:
+            f.write(struct.pack("<HHQ" if big else "<HHI", tag, typ, count) + value)
+        f.write(bytes(inner))
+        f.seek(8 if big else 4)
+        f.write(struct.pack("<Q" if big else "<I", ifd))
+
+
+def save(img: Image.Image, path, dpi=300, icc: bytes = None, **options):
+    """Write the whole of RGB / CMYK *img* through a TiffWriter (see its options)."""
+    with TiffWriter(path, img.size, dpi, icc, mode=img.mode, **options) as out:
+        out.write(img)
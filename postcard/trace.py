@@ -0,0 +1,224 @@
+"""
+Render tracing.
+
+Every pipeline stage runs inside a span – `with tracer("decode") as span:`
+– that records wall time, CPU time and, via `span.image(img)`, the size
+and mode of the image the stage produced. A Tracer started with
+*memory* also records per span the peak of the Python heap (tracemalloc)
+and, on Linux, the peak RSS, which is where Pillow's image buffers show
+up: tracemalloc never sees those.
+
+Spans on the main thread count the CPU time of the whole process, so
+strip work on the `parallel` pool is included; spans on other threads
+(the export encoders) count their own thread's only. Memory peaks are
+taken on the main thread only, nested spans feeding their parent's.
+tracemalloc slows Python‑heavy code down, so `Tracer(memory=False)`
+(what postcard.bench uses) leaves memory out.
+
+`off` is the default tracer everywhere: one shared do‑nothing span, so
+an untraced render pays a function call per stage and nothing else.
+Traces export as Chrome trace‑event JSON (chrome://tracing, Perfetto)
+and as a summary table.
+"""
+
+import json
+import os
+import threading
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+
+
+class _Off:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def image(self, img):
+        pass
+
+
+_OFF  = _Off()
+_MAIN = threading.main_thread().name
+
+
+def off(stage: str, **args):
+    """The do‑nothing tracer."""
+    return _OFF
+
+
+@dataclass
+class Span:
+    name:     str
+    start:    float             # perf_counter() seconds
+    wall:     float
+    cpu:      float
+    thread:   str
+    depth:    int = 0           # nesting (worker threads: under the main thread's open spans)
+    size:     tuple = None      # of the image the stage produced
+    mode:     str = None
+    py_peak:  int = None        # bytes, tracemalloc
+    rss_peak: int = None        # bytes, Linux only
+    args:     dict = field(default_factory=dict)
+
+
+def _vm_hwm():
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def _reset_hwm() -> bool:
+    try:
+        with open("/proc/self/clear_refs", "w") as f:      # "5": reset the peak RSS
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+class _Live:
+    __slots__ = ("tracer", "span", "_cpu", "_peaks")
+
+    def __init__(self, tracer, name, args):
+        self.tracer = tracer
+        self.span   = Span(name, 0.0, 0.0, 0.0, threading.current_thread().name, args=args)
+
+    def image(self, img):
+        self.span.size, self.span.mode = img.size, img.mode
+
+    def __enter__(self):
+        t, main = self.tracer, threading.current_thread() is threading.main_thread()
+        self._cpu = time.process_time if main else time.thread_time
+        if main and t.memory:
+            t._enter_memory()
+            self._peaks = [0, 0]
+            t._stack.append(self._peaks)
+        else:
+            self._peaks = None
+        self.span.depth = t._depth(self.span.thread, +1) + (0 if main else t._depth(_MAIN, 0))
+        self.span.cpu   = self._cpu()
+        self.span.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        s, t = self.span, self.tracer
+        s.wall = time.perf_counter() - s.start
+        s.cpu  = self._cpu() - s.cpu
+        t._depth(s.thread, -1)
+        if self._peaks is not None:
+            t._enter_memory()                   # fold the rest of this span in
+            t._stack.pop()
+            s.py_peak  = self._peaks[0] or None
+            s.rss_peak = self._peaks[1] or None
+            if t._stack:
+                parent = t._stack[-1]
+                parent[0], parent[1] = max(parent[0], self._peaks[0]), max(parent[1], self._peaks[1])
+        with t._lock:
+            t.spans.append(s)
+        return False
+
+
+class Tracer:
+    """Collects Spans; call it with a stage name (and args) to open one."""
+
+    def __init__(self, memory=True):
+        self.spans  = []
+        self.memory = memory
+        self._lock  = threading.Lock()
+        self._stack = []                        # running [py, rss] peaks of open main‑thread spans
+        self._depths = {}
+        self._rss   = memory and _reset_hwm()
+        self._owns_tracemalloc = memory and not tracemalloc.is_tracing()
+        if self._owns_tracemalloc:
+            tracemalloc.start()
+
+    def __call__(self, stage: str, **args):
+        return _Live(self, stage, args)
+
+    def close(self):
+        if self._owns_tracemalloc:
+            tracemalloc.stop()
+            self._owns_tracemalloc = False
+
+    def _depth(self, thread, step) -> int:
+        with self._lock:
+            d = self._depths.get(thread, 0)
+            self._depths[thread] = d + step
+        return d
+
+    def _enter_memory(self):
+        """Fold the peaks since the last reset into the open span, then reset."""
+        py  = tracemalloc.get_traced_memory()[1] if tracemalloc.is_tracing() else 0
+        rss = (_vm_hwm() or 0) if self._rss else 0
+        if self._stack:
+            top = self._stack[-1]
+            top[0], top[1] = max(top[0], py), max(top[1], rss)
+        if tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+        if self._rss:
+            _reset_hwm()
+
+    def totals(self) -> dict:
+        """Wall seconds per stage name, summed."""
+        out = {}
+        for s in self.spans:
+            out[s.name] = out.get(s.name, 0.0) + s.wall
+        return out
+
+
+# ────────── output ───────────────────────────────────────────────────────────
+
+def chrome(spans) -> dict:
+    """*spans* as a Chrome trace‑event document ("X" complete events)."""
+    t0    = min((s.start for s in spans), default=0.0)
+    pid   = os.getpid()
+    tids  = {}
+    events = []
+    for s in sorted(spans, key=lambda s: s.start):
+        tid  = tids.setdefault(s.thread, len(tids) + 1)
+        args = {k: v for k, v in (("cpu_ms", round(s.cpu * 1e3, 3)),
+                                  ("size", s.size and f"{s.size[0]}×{s.size[1]}"), ("mode", s.mode),
+                                  ("py_peak_mib", s.py_peak and round(s.py_peak / 2**20, 1)),
+                                  ("rss_peak_mib", s.rss_peak and round(s.rss_peak / 2**20, 1)))
+                if v is not None}
+        events.append(dict(name=s.name, cat="postcard", ph="X", pid=pid, tid=tid,
+                           ts=round((s.start - t0) * 1e6, 1), dur=round(s.wall * 1e6, 1),
+                           args={**s.args, **args}))
+    events += [dict(name="thread_name", ph="M", pid=pid, tid=tid, args=dict(name=name))
+               for name, tid in tids.items()]
+    return dict(traceEvents=events, displayTimeUnit="ms")
+
+
+def save_chrome(path, spans):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(chrome(spans), f)
+    os.replace(tmp, path)
+
+
+def summary(spans) -> str:
+    """One row per span, in start order, nested spans indented."""
+    def mib(v):
+        return f"{v / 2**20:.1f}" if v else "–"
+
+    rows = [("stage", "wall s", "cpu s", "size", "mode", "heap MiB", "RSS MiB")]
+    for s in sorted(spans, key=lambda s: s.start):
+        label = "  " * s.depth + s.name + "".join(f" {k}={v}" for k, v in s.args.items())
+        if s.thread != _MAIN:
+            label += f" [{s.thread}]"
+        rows.append((label, f"{s.wall:.3f}", f"{s.cpu:.3f}",
+                     f"{s.size[0]}×{s.size[1]}" if s.size else "–", s.mode or "–",
+                     mib(s.py_peak), mib(s.rss_peak)))
+    widths = [max(len(r[i]) for r in rows) for i in range(len(rows[0]))]
+    return "\n".join(r[0].ljust(widths[0]) + "".join(c.rjust(w + 2) for c, w in zip(r[1:], widths[1:]))
+                     for r in rows)
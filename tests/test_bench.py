@@ -0,0 +1,54 @@
+import json
+import pytest
+from postcard import bench
+
+
+def results(total=10.0, rss=1000, **stages):
+    stages = {"decode": 2.0, "resample": 3.0, "text": 0.01, **stages}
+    return {"schema": bench.SCHEMA, "cases": {"12mp-1line": dict(total=total, peak_rss=rss,
+                                                                 stages=stages)}}
+
+
+def regressions(now, base, **kw):
+    return sorted((r.case, r.metric) for r in bench.compare(now, base, **kw))
+
+
+def test_no_change_is_no_regression():
+    assert bench.compare(results(), results()) == []
+
+
+def test_growth_past_the_threshold_regresses():
+    base = results()
+    assert regressions(results(total=11.2, rss=1200, decode=2.3), base) == [
+        ("12mp-1line", "decode"), ("12mp-1line", "peak RSS"), ("12mp-1line", "total")]
+
+
+def test_growth_within_the_threshold_passes():
+    assert regressions(results(total=10.9, rss=1099, decode=2.19), results()) == []
+    assert regressions(results(total=10.9), results(), threshold=0.05) == [("12mp-1line", "total")]
+
+
+def test_stages_below_the_noise_floor_never_gate():
+    assert regressions(results(text=bench.NOISE_S * 0.9), results()) == []
+    assert regressions(results(text=0.5), results(text=bench.NOISE_S)) == [("12mp-1line", "text")]
+
+
+def test_cases_and_stages_missing_from_the_baseline_are_skipped():
+    base = results()
+    del base["cases"]["12mp-1line"]["stages"]["resample"]
+    assert regressions(results(resample=30.0), base) == []
+    assert bench.compare(results(total=99.0), {"cases": {}}) == []
+
+
+def test_regressions_read_as_sentences():
+    (r,) = bench.compare(results(rss=2 * 2**30), results(rss=2**30))
+    assert str(r) == "12mp-1line peak RSS: 1024 MiB → 2048 MiB (+100%)"
+
+
+def test_results_round_trip_and_foreign_files_are_refused(tmp_path):
+    path = tmp_path / "bench.json"
+    bench.save(results(), path)
+    assert bench.load(path) == results()
+    path.write_text(json.dumps({"cases": {}}))
+    with pytest.raises(ValueError, match="not a postcard bench file"):
+        bench.load(path)
@@ -0,0 +1,77 @@
+import random
+from hashlib import sha1
+import pytest
+from PIL import Image, ImageCms
+from postcard import color, parallel
+
+SIZE = (640, 480)
+
+
+def photo(mode="RGB"):
+    noise = Image.frombytes("L", SIZE, random.Random(1).randbytes(SIZE[0] * SIZE[1]))
+    ramp  = Image.linear_gradient("L").resize(SIZE)
+    return Image.merge(mode, [Image.blend(ramp.rotate(90 * i).resize(SIZE), noise, 0.3)
+                              for i in range(len(mode))])
+
+
+@pytest.fixture
+def strips(monkeypatch):
+    monkeypatch.setattr(parallel, "MIN_STRIP_PIXELS", 4096)
+    parallel.set_workers(4)
+    yield
+    parallel.set_workers()
+
+
+def test_strip_conversion_matches_one_transform(strips):
+    icc = color.profile_bytes()
+    img = photo()
+    out, embed = color.to_srgb(img, "relative", icc)
+    whole = ImageCms.applyTransform(img, color.get_transform(icc, color.SRGB, "relative"))
+    assert len(parallel.strip_bounds(*reversed(SIZE))) > 1
+    assert out.tobytes() == whole.tobytes()
+    assert embed == icc
+
+
+def test_alpha_is_dropped_after_conversion(strips):
+    out, _ = color.to_srgb(photo("RGBA"), icc=color.profile_bytes())
+    assert (out.mode, out.size) == ("RGB", SIZE)
+
+
+def test_untagged_images_are_taken_as_srgb():
+    img = photo("L")
+    out, embed = color.to_srgb(img)
+    assert out.mode == "RGB" and out.getpixel((5, 5)) == (img.getpixel((5, 5)),) * 3
+    assert embed == color.profile_bytes()
+
+
+def test_unknown_intent_is_an_error():
+    with pytest.raises(ValueError, match="intent"):
+        color.get_transform(color.profile_bytes(), intent="vivid")
+
+
+def variant(icc: bytes, n: int) -> bytes:
+    """The same profile with another creation date: equal content, new bytes."""
+    return icc[:24] + bytes([n]) + icc[25:]
+
+
+def test_transforms_are_cached_by_target_digest():
+    src = color.profile_bytes()
+    a, b = variant(src, 1), variant(src, 2)
+    before = color.transform_cache_size()
+    xa = color.get_transform(src, a, "relative")
+    assert color.get_transform(src, bytes(a), "relative") is xa        # equal bytes, one build
+    assert color.get_transform(src, b, "relative") is not xa
+    assert color.get_transform(src, a, "perceptual") is not xa
+    assert color.get_transform(src, a, "relative", bpc=True) is not xa
+    assert color.transform_cache_size() == before + 4
+    assert color._key(a) == sha1(a).hexdigest() and color._key(color.SRGB) == color.SRGB
+
+
+def test_profiles_are_cached_by_digest():
+    icc = variant(color.profile_bytes(), 3)
+    assert color.load_profile(icc) is color.load_profile(bytes(icc))
+
+
+def test_cmyk_needs_a_cmyk_profile():
+    with pytest.raises(ValueError, match="not a CMYK profile"):
+        color.to_cmyk(photo(), color.profile_bytes())
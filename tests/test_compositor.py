@@ -0,0 +1,56 @@
+import pytest
+from PIL import Image, ImageChops
+from postcard import parallel
+from postcard.compositor import Compositor, Layer
+
+SIZE = (600, 400)
+
+
+@pytest.fixture(params=[1, 4], ids=["serial", "strips"])
+def workers(request, monkeypatch):
+    monkeypatch.setattr(parallel, "MIN_STRIP_PIXELS", 4096)
+    parallel.set_workers(request.param)
+    yield request.param
+    parallel.set_workers()
+
+
+def invert(region, fill):
+    return ImageChops.invert(region)
+
+
+def test_full_frame_blend_counts_its_copies(workers):
+    comp = Compositor(SIZE, (10, 20, 30))
+    comp.add(Layer("texture", (0, 0), Image.new("RGB", SIZE, (200, 0, 0)), blend=invert))
+    comp.render()
+    # region, fill crop and blend result, each the whole canvas only when unsplit
+    assert comp.stats.full_frame_copies == (3 if workers == 1 else 0)
+    canvas, fill = 3 * SIZE[0] * SIZE[1], 3 * SIZE[0] * SIZE[1]
+    if workers == 1:
+        assert comp.stats.peak_bytes == canvas + fill + 3 * canvas
+    else:
+        assert canvas + fill < comp.stats.peak_bytes < canvas + fill + 3 * canvas
+
+
+def test_small_layers_make_no_full_frame_copies(workers):
+    comp = Compositor(SIZE, (0, 0, 0))
+    comp.add(Layer("photo", (0, 0), Image.new("RGB", SIZE, (1, 2, 3))))
+    comp.add(Layer("texture", (100, 100), Image.new("RGB", (50, 50)), blend=invert))
+    comp.render()
+    assert comp.stats.layers == 2
+    assert comp.stats.full_frame_copies == 0
+    assert comp.stats.peak_bytes >= 2 * 3 * SIZE[0] * SIZE[1]
+
+
+def test_layers_blend_only_inside_their_boxes(workers):
+    mask = Image.linear_gradient("L").resize((300, 200))
+    comp = Compositor(SIZE, (40, 80, 120))
+    comp.add(Layer("gradient", (50, 60), (0, 0, 0), mask))
+    comp.add(Layer("texture", (450, 300), Image.new("RGB", (300, 200)), blend=invert))
+    out = comp.render()
+
+    want = Image.new("RGB", SIZE, (40, 80, 120))
+    want.paste((0, 0, 0), (50, 60), mask)
+    corner = want.crop((450, 300) + SIZE)
+    want.paste(ImageChops.invert(corner), (450, 300))      # clipped at the canvas edge
+    assert out.tobytes() == want.tobytes()
+    assert [box for _, box in comp.stats.per_layer] == [(50, 60, 350, 260), (450, 300, 750, 500)]
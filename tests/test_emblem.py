@@ -0,0 +1,29 @@
+import pytest
+from postcard import emblem
+
+
+@pytest.fixture(autouse=True)
+def emblem_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(emblem, "EMBLEM_CACHE_DIR", tmp_path / "emblems")
+
+
+def render(tmp_path, body, size=(40, 40)):
+    path = tmp_path / "e.svg"
+    path.write_text(f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 40 40">{body}</svg>')
+    return emblem.rasterize(path, size)
+
+
+def test_translucent_fill_keeps_its_colour(tmp_path):
+    rgb, alpha = render(tmp_path, '<path d="M5 5H35V35H5Z" fill="#ff0000" fill-opacity="0.5"/>')
+    assert rgb.getpixel((20, 20)) == (255, 0, 0)
+    assert alpha.getpixel((20, 20)) in (127, 128)
+    assert alpha.getpixel((1, 1)) == 0
+
+
+def test_antialiased_edges_are_not_darkened(tmp_path):
+    # a half-pixel offset puts every edge pixel at partial coverage
+    rgb, alpha = render(tmp_path, '<path d="M5.5 5.5H34.5V34.5H5.5Z" fill="#3080ff"/>')
+    assert 0 < alpha.getpixel((5, 20)) < 255
+    assert rgb.getpixel((20, 20)) == (48, 128, 255)
+    # unpremultiplying 8-bit values may be off by one, never darkened by alpha
+    assert all(abs(a - b) <= 2 for a, b in zip(rgb.getpixel((5, 20)), (48, 128, 255)))
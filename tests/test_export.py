@@ -0,0 +1,121 @@
+import subprocess
+import pytest
+from PIL import Image
+from postcard import export, parallel
+from postcard.export import Derivative
+
+
+@pytest.fixture
+def canvas():
+    return Image.linear_gradient("L").convert("RGB").resize((1800, 1200))
+
+
+@pytest.fixture
+def resizes(monkeypatch):
+    """Every parallel.resize export makes, as (source size, target size)."""
+    calls, real = [], parallel.resize
+
+    def spy(img, size, *args, **kwargs):
+        calls.append((img.size, tuple(size)))
+        return real(img, size, *args, **kwargs)
+    monkeypatch.setattr(parallel, "resize", spy)
+    return calls
+
+
+def test_pyramid_resizes_each_level_from_the_one_above(tmp_path, canvas, resizes):
+    ds = [Derivative(tmp_path / "thumb.webp", width=300),
+          Derivative(tmp_path / "print.tif"),
+          Derivative(tmp_path / "web.jpg", width=1200),
+          Derivative(tmp_path / "mid.png", width=600)]
+    report = export.export(canvas, ds, dpi=300)
+
+    assert resizes == [((1800, 1200), (1200, 800)),
+                       ((1200, 800), (600, 400)),
+                       ((600, 400), (300, 200))]
+    sizes = {w.path.name: w.size for w in report.written}
+    assert sizes == {"print.tif": (1800, 1200), "web.jpg": (1200, 800),
+                     "mid.png": (600, 400), "thumb.webp": (300, 200)}
+    for w in report.written:
+        with Image.open(w.path) as im:
+            assert im.size == w.size
+            assert w.bytes == w.path.stat().st_size
+    assert not list(tmp_path.glob(".*.tmp"))
+
+
+def test_each_aspect_is_its_own_pyramid(tmp_path, canvas, resizes):
+    ds = [Derivative(tmp_path / "web.jpg", width=900),
+          Derivative(tmp_path / "social.jpg", width=540, aspect=(4, 5)),
+          Derivative(tmp_path / "social-big.jpg", aspect=(4, 5))]
+    report = export.export(canvas, ds)
+
+    assert sorted(resizes) == [((960, 1200), (540, 675)), ((1800, 1200), (900, 600))]
+    sizes = {w.path.name: w.size for w in report.written}
+    assert sizes == {"web.jpg": (900, 600), "social-big.jpg": (960, 1200),
+                     "social.jpg": (540, 675)}
+
+
+def test_never_upscales(tmp_path, canvas, resizes):
+    report = export.export(canvas, [Derivative(tmp_path / "big.png", width=4000)])
+    assert resizes == []
+    assert report.written[0].size == canvas.size
+
+
+def test_dpi_only_on_full_size_outputs(tmp_path, canvas):
+    export.export(canvas, [Derivative(tmp_path / "full.png"),
+                           Derivative(tmp_path / "small.png", width=600)], dpi=300)
+    with Image.open(tmp_path / "full.png") as full, Image.open(tmp_path / "small.png") as small:
+        assert round(full.info["dpi"][0]) == 300
+        assert "dpi" not in small.info
+
+
+@pytest.mark.parametrize("tile, count", [(256, 8 * 5), (512, 4 * 3)])
+def test_tiled_tiff_tile_count(tmp_path, canvas, tile, count):
+    path = tmp_path / "print.tif"
+    (w,) = export.export(canvas, [Derivative(path, options=dict(tile=tile))]).written
+    with Image.open(path) as im:
+        assert im.tag_v2[322] == im.tag_v2[323] == tile
+        assert len(im.tag_v2[324]) == count          # TileOffsets
+        assert im.size == canvas.size
+    assert w.read_s is not None
+
+
+def test_unknown_suffix(tmp_path, canvas):
+    with pytest.raises(ValueError, match="no image format"):
+        export.export(canvas, [Derivative(tmp_path / "card.nope")])
+
+
+def test_headless(monkeypatch):
+    monkeypatch.delenv("CI", raising=False)
+    monkeypatch.setenv("POSTCARD_HEADLESS", "1")
+    assert export.headless()
+    monkeypatch.delenv("POSTCARD_HEADLESS")
+    monkeypatch.setenv("CI", "true")
+    assert export.headless()
+    monkeypatch.delenv("CI")
+    monkeypatch.setattr(export.sys, "platform", "linux")
+    monkeypatch.delenv("DISPLAY", raising=False)
+    monkeypatch.delenv("WAYLAND_DISPLAY", raising=False)
+    assert export.headless()
+    monkeypatch.setenv("DISPLAY", ":0")
+    assert not export.headless()
+
+
+def test_open_viewer_does_nothing_headless(tmp_path, monkeypatch):
+    started = []
+    monkeypatch.setattr(subprocess, "Popen", lambda *a, **k: started.append(a))
+    monkeypatch.setenv("POSTCARD_HEADLESS", "1")
+    assert export.open_viewer(tmp_path / "card.tif") is False
+    assert started == []
+
+
+def test_open_viewer_does_not_wait(tmp_path, monkeypatch):
+    started = []
+    monkeypatch.setattr(subprocess, "Popen", lambda cmd, **k: started.append((cmd, k)))
+    monkeypatch.delenv("POSTCARD_HEADLESS", raising=False)
+    monkeypatch.delenv("CI", raising=False)
+    monkeypatch.setattr(export.sys, "platform", "linux")
+    monkeypatch.setenv("DISPLAY", ":0")
+    assert export.open_viewer(tmp_path / "card.tif") is True
+    ((cmd, kwargs),) = started
+    assert cmd == ["xdg-open", str(tmp_path / "card.tif")]
+    assert kwargs["start_new_session"]
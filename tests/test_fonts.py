@@ -0,0 +1,94 @@
+import os
+import shutil
+import pytest
+from postcard import bench, fonts
+
+
+@pytest.fixture(scope="module")
+def font_file():
+    try:
+        return fonts.find_first(bench.FONTS).path
+    except fonts.FontNotFoundError:
+        pytest.skip("no font installed to copy")
+
+
+@pytest.fixture
+def font_dir(tmp_path, font_file, monkeypatch):
+    monkeypatch.setattr(fonts, "DEFAULT_FONT_DIRS", [])
+    d = tmp_path / "fonts"
+    d.mkdir()
+    shutil.copy(font_file, d / "First.ttf")
+    shutil.copy(font_file, d / "Second.ttf")
+    return d
+
+
+@pytest.fixture
+def reads(monkeypatch):
+    """Paths _read_faces opened, in order."""
+    seen, real = [], fonts._read_faces
+    monkeypatch.setattr(fonts, "_read_faces", lambda path: seen.append(path) or real(path))
+    return seen
+
+
+def catalog(font_dir, tmp_path):
+    return fonts.FontCatalog([font_dir], tmp_path / "index.json")
+
+
+def test_rescan_reads_only_changed_files(font_dir, tmp_path, reads):
+    catalog(font_dir, tmp_path)
+    assert sorted(os.path.basename(p) for p in reads) == ["First.ttf", "Second.ttf"]
+
+    reads.clear()
+    cat = catalog(font_dir, tmp_path)
+    assert reads == [] and len(cat.faces) == 2             # all from the index
+
+    st = (font_dir / "Second.ttf").stat()
+    os.utime(font_dir / "Second.ttf", ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    cat = catalog(font_dir, tmp_path)
+    assert [os.path.basename(p) for p in reads] == ["Second.ttf"]
+    assert len(cat.faces) == 2
+
+
+def test_unchanged_entries_outside_the_dirs_are_kept(font_dir, tmp_path, reads):
+    other = tmp_path / "elsewhere" / "Third.ttf"
+    other.parent.mkdir()
+    shutil.copy(font_dir / "First.ttf", other)
+    catalog(font_dir, tmp_path).find(str(other))              # indexed by explicit path
+
+    reads.clear()
+    cat = catalog(font_dir, tmp_path)
+    assert cat.find(str(other)).path == str(other.resolve())
+    assert reads == []                                        # the entry survived the rescan
+
+
+def test_broken_links_are_skipped(font_dir, tmp_path):
+    (font_dir / "broken.ttf").symlink_to("/nonexistent/x.ttf")
+    (font_dir / "link.ttf").symlink_to(font_dir / "First.ttf")
+    cat = catalog(font_dir, tmp_path)
+    assert sorted(os.path.basename(f.path) for f in cat.faces) == ["First.ttf", "Second.ttf"]
+    # the link and its target are one file, under one resolved path
+    assert cat.find(str(font_dir / "link.ttf")) == cat.find("First.ttf")
+
+
+def test_lookup_by_file_name_and_path(font_dir, tmp_path):
+    cat  = catalog(font_dir, tmp_path)
+    face = cat.find("Second.ttf")
+    assert face.path == str((font_dir / "Second.ttf").resolve())
+    assert cat.find("/old/machine/Second.ttf") == face      # a stale path by its file name
+    assert cat.find(str(font_dir / "Second.ttf")) == face
+
+
+def test_a_miss_names_the_font_dirs_and_close_matches(font_dir, tmp_path):
+    cat = catalog(font_dir, tmp_path)
+    with pytest.raises(fonts.FontNotFoundError) as e:
+        cat.find("Secnd.ttf")
+    assert str(e.value) == f"font 'Secnd.ttf' not found in {font_dir}; did you mean Second.ttf?"
+
+
+def test_loaded_faces_are_shared(font_file):
+    fonts.load_path.cache_clear()
+    face = fonts.FontFace("F", "Regular", font_file)
+    a = fonts.load(face, 40)
+    assert fonts.load(face, 40.0) is a and fonts.load(face, 41) is not a
+    info = fonts.cache_info()
+    assert (info.hits, info.misses) == (1, 2)
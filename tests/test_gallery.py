@@ -0,0 +1,77 @@
+import json
+import os
+from PIL import Image
+from postcard import gallery
+
+
+def card(path, color, size=(900, 600)):
+    Image.new("RGB", size, color).save(path)
+    return path
+
+
+def manifest(out):
+    return json.loads((out / gallery.MANIFEST).read_text())["cards"]
+
+
+def test_incremental_rebuilds(tmp_path):
+    cards, out = tmp_path / "cards", tmp_path / "site"
+    cards.mkdir()
+    a = card(cards / "a.png", "red")
+    b = card(cards / "b.png", "green")
+    c = card(cards / "c.png", "blue")
+
+    first = gallery.build([cards], out, workers=1)
+    assert (first.cards, first.thumbnailed, first.removed) == (3, 3, 0)
+    per_card = 2 * len(gallery.thumb_widths(900))           # JPEG + WebP per width
+    assert len(os.listdir(out / gallery.THUMB_DIR)) == 3 * per_card
+    html = (out / "index.html").read_text()
+    assert html.count('<div class="card">') == 3 and 'href="../cards/a.png"' in html
+
+    again = gallery.build([cards], out, workers=1)
+    assert (again.thumbnailed, again.removed, again.written) == (0, 0, [])
+
+    card(b, "yellow")                                       # changed card
+    st = b.stat()
+    os.utime(b, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    c.unlink()                                              # deleted card
+    third = gallery.build([cards], out, workers=1)
+    assert (third.cards, third.thumbnailed) == (2, 1)
+    assert third.removed == 2 * per_card                    # b's old thumbs and c's
+    entries = manifest(out)
+    assert sorted(os.path.basename(k) for k in entries) == ["a.png", "b.png"]
+    assert set(os.listdir(out / gallery.THUMB_DIR)) == \
+        {n for e in entries.values() for n in e["thumbs"]}
+
+
+def test_a_touched_but_unchanged_card_is_not_thumbnailed_again(tmp_path):
+    cards, out = tmp_path / "cards", tmp_path / "site"
+    cards.mkdir()
+    a = card(cards / "a.png", "red")
+    gallery.build([cards], out, workers=1)
+    stem = manifest(out)[str(a.resolve())]["stem"]
+    os.utime(a, ns=(a.stat().st_atime_ns, a.stat().st_mtime_ns + 10**9))
+    report = gallery.build([cards], out, workers=1)
+    assert report.thumbnailed == 0                          # re‑hashed, same contents
+    assert manifest(out)[str(a.resolve())]["stem"] == stem
+
+
+def test_thumbnail_widths_and_sizes(tmp_path):
+    out = tmp_path / "thumbs"
+    out.mkdir()
+    size, names = gallery.make_thumbs(card(tmp_path / "wide.png", "red", (1000, 500)), out, "w")
+    assert size == (1000, 500)
+    assert gallery.thumb_widths(1000) == [320, 640] and gallery.thumb_widths(200) == [200]
+    assert sorted(names) == ["w-320.jpg", "w-320.webp", "w-640.jpg", "w-640.webp"]
+    with Image.open(out / "w-320.webp") as im:
+        assert im.size == (320, 160)
+
+
+def test_parallel_build_matches_serial(tmp_path):
+    cards = tmp_path / "cards"
+    cards.mkdir()
+    for i, color in enumerate(("red", "green", "blue", "white")):
+        card(cards / f"{i}.png", color)
+    gallery.build([cards], tmp_path / "serial", workers=1)
+    gallery.build([cards], tmp_path / "pool", workers=2)
+    assert sorted(os.listdir(tmp_path / "serial" / gallery.THUMB_DIR)) == \
+        sorted(os.listdir(tmp_path / "pool" / gallery.THUMB_DIR))
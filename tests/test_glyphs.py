@@ -0,0 +1,62 @@
+from math import ceil
+import pytest
+from postcard import bench, fonts, glyphs
+
+
+@pytest.fixture(scope="module")
+def font():
+    try:
+        return fonts.load(fonts.find_first(bench.FONTS), 60)
+    except fonts.FontNotFoundError:
+        pytest.skip("no caption font installed")
+
+
+@pytest.fixture(autouse=True)
+def fresh():
+    glyphs._mask.cache_clear()
+    glyphs._shadow.cache_clear()
+
+
+def test_mask_matches_freetype(font):
+    mask, offset = glyphs.glyph_mask(font, "Badlands")
+    core, want = font.getmask2("Badlands", mode="L")
+    assert (mask.mode, mask.size, offset) == ("L", core.size, want)
+    assert mask.tobytes() == bytes(core)
+
+
+def test_repeated_lines_share_one_mask(font):
+    a = glyphs.text_layer("South Dakota", (10, 20), font, (255, 255, 255))
+    b = glyphs.text_layer("South Dakota", (10, 120), font, (0, 0, 0))
+    c = glyphs.text_layer("North Dakota", (10, 220), font, (0, 0, 0))
+    assert a.mask is b.mask and c.mask is not a.mask
+    shadow = glyphs.shadow_layer("South Dakota", (13, 23), font, (0, 0, 0))
+    assert shadow.mask is a.mask                            # a hard shadow is the fill mask
+    info = glyphs.cache_info()["masks"]
+    assert (info.hits, info.misses) == (2, 2)
+
+
+def test_soft_shadow_blurs_only_a_padded_text_box(font):
+    mask, (ox, oy) = glyphs.glyph_mask(font, "Hg")
+    for blur in (1.5, 4):
+        layer = glyphs.shadow_layer("Hg", (100, 100), font, (0, 0, 0), 0.5, blur)
+        pad   = ceil(3 * blur)
+        assert layer.mask.size == (mask.width + 2 * pad, mask.height + 2 * pad)
+        assert layer.xy == (100 + ox - pad, 100 + oy - pad)
+        assert layer.vector is None                         # no vector equivalent
+        assert max(layer.mask.getextrema()) <= 128
+
+
+def test_tracking_spreads_the_mask(font):
+    plain, _   = glyphs.glyph_mask(font, "ABC")
+    tracked, _ = glyphs.glyph_mask(font, "ABC", tracking=200)
+    assert tracked.height == plain.height
+    assert tracked.width - plain.width == pytest.approx(2 * 60 * 200 / 1000, abs=2)
+    blank, offset = glyphs.glyph_mask(font, "   ", tracking=100)
+    assert blank.getbbox() is None
+
+
+def test_stroke_mask_grows_by_the_width(font):
+    fill, (fx, fy) = glyphs.glyph_mask(font, "O")
+    line, (sx, sy) = glyphs.glyph_mask(font, "O", stroke=3)
+    assert (line.width, line.height) == (fill.width + 6, fill.height + 6)
+    assert (fx - sx, fy - sy) == (3, 3)
@@ -0,0 +1,67 @@
+import pytest
+from postcard import gradient
+
+
+@pytest.fixture(autouse=True)
+def fresh():
+    gradient.cache_clear()
+
+
+def test_lut_runs_from_the_first_stop_to_the_last():
+    table = gradient.lut(gradient.ramp(0.6))
+    assert len(table) == 256
+    assert table[0] == 0 and table[255] == round(255 * 0.6)
+    assert table == sorted(table)
+    assert table[128] == round(255 * 0.6 * 128 / 255)
+
+
+def test_lut_interpolates_between_stops_and_holds_outside_them():
+    stops = ((0.25, 0.2), (0.5, 1.0), (0.75, 0.4))
+    table = gradient.lut(stops)
+    assert table[0] == table[63] == round(255 * 0.2)        # before the first stop
+    assert table[128] == round(255 * (1.0 - 0.6 * (128 / 255 - 0.5) / 0.25))
+    assert max(table) == table[round(0.5 * 255)] >= 254
+    assert table[200] == table[255] == round(255 * 0.4)     # after the last stop
+
+
+def test_curves_ease_the_position():
+    lin, ease_in = gradient.lut(gradient.ramp(1)), gradient.lut(gradient.ramp(1), "ease-in")
+    assert ease_in[0] == lin[0] and ease_in[255] == lin[255]
+    assert ease_in[128] == round(255 * (128 / 255) ** 2) < lin[128]
+
+
+def test_linear_mask_size_direction_and_ends():
+    down = gradient.linear((40, 100), gradient.ramp(1))
+    assert down.size == (40, 100)
+    assert down.getpixel((20, 0)) < 5 and down.getpixel((20, 99)) > 250
+    right = gradient.linear((100, 40), gradient.ramp(1), direction="right")
+    assert right.getpixel((0, 20)) < 5 and right.getpixel((99, 20)) > 250
+
+
+def test_radial_is_dark_in_the_middle_and_full_at_the_edges():
+    mask = gradient.radial((300, 200), ((0.5, 0.0), (1.0, 1.0)))
+    assert mask.getpixel((150, 100)) == 0
+    assert mask.getpixel((0, 100)) > 240 and mask.getpixel((150, 0)) > 240
+
+
+def test_masks_are_cached_by_size_stops_and_curve():
+    a = gradient.linear((50, 80), [(0, 0), (1, 0.5)])
+    assert gradient.linear([50, 80], ((0.0, 0.0), (1.0, 0.5))) is a   # equal once normalised
+    assert gradient.linear((50, 80), [(0, 0), (1, 0.5)], "exp") is not a
+    info = gradient.cache_info()["linear"]
+    assert (info.hits, info.misses) == (1, 2)
+
+
+@pytest.mark.parametrize("stops, curve, message", [
+    ((), "linear", "at least one stop"),
+    (((0.8, 1), (0.2, 0)), "linear", "increasing order"),
+    (gradient.ramp(1), "bouncy", "unknown gradient curve"),
+])
+def test_bad_stops_and_curves_are_rejected(stops, curve, message):
+    with pytest.raises(ValueError, match=message):
+        gradient.linear((10, 10), stops, curve)
+
+
+def test_bad_direction_is_rejected():
+    with pytest.raises(ValueError, match="direction"):
+        gradient.linear((10, 10), gradient.ramp(1), direction="sideways")
@@ -0,0 +1,82 @@
+import pytest
+from PIL import Image, ImageColor
+from postcard import impose
+
+
+@pytest.mark.parametrize("sheet, card, kw, grid, slot, first", [
+    # the slot turned round fits 10 instead of 9
+    ((1000, 700), (300, 200), {}, (5, 2), (200, 300), (0, 50, 200, 350)),
+    # bleed, gap and margin; a tie keeps the card's own orientation
+    ((1000, 700), (300, 200), dict(bleed=10, gap=20, margin=30), (2, 2), (300, 200),
+     (180, 130, 480, 330)),
+    # two 6×4 in cards with bleed on A4 at 300 dpi
+    ((2480, 3508), (1800, 1200), dict(bleed=36, margin=60), (1, 2), (1800, 1200),
+     (340, 518, 2140, 1718)),
+])
+def test_plan(sheet, card, kw, grid, slot, first):
+    layout = impose.plan(sheet, card, **kw)
+    assert (layout.cols, layout.rows, layout.slot, layout.slots[0]) == (*grid, slot, first)
+    assert layout.per_sheet == grid[0] * grid[1]
+    b = kw.get("bleed", 0)
+    for x0, y0, x1, y1 in layout.slots:                     # bleed stays on the sheet
+        assert x0 - b >= 0 and y0 - b >= 0 and x1 + b <= sheet[0] and y1 + b <= sheet[1]
+
+
+def test_a_card_too_big_for_the_sheet_is_an_error():
+    with pytest.raises(ValueError, match="does not fit"):
+        impose.plan((1000, 700), (900, 600), margin=80)
+
+
+@pytest.mark.parametrize("flip, rotate, box, turned", [
+    ("left-right", 0, (700, 50, 900, 150), 0),
+    ("left-right", 90, (700, 50, 900, 150), 270),
+    ("top-bottom", 0, (100, 550, 300, 650), 180),
+    ("top-bottom", 90, (100, 550, 300, 650), 90),
+])
+def test_turn_over_mirrors_the_slot(flip, rotate, box, turned):
+    back = impose.turn_over(impose.Placement("b.png", (100, 50, 300, 150), rotate),
+                            (1000, 700), flip)
+    assert (back.trim, back.rotate) == (box, turned)
+    nudged = impose.turn_over(impose.Placement("b.png", (100, 50, 300, 150), rotate),
+                              (1000, 700), flip, offset=(3, -2))
+    assert nudged.trim == (box[0] + 3, box[1] - 2, box[2] + 3, box[3] - 2)
+
+
+def test_bleed_mirrors_the_edges():
+    img = Image.new("RGB", (20, 10), "white")
+    img.paste((255, 0, 0), (0, 0, 1, 10))                   # red left column
+    out = impose.add_bleed(img, 3)
+    assert out.size == (26, 16)
+    assert out.getpixel((2, 8)) == out.getpixel((3, 8)) == (255, 0, 0)
+    assert out.getpixel((1, 8)) == (255, 255, 255)
+
+
+def test_sheets_stream_one_row_of_cards_at_a_time(tmp_path):
+    colors = ["red", "green", "blue", "yellow", "cyan", "magenta"]
+    cards  = []
+    for i, c in enumerate(colors):
+        Image.new("RGB", (300, 200), c).save(tmp_path / f"{i}.png")
+        cards.append(tmp_path / f"{i}.png")
+    layout = impose.plan((1000, 540), (300, 200), gap=40)   # 3 × 2, bands never span the gap
+    assert (layout.cols, layout.rows) == (3, 2)
+    placements = [impose.Placement(c, s) for c, s in zip(cards, layout.slots)]
+    path = tmp_path / "sheet.tif"
+    peak = impose.write_sheet(path, layout.size, placements, 0, band_rows=16)
+    assert peak == 3 * layout.size[0] * 16 + 3 * (3 * 300 * 200)   # one band + one row
+
+    with Image.open(path) as sheet:
+        for p, c in zip(placements, colors):
+            x0, y0, x1, y1 = p.trim
+            assert sheet.getpixel(((x0 + x1) // 2, (y0 + y1) // 2)) == ImageColor.getrgb(c)
+
+
+def test_impose_writes_front_and_back_sheets(tmp_path):
+    front, back = tmp_path / "f.png", tmp_path / "b.png"
+    Image.new("RGB", (300, 200), "red").save(front)
+    Image.new("RGB", (200, 300), "blue").save(back)          # portrait back: turned to fit
+    report = impose.impose([front] * 7, tmp_path / "run.tif", (1000, 540), (300, 200),
+                           gap=40, backs=back)
+    assert [p.name for p in report.sheets] == ["run-01-front.tif", "run-01-back.tif",
+                                               "run-02-front.tif", "run-02-back.tif"]
+    with Image.open(report.sheets[1]) as sheet:
+        assert sheet.getpixel((840, 150)) == (0, 0, 255)         # slot 0 mirrored
@@ -0,0 +1,60 @@
+import pytest
+from postcard import bench, fonts, layout
+
+LONG = "Badlands National Park, South Dakota – where the prairie breaks into spires"
+
+
+@pytest.fixture(scope="module")
+def face():
+    try:
+        return fonts.find_first(bench.FONTS)
+    except fonts.FontNotFoundError:
+        pytest.skip("no caption font installed")
+
+
+def brute_fit(face, lines, max_w, max_h):
+    return max(s for s in range(layout.MIN_SIZE, layout.MAX_SIZE + 1)
+               if s == layout.MIN_SIZE or layout.fits(face, s, lines, max_w, max_h))
+
+
+@pytest.mark.parametrize("lines, box", [
+    (["Badlands"], (900, 300)),
+    (["Badlands", "South Dakota"], (900, 300)),
+    (["Hg"], (4000, 90)),                       # height‑bound
+    ([LONG], (1200, 400)),                      # width‑bound
+])
+def test_predicted_size_is_the_largest_that_fits(face, lines, box):
+    size = layout.fit_size(face, lines, *box)
+    assert size == brute_fit(face, lines, *box)
+    assert layout.fits(face, size, lines, *box)
+
+
+def test_a_line_too_long_for_any_size_gets_the_minimum(face):
+    assert layout.fit_size(face, [LONG * 4], 100, 400) == layout.MIN_SIZE
+
+
+@pytest.mark.parametrize("lines", [[], [""]])
+def test_empty_captions_fit_without_raising(face, lines):
+    size = layout.fit_size(face, lines, 900, 300)
+    assert layout.MIN_SIZE <= size <= layout.MAX_SIZE
+
+
+@pytest.mark.parametrize("text", ["", "   "])
+def test_blank_text_wraps_to_no_lines(face, text):
+    assert layout.fit_wrapped(face, text, 900, 300) == (layout.MAX_SIZE, [])
+
+
+def test_wrapping_a_long_line_grows_the_size(face):
+    one = layout.fit_size(face, [LONG], 1200, 400)
+    size, lines = layout.fit_wrapped(face, LONG, 1200, 400, max_lines=3)
+    assert len(lines) > 1 and size > one
+    assert " ".join(lines) == LONG
+    assert layout.fits(face, size, lines, 1200, 400)
+
+
+def test_layout_places_lines_inside_the_canvas(face):
+    cap = layout.layout_caption(face, LONG, (1800, 1200), 60, fit_box=(1500, 300),
+                                wrap_width=1500, align="center")
+    x0, y0, x1, y1 = cap.box
+    assert 0 <= x0 and x1 <= 1800 and y1 <= 1200 - 60
+    assert [l.y for l in cap.lines] == sorted(l.y for l in cap.lines)
@@ -0,0 +1,78 @@
+import builtins
+import random
+import pytest
+from PIL import Image, ImageChops, ImageFilter, ImageOps
+from postcard import loader
+from postcard.resample import resample_to
+
+STORED = (240, 160)
+
+
+def tagged(tmp_path, orientation, size=STORED, fmt="PNG"):
+    """A source of *size* stored pixels whose EXIF says *orientation*."""
+    rng   = random.Random(orientation)
+    noise = Image.frombytes("RGB", size, rng.randbytes(3 * size[0] * size[1]))
+    img   = Image.blend(Image.linear_gradient("L").resize(size).convert("RGB"), noise, 0.5)
+    exif  = Image.Exif()
+    exif[loader.ORIENTATION_TAG] = orientation
+    path  = tmp_path / f"o{orientation}.{fmt.lower()}"
+    img.save(path, fmt, exif=exif, **({"quality": 95} if fmt == "JPEG" else {}))
+    return path
+
+
+def smooth(tmp_path, size, fmt):
+    """A photo‑like source: soft gradients and blurred detail, no pixel noise."""
+    noise = Image.frombytes("RGB", (size[0] // 16, size[1] // 16),
+                            random.Random(7).randbytes(3 * (size[0] // 16) * (size[1] // 16)))
+    img   = noise.resize(size, Image.BICUBIC).filter(ImageFilter.GaussianBlur(4))
+    path  = tmp_path / f"smooth.{fmt.lower()}"
+    img.save(path, fmt, **({"quality": 95} if fmt == "JPEG" else {}))
+    return path
+
+
+@pytest.mark.parametrize("orientation", range(1, 9))
+def test_crop_box_lands_on_the_upright_pixels(tmp_path, orientation):
+    path = tagged(tmp_path, orientation)
+    with Image.open(path) as im:
+        upright = ImageOps.exif_transpose(im).convert("RGB")
+    assert loader.source_size(path) == upright.size
+    box = (13, 21, 13 + 90, 21 + 60)
+    out = loader.load_cropped(path, 1.5, crop_box=box)
+    assert out.tobytes() == upright.crop(box).tobytes()
+
+
+@pytest.mark.parametrize("orientation", [1, 6])
+def test_centred_crop_keeps_the_ratio(tmp_path, orientation):
+    path = tagged(tmp_path, orientation)
+    out  = loader.load_cropped(path, 1.0)
+    side = min(loader.source_size(path))
+    assert out.size == (side, side) == loader.crop_size(path, 1.0)
+
+
+@pytest.mark.parametrize("fmt", ["JPEG", "PNG"])
+def test_reduced_decode_stays_close_to_the_full_decode(tmp_path, fmt):
+    path   = smooth(tmp_path, (2400, 1600), fmt)
+    target = (600, 400)
+    small  = loader.load_cropped(path, 1.5, size=target)
+    assert small.size == (1200, 800)            # 2× headroom, not the full 2400
+    with Image.open(path) as im:
+        full = im.convert("RGB").resize(target, Image.LANCZOS)
+    diff = ImageChops.difference(resample_to(small, target).convert("RGB"), full)
+    hist = diff.histogram()
+    for band in range(3):
+        levels = hist[256 * band:256 * (band + 1)]
+        assert sum(levels[3:]) <= sum(levels) // 1000   # ±2 levels for ≥ 99.9%
+        assert not any(levels[5:])                      # and nothing past ±4
+
+
+@pytest.mark.parametrize("pages, size", [(1, None), (1, (60, 40)), (2, None), (2, (30, 20))])
+def test_source_file_is_closed(tmp_path, monkeypatch, pages, size):
+    # a multi‑page TIFF keeps its file open after load() until closed
+    path  = tmp_path / "scan.tif"
+    with Image.open(tagged(tmp_path, 6)) as first:
+        first.save(path, save_all=True, append_images=[first.rotate(180)] * (pages - 1))
+    files, real = [], builtins.open
+    monkeypatch.setattr(builtins, "open", lambda *a, **k: files.append(real(*a, **k)) or files[-1])
+    out = loader.load_cropped(path, 1.5, size)
+    assert files and all(f.closed for f in files)
+    assert out.getpixel((0, 0)) is not None
@@ -0,0 +1,74 @@
+import pytest
+from PIL import Image
+from postcard import palette
+
+
+@pytest.fixture(autouse=True)
+def memo_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(palette, "PALETTE_FILE", tmp_path / "palettes.json")
+    monkeypatch.setattr(palette, "_memo", None)
+    return tmp_path / "palettes.json"
+
+
+def scene(sky, ground, size=(300, 200)):
+    """Sky over ground, with a small saturated accent in the sky."""
+    img = Image.new("RGB", size, sky)
+    img.paste(ground, (0, size[1] // 2, size[0], size[1]))
+    img.paste((200, 40, 30), (20, 20, 50, 40))
+    return img
+
+
+def test_dark_band_gets_a_light_caption():
+    shadow, caption = palette.analyse(scene((120, 170, 230), (40, 35, 30)))
+    assert palette.luminance(caption) > palette.luminance((40, 35, 30))
+    assert palette.contrast(caption, (40, 35, 30)) >= palette.MIN_CONTRAST
+
+
+def test_light_band_gets_a_dark_caption():
+    band = (240, 235, 220)
+    _, caption = palette.analyse(scene((120, 170, 230), band), min_contrast=4.5)
+    assert palette.luminance(caption) < palette.luminance(band)
+    assert palette.contrast(caption, band) >= 4.5
+
+
+def test_caption_is_the_least_altered_accent_that_reaches_the_threshold():
+    background = (30, 30, 30)
+    accent     = (250, 210, 60)                   # already far above 3:1 on dark grey
+    assert palette.caption_for([(10, accent)], background) == accent
+    dull  = (60, 60, 70)
+    steps = [palette.mix(dull, (255, 255, 255), k / palette.TINT_STEPS)
+             for k in range(palette.TINT_STEPS + 1)]
+    first = next(c for c in steps if palette.contrast(c, background) >= 3.0)
+    assert first != dull
+    assert palette.caption_for([(10, dull)], background, min_contrast=3.0) == first
+
+
+def test_shadow_keeps_the_band_hue_at_a_fixed_value():
+    shadow = palette.shadow_for([(1, (200, 120, 40))])
+    assert max(shadow) == round(255 * palette.SHADOW_VALUE)
+    assert shadow[0] > shadow[1] > shadow[2]
+
+
+def test_a_single_colour_source():
+    shadow, caption = palette.analyse(Image.new("RGB", (64, 64), (128, 128, 128)))
+    assert shadow[0] == shadow[1] == shadow[2]              # no hue to keep
+    assert palette.contrast(caption, (128, 128, 128)) >= palette.MIN_CONTRAST
+
+
+def test_results_are_memoised_by_the_source_digest(tmp_path, memo_file, monkeypatch):
+    src = tmp_path / "photo.png"
+    img = scene((120, 170, 230), (40, 35, 30))
+    img.save(src)
+    first = palette.auto(img, src)
+    assert memo_file.is_file()
+
+    calls = []
+    monkeypatch.setattr(palette, "analyse", lambda *a: calls.append(a) or ((0, 0, 0),) * 2)
+    monkeypatch.setattr(palette, "_memo", None)              # a new process: disk only
+    copy = tmp_path / "copy.png"
+    copy.write_bytes(src.read_bytes())
+    assert palette.auto(img, copy) == first and calls == []  # same bytes, another path
+    palette.auto(img, src, crop=(0, 0, 10, 10))
+    scene((0, 0, 0), (255, 255, 255)).save(src)
+    palette.auto(img, src)
+    assert len(calls) == 2                                   # new crop, new contents
@@ -0,0 +1,44 @@
+import random
+import pytest
+from PIL import Image, ImageChops, ImageFilter
+from postcard import parallel
+
+SIZE = (513, 387)           # odd, so strips and reduce blocks don't divide evenly
+
+
+@pytest.fixture(autouse=True)
+def strips(monkeypatch):
+    monkeypatch.setattr(parallel, "MIN_STRIP_PIXELS", 4096)
+    parallel.set_workers(4)
+    yield
+    parallel.set_workers()
+
+
+@pytest.fixture(scope="module")
+def img():
+    return Image.frombytes("RGB", SIZE, random.Random(5).randbytes(3 * SIZE[0] * SIZE[1]))
+
+
+def test_map_strips_with_a_halo_is_seamless(img):
+    blur = ImageFilter.GaussianBlur(2)
+    assert parallel.map_strips(img, lambda s: s.filter(blur), halo=8).tobytes() == \
+        img.filter(blur).tobytes()
+
+
+@pytest.mark.parametrize("size", [(200, 150), (1030, 777)])
+def test_resize_matches_one_call(img, size):
+    # each strip's box offset is a float, so a kernel weight may round apart
+    diff = ImageChops.difference(parallel.resize(img, size), img.resize(size, Image.LANCZOS))
+    assert max(hi for _, hi in diff.getextrema()) <= 1
+
+
+@pytest.mark.parametrize("factor", [2, 3])
+def test_reduce_matches_one_call(img, factor):
+    assert parallel.reduce(img, factor).tobytes() == img.reduce(factor).tobytes()
+
+
+def test_strip_bounds_cover_every_row_once():
+    bounds = parallel.strip_bounds(1001, 500, align=8)
+    assert len(bounds) == 4 and all(y0 % 8 == 0 for y0, _ in bounds)
+    assert [r for y0, y1 in bounds for r in range(y0, y1)] == list(range(1001))
+    assert parallel.strip_bounds(0, 500) == []
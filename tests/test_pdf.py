@@ -0,0 +1,114 @@
+import re
+import struct
+import zlib
+from io import BytesIO
+import pytest
+from PIL import Image, ImageDraw, ImageFont
+from postcard import bench, fonts, pdf, sfnt
+from postcard.compositor import Compositor
+from postcard.glyphs import text_layer
+
+TEXT = "Hello, Badlands"
+
+
+@pytest.fixture(scope="module")
+def face():
+    try:
+        face = fonts.find_first(bench.FONTS)
+    except fonts.FontNotFoundError:
+        pytest.skip("no caption font installed")
+    if sfnt.Font(face.path, face.index).cff:
+        pytest.skip(f"{face.family} has CFF outlines, which are embedded whole")
+    return face
+
+
+@pytest.fixture(scope="module")
+def document(face, tmp_path_factory):
+    font = fonts.load(face, 60)
+    comp = Compositor((900, 300), (255, 255, 255))
+    comp.add(text_layer(TEXT, (40, 100), font, (20, 30, 40)))
+    path = tmp_path_factory.mktemp("pdf") / "card.pdf"
+    pdf.save_card(path, comp, 300, title="test")
+    return path.read_bytes()
+
+
+def objects(data: bytes) -> dict:
+    """{number: body} for every object, located through the xref table."""
+    start = int(re.search(rb"startxref\n(\d+)\n%%EOF\n$", data).group(1))
+    assert data[start:].startswith(b"xref\n0 ")
+    lines = data[start:].split(b"\n")
+    count = int(lines[1].split()[1])
+    trailer = data[data.index(b"trailer", start):]
+    assert b"/Size %d" % count in trailer
+    out = {}
+    for n, entry in enumerate(lines[3:3 + count - 1], 1):
+        offset = int(entry[:10])
+        head   = b"%d 0 obj\n" % n
+        assert data[offset:offset + len(head)] == head, f"xref entry {n} is off"
+        out[n] = data[offset + len(head):data.index(b"\nendobj\n", offset)]
+    return out
+
+
+def stream(body: bytes) -> bytes:
+    length = int(re.search(rb"/Length (\d+)", body).group(1))
+    data   = body[body.index(b"\nstream\n") + 8:][:length]
+    return zlib.decompress(data) if b"/FlateDecode" in body else data
+
+
+def ref(body: bytes, key: bytes) -> int:
+    return int(re.search(rb"/" + key + rb" (\d+) 0 R", body).group(1))
+
+
+def embedded_font(objs) -> bytes:
+    desc = next(b for b in objs.values() if b.startswith(b"<</Type /FontDescriptor"))
+    body = objs[ref(desc, b"FontFile2")]
+    data = stream(body)
+    assert int(re.search(rb"/Length1 (\d+)", body).group(1)) == len(data)
+    return data
+
+
+def checksum(data: bytes) -> int:
+    data += b"\0" * (-len(data) % 4)
+    return sum(struct.unpack(f">{len(data) // 4}I", data)) & 0xFFFFFFFF
+
+
+def test_xref_points_at_every_object(document):
+    objs = objects(document)
+    root = int(re.search(rb"/Root (\d+) 0 R", document[document.rindex(b"trailer"):]).group(1))
+    assert objs[root].startswith(b"<</Type /Catalog")
+
+
+def test_subset_font_checksums(document):
+    font = embedded_font(objects(document))
+    assert checksum(font) == 0xB1B0AFBA                  # head.checkSumAdjustment is right
+    for i in range(struct.unpack_from(">H", font, 4)[0]):
+        tag, check, off, length = struct.unpack_from(">4sIII", font, 12 + 16 * i)
+        table = font[off:off + length]
+        if tag == b"head":
+            table = table[:8] + bytes(4) + table[12:]
+        assert checksum(table) == check, tag
+
+
+def drawn(font, ch) -> Image.Image:
+    img = Image.new("L", (120, 120))
+    ImageDraw.Draw(img).text((20, 10), ch, font=font, fill=255)
+    return img
+
+
+def test_subset_font_draws_the_caption_and_nothing_else(document, face):
+    sub  = ImageFont.truetype(BytesIO(embedded_font(objects(document))), 60)
+    full = fonts.load(face, 60)
+    for ch in set(TEXT) - {" "}:
+        assert drawn(sub, ch).tobytes() == drawn(full, ch).tobytes(), ch
+    assert drawn(full, "Q").getbbox() is not None
+    assert drawn(sub, "Q").getbbox() is None              # not on the card: emptied
+
+
+def test_text_stays_text(document):
+    objs  = objects(document)
+    font  = next(b for b in objs.values() if b"/Subtype /Type0" in b)
+    cmap  = stream(objs[ref(font, b"ToUnicode")]).decode()
+    pairs = cmap[cmap.index("beginbfchar"):cmap.index("endbfchar")]
+    chars = {bytes.fromhex(u).decode("utf-16-be") for u in re.findall(r"<[0-9A-F]{4}> <([0-9A-F]+)>", pairs)}
+    assert chars == set(TEXT)
+    assert re.search(rb"/BaseFont /[A-Z]{6}\+", font)
@@ -0,0 +1,34 @@
+import pytest
+from PIL import Image, ImageDraw
+from postcard import bench, fonts, render, spec
+
+
+@pytest.fixture(scope="module")
+def font():
+    try:
+        return fonts.find_first(bench.FONTS).path
+    except fonts.FontNotFoundError:
+        pytest.skip("no caption font installed")
+
+
+def disc_source(path, size=(1800, 1200)):
+    """White field with a black disc in the middle, its diameter half the height."""
+    img = Image.new("RGB", size, "white")
+    cx, cy, r = size[0] // 2, size[1] // 2, size[1] // 4
+    ImageDraw.Draw(img).ellipse((cx - r, cy - r, cx + r, cy + r), fill="black")
+    img.save(path)
+    return path
+
+
+@pytest.mark.parametrize("size_in, border_in", [((6, 4), 0.0), ((6, 4), 0.25), ((4, 6), 0.1)])
+def test_bordered_photo_keeps_its_proportions(tmp_path, font, size_in, border_in):
+    table = {"input": str(disc_source(tmp_path / "disc.png")), "output": str(tmp_path / "out.tif"),
+             "card": {"dpi": 100, "size_in": list(size_in), "border_in": border_in},
+             "caption": {"lines": ["x"]}, "font": {"name": font}, "texture": {"enabled": False}}
+    plan = spec.compile(spec.parse(table), tmp_path)
+    assert abs(plan.ratio - plan.inner[0] / plan.inner[1]) < 1e-9
+
+    img, _, _, _ = render.photo(plan, cache=False)
+    assert img.size == plan.inner
+    x0, y0, x1, y1 = img.convert("L").point(lambda v: 255 if v < 128 else 0).getbbox()
+    assert abs((x1 - x0) - (y1 - y0)) <= 1          # still a disc, not an ellipse
@@ -0,0 +1,90 @@
+import random
+import pytest
+from PIL import Image, ImageFilter
+from postcard import parallel, resample
+from postcard.resample import SHARPEN_PRESETS, print_size, resample_to, sharpen_for_print
+
+
+@pytest.fixture(autouse=True)
+def strips(monkeypatch):
+    monkeypatch.setattr(parallel, "MIN_STRIP_PIXELS", 4096)
+    parallel.set_workers(4)
+    yield
+    parallel.set_workers()
+
+
+@pytest.fixture
+def reduces(monkeypatch):
+    """Every integer reduce resample_to makes, as (source size, factor)."""
+    calls, real = [], parallel.reduce
+
+    def spy(img, factor):
+        calls.append((img.size, factor))
+        return real(img, factor)
+    monkeypatch.setattr(parallel, "reduce", spy)
+    return calls
+
+
+def noise(size, seed=0):
+    return Image.frombytes("RGB", size, random.Random(seed).randbytes(3 * size[0] * size[1]))
+
+
+def test_print_size():
+    assert print_size(6, 4, 300) == (1800, 1200)
+    assert print_size(5.83, 8.27, 300) == (1749, 2481)
+
+
+@pytest.mark.parametrize("src, size, factor", [
+    ((4000, 2667), (1800, 1200), None),        # 2.2×: LANCZOS alone
+    ((4000, 2668), (1000, 667), 2),            # 4×: reduce by 2, then LANCZOS
+    ((4000, 2667), (1000, 667), None),         # just under 4×: not yet
+    ((6000, 4000), (600, 400), 5),             # 10×: ⌊10 / 2⌋
+    ((6000, 4000), (1000, 1000), 2),           # the tighter axis decides
+    ((1200, 800), (1800, 1200), None),         # upscale
+])
+def test_exact_size_and_reduce_path(src, size, factor, reduces):
+    out = resample_to(Image.new("RGB", src, "teal"), size)
+    assert out.size == size
+    assert reduces == ([] if factor is None else [(src, factor)])
+    assert out.getpixel((size[0] // 2, size[1] // 2)) == (0, 128, 128)
+
+
+def test_reduce_keeps_the_reducing_gap(reduces):
+    src, size = (8000, 6000), (500, 375)
+    resample_to(Image.new("L", src), size)
+    ((_, factor),) = reduces
+    reduced = (-(-src[0] // factor), -(-src[1] // factor))
+    assert reduced[0] >= resample.REDUCING_GAP * size[0]
+    assert reduced[0] < (resample.REDUCING_GAP + 1) * size[0] * 1.01
+
+
+def test_reducing_gap_is_a_parameter(reduces):
+    resample_to(Image.new("L", (6000, 4000)), (600, 400), reducing_gap=3.0)
+    assert reduces == [((6000, 4000), 3)]
+
+
+def test_same_size_is_untouched(reduces, monkeypatch):
+    img = noise((300, 200))
+    monkeypatch.setattr(parallel, "resize", lambda *a: pytest.fail("resized"))
+    assert resample_to(img, (300, 200)) is img
+    assert reduces == []
+
+
+@pytest.mark.parametrize("amount", [*SHARPEN_PRESETS, (2.0, 150, 0)])
+@pytest.mark.parametrize("dpi", [300, 600, 1200])
+def test_sharpen_halo_covers_the_kernel(amount, dpi):
+    # strips are filtered with ceil(3·radius)+2 rows of context, clamped to
+    # the image at the top and bottom, so the seams can't show
+    img = noise((257, 233), dpi)
+    radius, percent, threshold = SHARPEN_PRESETS.get(amount, amount)
+    whole = img.filter(ImageFilter.UnsharpMask(radius * dpi / 300, percent, threshold))
+    assert len(parallel.strip_bounds(img.height, img.width)) == 4
+    assert sharpen_for_print(img, amount, dpi).tobytes() == whole.tobytes()
+
+
+def test_sharpen_after_resample():
+    img = noise((900, 600))
+    out = resample_to(img, (300, 200), sharpen="high", dpi=300)
+    plain = resample_to(img, (300, 200))
+    assert out.size == (300, 200)
+    assert out.tobytes() == sharpen_for_print(plain, "high").tobytes()
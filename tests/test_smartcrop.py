@@ -0,0 +1,113 @@
+import random
+import pytest
+from PIL import Image, ImageDraw
+from postcard import smartcrop
+from postcard.loader import center_crop_box
+
+
+def source(tmp_path, size, busy=None):
+    """Flat grey, with random coloured blocks inside the *busy* box."""
+    img = Image.new("RGB", size, (128, 128, 128))
+    if busy:
+        rng, draw = random.Random(3), ImageDraw.Draw(img)
+        x0, y0, x1, y1 = busy
+        for _ in range(400):
+            x, y = rng.randrange(x0, x1 - 20), rng.randrange(y0, y1 - 20)
+            draw.rectangle((x, y, x + 20, y + 20), fill=tuple(rng.randbytes(3)))
+    path = tmp_path / f"{size[0]}x{size[1]}-{busy}.png"
+    img.save(path)
+    return path
+
+
+def slack(size):
+    """One proxy pixel, in full‑resolution pixels."""
+    return max(size) / smartcrop.PROXY_SIZE
+
+
+def check(box, size, ratio):
+    x0, y0, x1, y1 = box
+    assert 0 <= x0 < x1 <= size[0] and 0 <= y0 < y1 <= size[1]
+    assert abs((x1 - x0) / (y1 - y0) - ratio) < 0.01
+
+
+def test_flat_image_crops_to_the_centre(tmp_path):
+    size = (2000, 1000)
+    assert smartcrop.crop_box(source(tmp_path, size), 1.0) == center_crop_box(size, 1.0)
+
+
+def test_window_follows_the_detail(tmp_path):
+    size = (2000, 1000)
+    box  = smartcrop.crop_box(source(tmp_path, size, busy=(1400, 200, 1950, 800)), 1.0)
+    check(box, size, 1.0)
+    assert box[0] <= 1400 and box[2] >= 1950 - slack(size)
+
+
+def test_tighter_windows_when_allowed(tmp_path):
+    size = (2000, 1000)
+    path = source(tmp_path, size, busy=(1500, 100, 1900, 500))
+    box  = smartcrop.crop_box(path, 1.5, min_scale=0.4)
+    check(box, size, 1.5)
+    assert box[2] - box[0] < center_crop_box(size, 1.5)[2]
+    e = slack(size)
+    assert box[0] <= 1500 + e and box[2] >= 1900 - e and box[1] <= 100 + e and box[3] >= 500 - e
+
+
+def test_caption_band_avoids_the_detail(tmp_path):
+    size  = (1000, 2000)
+    busy  = (0, 1300, 1000, 1420)
+    path  = source(tmp_path, size, busy)
+    plain = smartcrop.crop_box(path, 1.0)
+    box   = smartcrop.crop_box(path, 1.0, caption_pos="bottom")
+    check(box, size, 1.0)
+    band_top = box[3] - (box[3] - box[1]) * smartcrop.CAPTION_BAND
+    assert plain == center_crop_box(size, 1.0)      # under the caption, unasked
+    assert box[1] <= busy[1] and busy[3] <= band_top + slack(size)
+
+
+@pytest.mark.parametrize("kwargs", [dict(min_scale=0), dict(min_scale=1.5),
+                                    dict(caption_pos="middle")])
+def test_bad_arguments_are_errors(tmp_path, kwargs):
+    with pytest.raises(ValueError):
+        smartcrop.crop_box(source(tmp_path, (200, 100)), 1.0, **kwargs)
+
+
+@pytest.mark.parametrize("caption_pos", [None, "bottom", "top"])
+def test_row_scores_match_window_sums(caption_pos):
+    rng  = random.Random(1)
+    size = (23, 17)
+    sat  = smartcrop.summed_area(Image.frombytes("L", size, rng.randbytes(size[0] * size[1])))
+    ww, wh = 9, 8
+    rows = smartcrop._scores(sat, size, ww, wh, caption_pos, 2.0 if caption_pos else 0.0)
+    assert len(rows) == size[1] - wh + 1 and {len(r) for r in rows} == {size[0] - ww + 1}
+    band = round(wh * smartcrop.CAPTION_BAND) if caption_pos else 0
+    for y0, row in enumerate(rows):
+        by0 = y0 + wh - band if caption_pos == "bottom" else y0
+        for x0, score in enumerate(row):
+            want = smartcrop.window_sum(sat, x0, y0, x0 + ww, y0 + wh) / (ww * wh)
+            if band:
+                want -= 2.0 * smartcrop.CAPTION_BAND / (ww * band) * \
+                    smartcrop.window_sum(sat, x0, by0, x0 + ww, by0 + band)
+            assert score == pytest.approx(want)
+
+
+def test_windows_are_scored_a_row_at_a_time(tmp_path, monkeypatch):
+    # Python work per row of placements, not per window
+    real_sums, real_scores = smartcrop._window_sums, smartcrop._scores
+    calls, windows = [], []
+
+    def sums(*args):
+        calls.append(args)
+        return real_sums(*args)
+
+    def scores(*args):
+        rows = real_scores(*args)
+        windows.extend(len(r) for r in rows)
+        return rows
+    monkeypatch.setattr(smartcrop, "_window_sums", sums)
+    monkeypatch.setattr(smartcrop, "_scores", scores)
+
+    path = source(tmp_path, (2000, 1000), busy=(1500, 100, 1900, 500))
+    smartcrop.crop_box(path, 1.0, caption_pos="bottom", min_scale=0.4)
+    assert sum(windows) > 10_000
+    assert len(calls) == 2 * len(windows)           # the window and its caption band
+    assert sum(windows) / len(calls) > 20
@@ -0,0 +1,74 @@
+from pathlib import Path
+import pytest
+from postcard import spec
+from postcard.spec import SpecError
+
+ROOT = Path(__file__).resolve().parent.parent
+MINIMAL = {"input": "in.jpg", "output": "out.tif", "caption": {"lines": "Badlands"}}
+
+
+def problems(table) -> list:
+    with pytest.raises(SpecError) as e:
+        spec.parse(table, "card.toml")
+    return str(e.value).splitlines()
+
+
+@pytest.mark.parametrize("name", ["badlands", "badlands2", "boxwork", "boxwork_postcard", "castle"])
+def test_shipped_specs_parse(name):
+    card = spec.load(ROOT / f"{name}.toml")
+    assert card.caption.lines
+
+
+def test_defaults_fill_everything_optional():
+    card = spec.parse(MINIMAL)
+    assert card.caption.lines == ["Badlands"]                  # one string is one line
+    assert card.input == Path("in.jpg") and card.card.dpi == 300
+    assert card.derivatives == [] and card.tiff.compression == "deflate"
+
+
+def test_every_problem_is_reported_at_once():
+    table = dict(MINIMAL, card={"dpi": 10, "size_in": [6], "sharpen": "extreme"},
+                 shadow={"color": [0, 300, 0], "opacity": "half"},
+                 caption={"lines": ["x"], "colour": [1, 2, 3]},
+                 derivatives=[{"width": 800}], tiff={"tile": 100})
+    assert problems(table) == [
+        "card.toml: card.dpi: must be between 72 and 2400 (got 10)",
+        "card.toml: card.size_in: must be a list of 2 numbers",
+        "card.toml: card.sharpen: must be one of low, medium, high (got 'extreme')",
+        "card.toml: caption.colour: unknown setting",
+        "card.toml: shadow.color: colour channels must be 0–255",
+        "card.toml: shadow.opacity: must be a number (got 'half')",
+        "card.toml: derivatives[0].path: required",
+        "card.toml: tiff.tile: must be a multiple of 16",
+    ]
+
+
+@pytest.mark.parametrize("table, message", [
+    ({}, "input: required"),
+    ({"input": "a.jpg", "output": "b.tif"}, "caption.lines: required"),
+    (dict(MINIMAL, open_viewer="yes"), "open_viewer: must be true or false (got 'yes')"),
+    (dict(MINIMAL, input=""), "input: must be a path"),
+    (dict(MINIMAL, crop=[1]), "crop: must be a table"),
+    (dict(MINIMAL, cmyk={"file": "out-cmyk.tif"}), "cmyk.profile: required when cmyk.file is set"),
+    (dict(MINIMAL, caption={"lines": "x", "line_offsets": ["left"]}),
+     "caption.line_offsets[0]: must be a number or [dx, dy]"),
+])
+def test_single_problems(table, message):
+    assert any(message in p for p in problems(table))
+
+
+def test_unreadable_files_are_spec_errors(tmp_path):
+    with pytest.raises(SpecError, match="missing.toml"):
+        spec.load(tmp_path / "missing.toml")
+    bad = tmp_path / "bad.toml"
+    bad.write_text("input = \n")
+    with pytest.raises(SpecError, match="bad.toml"):
+        spec.load(bad)
+
+
+def test_compile_reports_missing_files(tmp_path):
+    with pytest.raises(SpecError) as e:
+        spec.compile(spec.parse(dict(MINIMAL, emblem={"file": "logo.svg"})), tmp_path, "card")
+    lines = str(e.value).splitlines()
+    assert f"card: input: file not found: {tmp_path / 'in.jpg'}" in lines
+    assert f"card: emblem.file: file not found: {tmp_path / 'logo.svg'}" in lines
@@ -0,0 +1,79 @@
+import os
+import random
+import pytest
+from PIL import Image
+from postcard import stagecache
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(stagecache, "STAGE_CACHE_DIR", tmp_path / "stages")
+    monkeypatch.setattr(stagecache, "STATS_FILE", tmp_path / "stages" / "stats.json")
+    return tmp_path / "stages"
+
+
+def pixels(seed, size=(64, 48), mode="RGB"):
+    n = size[0] * size[1] * len(mode)
+    return Image.frombytes(mode, size, random.Random(seed).randbytes(n))
+
+
+def test_keys_cover_the_stage_and_every_parameter():
+    k = stagecache.key("photo", digest="abc", size=(600, 400))
+    assert k == stagecache.key("photo", size=(600, 400), digest="abc")
+    assert k != stagecache.key("photo", digest="abc", size=(600, 401))
+    assert k != stagecache.key("crop", digest="abc", size=(600, 400))
+
+
+@pytest.mark.parametrize("mode", ["RGB", "L", "CMYK"])
+def test_miss_then_hit_returns_the_same_pixels(mode):
+    k, img = stagecache.key("photo", mode=mode), pixels(1, mode=mode)
+    assert stagecache.get(k) is None
+    stagecache.put(k, img, {"icc": "srgb"}, seconds=1.25)
+    out, meta = stagecache.get(k)
+    assert (out.mode, out.size, out.tobytes()) == (mode, img.size, img.tobytes())
+    assert meta == {"icc": "srgb"}
+    s = stagecache.stats()
+    assert (s["entries"], s["hits"], s["misses"], s["saved_s"]) == (1, 1, 1, 1.25)
+
+
+def test_a_damaged_entry_is_a_miss(cache_dir):
+    k = stagecache.key("photo")
+    stagecache.put(k, pixels(2), {})
+    path = cache_dir / f"{k}.px"
+    path.write_bytes(b"garbage" + path.read_bytes()[7:])
+    assert stagecache.get(k) is None
+    path.write_bytes(path.read_bytes()[:stagecache.HEADER + 10])   # truncated pixels
+    assert stagecache.get(k) is None
+
+
+def test_least_recently_used_entries_are_evicted(cache_dir, monkeypatch):
+    entry = stagecache.HEADER + 64 * 48 * 3
+    monkeypatch.setattr(stagecache, "STAGE_CACHE_BYTES", 3 * entry)
+    keys = [stagecache.key("photo", n=n) for n in range(4)]
+    for n, k in enumerate(keys[:3]):
+        stagecache.put(k, pixels(n), {})
+        os.utime(cache_dir / f"{k}.px", (1000 + n, 1000 + n))
+    assert stagecache.get(keys[0]) is not None          # now the most recently used
+
+    stagecache.put(keys[3], pixels(3), {})               # one over the limit
+    assert stagecache.get(keys[1]) is None
+    assert all(stagecache.get(k) is not None for k in (keys[0], keys[2], keys[3]))
+    s = stagecache.stats()
+    assert (s["entries"], s["evictions"]) == (3, 1)
+
+
+def test_clear_removes_entries_and_counters():
+    stagecache.put(stagecache.key("photo"), pixels(4), {})
+    stagecache.get(stagecache.key("photo"))
+    assert stagecache.clear() == 1
+    s = stagecache.stats()
+    assert (s["entries"], s["hits"], s["misses"]) == (0, 0, 0)
+
+
+def test_file_digest_follows_the_contents(tmp_path):
+    path = tmp_path / "photo.jpg"
+    path.write_bytes(b"one")
+    first = stagecache.file_digest(path)
+    assert first == stagecache.file_digest(tmp_path / "." / "photo.jpg")
+    path.write_bytes(b"two!")                               # new size, new mtime
+    assert stagecache.file_digest(path) != first
@@ -0,0 +1,87 @@
+import io
+import pytest
+from postcard import svgcolor
+
+PALETTE = {"#ffffff": None, "#ff0000": "#00ff00", "*": "#000080"}
+
+
+def drawing(n=40):
+    """Attributes, inline styles and a <style> sheet, in several spellings."""
+    paths = "".join(f'<path d="M{i} 0h1" fill="#{"ff0000" if i % 2 else "FEFEFE"}" '
+                    f'style="stroke: rgb(250, 3, 1); opacity:1"/>' for i in range(n))
+    return ('<svg xmlns="http://www.w3.org/2000/svg"><style>.a{fill:#123456;stroke:none}</style>'
+            f'<g fill="white" stroke="url(#g)">{paths}</g></svg>')
+
+
+@pytest.mark.parametrize("chunk", [1, 7, 64, 1 << 20])
+def test_streaming_matches_one_pass_whatever_the_chunk(monkeypatch, chunk):
+    monkeypatch.setattr(svgcolor, "CHUNK_SIZE", chunk)
+    text = drawing()
+    out  = io.StringIO()
+    svgcolor.Recolorer(PALETTE).stream(io.StringIO(text), out)
+    assert out.getvalue() == svgcolor.Recolorer(PALETTE).sub(text)
+
+
+def test_palette_rules():
+    rc  = svgcolor.Recolorer(PALETTE)
+    out = rc.sub(drawing(2))
+    assert 'fill="#00ff00"' in out and "stroke:#00ff00;" in out      # within tolerance of red
+    assert "#FEFEFE" not in out and 'fill="white"' not in out         # near‑white removed
+    assert ".a{fill:#000080;stroke:none}" in out                      # catch‑all; "none" kept
+    assert 'stroke="url(#g)"' in out
+    assert rc.counts == {"recoloured": 4, "removed": 2}
+
+
+def test_each_distinct_value_is_classified_once(monkeypatch):
+    rc = svgcolor.Recolorer(PALETTE)
+    seen, real = [], svgcolor.parse_color
+    monkeypatch.setattr(svgcolor, "parse_color", lambda v: seen.append(v) or real(v))
+    rc.sub(drawing(200))
+    assert sorted(seen) == sorted({"#123456", "none", "white", "url(#g)", "#FEFEFE",
+                                   "#ff0000", "rgb(250, 3, 1)"})
+
+
+def test_bad_palette_key_is_an_error():
+    with pytest.raises(ValueError, match="not a colour"):
+        svgcolor.Recolorer({"sea": "#000"})
+
+
+def test_a_failed_write_leaves_the_source_and_no_temp_file(tmp_path, monkeypatch):
+    path = tmp_path / "art.svg"
+    path.write_text(drawing())
+    calls = []
+
+    def boom(self, text):
+        if calls:
+            raise RuntimeError("disk full")
+        calls.append(text)
+        return text
+
+    monkeypatch.setattr(svgcolor, "CHUNK_SIZE", 64)
+    monkeypatch.setattr(svgcolor.Recolorer, "sub", boom)
+    with pytest.raises(RuntimeError):
+        svgcolor.recolor_file(path, PALETTE)
+    assert path.read_text() == drawing()
+    assert [p.name for p in tmp_path.iterdir()] == ["art.svg"]
+
+
+def test_unchanged_files_are_not_rewritten(tmp_path):
+    path = tmp_path / "plain.svg"
+    path.write_text('<svg><path fill="none" d="M0 0"/></svg>')
+    mtime = path.stat().st_mtime_ns
+    assert svgcolor.recolor_file(path, PALETTE) == (None, {})
+    assert path.stat().st_mtime_ns == mtime and len(list(tmp_path.iterdir())) == 1
+
+
+def test_pool_recolours_every_file_in_order(tmp_path):
+    for i in range(4):
+        (tmp_path / "art" / f"{i}").mkdir(parents=True)
+        (tmp_path / "art" / f"{i}" / f"d{i}.svg").write_text(drawing(i + 1))
+    results = list(svgcolor.recolor_all([tmp_path / "art"], PALETTE, suffix="_navy", workers=2))
+    assert [src.name for src, _, _ in results] == ["d0.svg", "d1.svg", "d2.svg", "d3.svg"]
+    for src, out, counts in results:
+        assert out == src.with_name(src.stem + "_navy.svg")
+        assert out.read_text() == svgcolor.Recolorer(PALETTE).sub(src.read_text())
+        assert counts["recoloured"] > 0
+    # a second run skips the outputs of the first
+    assert len(list(svgcolor.svg_files([tmp_path / "art"], "_navy"))) == 4
@@ -0,0 +1,99 @@
+import random
+from math import ceil, cos, pi, sin
+import pytest
+from PIL import ImageChops, ImageFilter
+from postcard import emblem, svgopt
+
+VIEW  = (60, 40)
+SCALE = 16                  # px per SVG unit when rasterising
+
+
+def jagged(rng, n=60):
+    """A closed blob traced as many nearly collinear points, with long decimals."""
+    cx, cy, r = rng.uniform(15, 45), rng.uniform(12, 28), rng.uniform(6, 11)
+    pts = [(cx + r * cos(2 * pi * i / n) + rng.uniform(-0.15, 0.15),
+            cy + r * sin(2 * pi * i / n) + rng.uniform(-0.15, 0.15)) for i in range(n)]
+    return "M" + " L".join(f"{x:.6f},{y:.6f}" for x, y in pts) + " Z"
+
+
+def lumpy(rng):
+    """Cubics, some of them all but straight, plus a real arc."""
+    x, y = rng.uniform(3, 10), rng.uniform(3, 10)
+    d = f"M{x:.5f} {y:.5f}"
+    for _ in range(6):
+        nx, ny = x + rng.uniform(4, 7), y + rng.uniform(-1.5, 1.5)
+        bend = rng.choice((0.1, 0.3, 3))
+        d += (f" C{x + (nx - x) / 3:.5f} {y + (ny - y) / 3 + bend:.5f}"
+              f" {x + 2 * (nx - x) / 3:.5f} {y + 2 * (ny - y) / 3 - bend:.5f} {nx:.5f} {ny:.5f}")
+        x, y = nx, ny
+    return d + f" L{x:.5f} {y + 12:.5f} A10 6 0 0 1 {x - 30:.5f} {y + 12:.5f} Z"
+
+
+def document(seed):
+    rng = random.Random(seed)
+    return (f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {VIEW[0]} {VIEW[1]}">'
+            f'<path d="{jagged(rng)}" fill="#222"/>'
+            f'<g transform="translate(3.25, -2.5)"><path d="{lumpy(rng)}" fill="#222"/></g>'
+            f'<path transform="translate(0.4 0.3)" d="{jagged(rng, 24)}" fill="#222"/>'
+            f'</svg>')
+
+
+def coverage(tmp_path, name, text):
+    path = tmp_path / f"{name}.svg"
+    path.write_text(text)
+    _, alpha = emblem.rasterize(path, (VIEW[0] * SCALE, VIEW[1] * SCALE), (0, 0, 0))
+    return alpha.point(lambda v: 255 if v >= 128 else 0)
+
+
+def within(a, b, radius) -> bool:
+    """Every inked pixel of *a* is within *radius* px of ink in *b*."""
+    grown = b.filter(ImageFilter.MaxFilter(2 * radius + 1))
+    return ImageChops.subtract(a, grown).getbbox() is None
+
+
+@pytest.fixture(autouse=True)
+def emblem_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(emblem, "EMBLEM_CACHE_DIR", tmp_path / "emblems")
+
+
+@pytest.mark.parametrize("tolerance", [0.1, 0.5, 1.0])
+@pytest.mark.parametrize("seed", range(3))
+def test_max_error_bounds_the_rasterised_difference(tmp_path, seed, tolerance):
+    text = document(seed)
+    out, report = svgopt.optimize_svg(text, tolerance)
+    assert report.bytes_out < report.bytes_in
+    assert 0 < report.max_error <= tolerance
+
+    before = coverage(tmp_path, "before", text)
+    after  = coverage(tmp_path, "after", out)
+    # the bound in px, plus a pixel for the rasterisers’ own edge error
+    radius = ceil(report.max_error * SCALE) + 1
+    assert within(after, before, radius) and within(before, after, radius)
+
+    # …and the comparison can see a move just past that bound
+    moved = out.replace(">", '><g transform="translate(%g 0)">' % ((radius + 3) / SCALE), 1)
+    moved = moved.replace("</svg>", "</g></svg>")
+    assert not within(coverage(tmp_path, "moved", moved), before, radius)
+
+
+def test_hidden_shapes_are_dropped_without_changing_the_picture(tmp_path):
+    text = ('<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 60 40">'
+            '<g fill="none"><path d="M5 5 H25 V25 Z"/></g>'
+            '<g style="fill:#000"><path d="M30 5 H50 V25 Z"/></g>'
+            '<path d="M5 30 H20 V35 Z" visibility="hidden"/>'
+            '</svg>')
+    out, report = svgopt.optimize_svg(text)
+    assert (report.paths_in, report.paths_out, report.dropped) == (3, 1, 2)
+    assert ImageChops.difference(coverage(tmp_path, "a", text),
+                                 coverage(tmp_path, "b", out)).getbbox() is None
+
+
+def test_a_style_sheet_keeps_every_shape():
+    text = ('<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 60 40">'
+            '<style>path{stroke:red}</style>'
+            '<path fill="none" d="M10 10L50 50"/>'
+            '<path fill="none" d="M10 30L20 30"/>'
+            '</svg>')
+    out, report = svgopt.optimize_svg(text)
+    assert (report.paths_in, report.paths_out, report.dropped) == (2, 2, 0)
+    assert "<style>path{stroke:red}</style>" in out
@@ -0,0 +1,73 @@
+import os
+import random
+import pytest
+from PIL import Image
+from postcard import texture
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(texture, "TEXTURE_CACHE_DIR", tmp_path / "textures")
+    texture._prepared.cache_clear()
+    return tmp_path / "textures"
+
+
+def tile(path, seed=0, size=(37, 23)):
+    Image.frombytes("L", size, random.Random(seed).randbytes(size[0] * size[1])).save(path)
+    return path
+
+
+def test_tiles_are_levelled_for_the_blend(tmp_path):
+    src = tile(tmp_path / "paper.png")
+    for mode, (lo, hi) in ((m, texture.BLENDS[m][1]) for m in texture.BLENDS):
+        tex = texture.prepare(src, (100, 50), mode=mode)
+        assert (tex.mode, tex.size) == ("RGB", (100, 50))
+        assert tex.getchannel(0).getextrema() == (lo, hi)
+
+
+def test_tiling_repeats_the_source(tmp_path):
+    tex = texture.prepare(tile(tmp_path / "paper.png"), (100, 50)).getchannel(0)
+    assert tex.crop((0, 0, 37, 23)).tobytes() == tex.crop((37, 23, 74, 46)).tobytes()
+
+
+def test_memory_and_disk_caches_return_the_same_texture(tmp_path, cache_dir):
+    src  = tile(tmp_path / "paper.png")
+    made = texture.prepare(src, (100, 50), "scale", "overlay")
+    assert texture.prepare(src, (100, 50), "scale", "overlay") is made
+    assert len(list(cache_dir.glob("*.png"))) == 1
+
+    texture._prepared.cache_clear()                         # a new process: disk only
+    again = texture.prepare(src, (100, 50), "scale", "overlay")
+    assert again is not made and again.tobytes() == made.tobytes()
+
+
+def test_a_changed_source_is_prepared_again(tmp_path):
+    src    = tile(tmp_path / "paper.png", seed=1)
+    before = texture.prepare(src, (60, 40))
+    tile(src, seed=2)
+    st = src.stat()
+    os.utime(src, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    after = texture.prepare(src, (60, 40))
+    assert after.tobytes() != before.tobytes()
+
+
+def test_multiply_darkens_by_the_strength():
+    region = Image.new("RGB", (4, 4), (200, 100, 50))
+    tex    = Image.new("RGB", (4, 4), (191, 191, 191))
+    full   = texture.blender("multiply", 1.0)(region, tex).getpixel((0, 0))
+    half   = texture.blender("multiply", 0.5)(region, tex).getpixel((0, 0))
+    assert full == tuple(c * 191 // 255 for c in (200, 100, 50))
+    assert all(abs(h - (c + f) / 2) <= 1 for h, c, f in zip(half, (200, 100, 50), full))
+    white = Image.new("RGB", (4, 4), (255, 255, 255))
+    assert texture.blender("multiply", 1.0)(region, white).tobytes() == region.tobytes()
+
+
+@pytest.mark.parametrize("kwargs", [dict(mode="screen"), dict(fit="stretch")])
+def test_bad_options_are_errors(tmp_path, kwargs):
+    with pytest.raises(ValueError):
+        texture.prepare(tile(tmp_path / "paper.png"), (10, 10), **kwargs)
+
+
+def test_a_missing_texture_is_an_error(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        texture.prepare(tmp_path / "none.png", (10, 10))
@@ -0,0 +1,80 @@
+import random
+import pytest
+from PIL import Image, features
+from postcard import tiffwriter
+from postcard.color import profile_bytes
+
+SIZE = (301, 203)           # neither a multiple of the strip height nor of the tile
+
+
+def photo(mode="RGB"):
+    """Noise over gradients: compressible, but every byte matters."""
+    noise = Image.frombytes("L", SIZE, random.Random(0).randbytes(SIZE[0] * SIZE[1]))
+    ramp  = Image.linear_gradient("L")
+    return Image.merge(mode, [Image.blend(ramp.rotate(90 * i).resize(SIZE), noise, 0.1)
+                              for i in range(len(mode))])
+
+
+def write_in_bands(img, path, heights=(7, 50), **options):
+    with tiffwriter.TiffWriter(path, img.size, mode=img.mode, **options) as out:
+        y = 0
+        for h in (*heights, img.height):
+            h = min(h, img.height - y)
+            out.write(img.crop((0, y, img.width, y + h)))
+            y += h
+
+
+LZW = pytest.mark.skipif(not features.check("libtiff"), reason="LZW needs libtiff")
+
+
+@pytest.mark.parametrize("options", [
+    dict(),
+    dict(compression="deflate"),
+    dict(compression="deflate", predictor=True, rows_per_strip=16),
+    pytest.param(dict(compression="lzw", predictor=True), marks=LZW),
+    dict(tile=64),
+    dict(tile=64, compression="deflate", predictor=True),
+    pytest.param(dict(tile=32, compression="lzw"), marks=LZW),
+    dict(bigtiff=True),
+    dict(bigtiff=True, tile=64, compression="deflate"),
+], ids=repr)
+@pytest.mark.parametrize("mode", ["RGB", "CMYK"])
+def test_round_trip(tmp_path, mode, options):
+    img  = photo(mode)
+    path = tmp_path / "out.tif"
+    write_in_bands(img, path, **options)
+
+    with Image.open(path) as t:
+        assert (t.mode, t.size) == (mode, SIZE)
+        assert t.tobytes() == img.tobytes()
+        tags = t.tag_v2
+        assert tags[259] == tiffwriter.COMPRESSIONS[options.get("compression")]
+        assert tags.get(317, 1) == (2 if options.get("predictor") else 1)
+        assert (322 in tags) == ("tile" in options)
+        assert t.info["dpi"] == (300, 300)
+    with open(path, "rb") as f:
+        assert f.read(4) == (b"II+\0" if options.get("bigtiff") else b"II*\0")
+
+
+def test_save_embeds_icc_and_dpi(tmp_path):
+    icc  = profile_bytes()
+    path = tmp_path / "out.tif"
+    tiffwriter.save(photo(), path, dpi=600, icc=icc, compression="deflate")
+    with Image.open(path) as t:
+        assert t.info["icc_profile"] == icc
+        assert t.info["dpi"] == (600, 600)
+
+
+def test_predictor_differences_rows():
+    img = Image.frombytes("L", (4, 1), bytes([10, 30, 25, 25]))
+    assert list(tiffwriter.difference(img).tobytes()) == [10, 20, 251, 0]
+
+
+def test_short_image_is_an_error_and_leaves_nothing(tmp_path):
+    path = tmp_path / "out.tif"
+    out  = tiffwriter.TiffWriter(path, SIZE)
+    out.write(photo().crop((0, 0, SIZE[0], 10)))
+    with pytest.raises(ValueError):
+        out.close()
+    out.abort()
+    assert list(tmp_path.iterdir()) == []
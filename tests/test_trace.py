@@ -0,0 +1,111 @@
+import json
+import threading
+import time
+import tracemalloc
+from PIL import Image
+from postcard import trace
+
+
+def test_off_records_nothing():
+    with trace.off("decode", file="a.jpg") as span:
+        span.image(Image.new("RGB", (4, 4)))
+    assert trace.off("resize") is trace.off("encode")        # one shared span
+    assert not hasattr(span, "span")
+
+
+def test_span_records_wall_cpu_and_image():
+    tracer = trace.Tracer(memory=False)
+    with tracer("resize", file="card.tif") as span:
+        time.sleep(0.01)
+        span.image(Image.new("RGB", (30, 20)))
+    (s,) = tracer.spans
+    assert (s.name, s.args, s.size, s.mode, s.depth) == ("resize", {"file": "card.tif"}, (30, 20), "RGB", 0)
+    assert s.wall >= 0.01
+    assert s.cpu >= 0
+    assert s.py_peak is None and s.rss_peak is None
+
+
+def test_nested_spans_add_up():
+    tracer = trace.Tracer(memory=False)
+    with tracer("card"):
+        for _ in range(3):
+            with tracer("layer"):
+                time.sleep(0.005)
+        with tracer("export"):
+            with tracer("encode"):
+                time.sleep(0.005)
+    by_name = {}
+    for s in tracer.spans:
+        by_name.setdefault(s.name, []).append(s)
+    assert [s.depth for s in by_name["layer"]] == [1, 1, 1]
+    assert by_name["encode"][0].depth == 2 and by_name["card"][0].depth == 0
+
+    totals = tracer.totals()
+    assert totals["layer"] == sum(s.wall for s in by_name["layer"])
+    assert totals["card"] >= totals["layer"] + totals["export"]
+    assert totals["export"] >= totals["encode"] >= 0.005
+    # spans end inside their parent
+    card = by_name["card"][0]
+    for s in tracer.spans:
+        assert card.start <= s.start and s.start + s.wall <= card.start + card.wall + 1e-6
+
+
+def test_worker_thread_spans_nest_under_main():
+    tracer = trace.Tracer(memory=False)
+
+    def encode():
+        with tracer("encode"):
+            pass
+    with tracer("export"):
+        t = threading.Thread(target=encode, name="export_0")
+        t.start()
+        t.join()
+    (span,) = [s for s in tracer.spans if s.name == "encode"]
+    assert (span.thread, span.depth) == ("export_0", 1)
+
+
+def test_memory_peaks_feed_the_parent():
+    tracer = trace.Tracer(memory=True)
+    try:
+        with tracer("card"):
+            with tracer("layer"):
+                blob = bytearray(4 * 2**20)
+                del blob
+    finally:
+        tracer.close()
+    layer, card = tracer.spans
+    assert layer.py_peak >= 4 * 2**20
+    assert card.py_peak >= layer.py_peak
+    assert not tracemalloc.is_tracing()
+
+
+def test_chrome_trace_format(tmp_path):
+    spans = [trace.Span("decode", 10.0, 0.25, 0.2, "MainThread", size=(6, 4), mode="RGB"),
+             trace.Span("encode", 10.5, 0.125, 0.1, "export_0", depth=1, args={"file": "a.jpg"}),
+             trace.Span("card", 9.5, 2.0, 1.5, "MainThread")]
+    doc = trace.chrome(spans)
+    assert doc["displayTimeUnit"] == "ms"
+
+    complete = [e for e in doc["traceEvents"] if e["ph"] == "X"]
+    assert [e["name"] for e in complete] == ["card", "decode", "encode"]
+    assert [(e["ts"], e["dur"]) for e in complete] == [(0.0, 2e6), (0.5e6, 0.25e6), (1e6, 0.125e6)]
+    decode, encode = complete[1], complete[2]
+    assert decode["args"] == {"cpu_ms": 200.0, "size": "6×4", "mode": "RGB"}
+    assert encode["args"] == {"file": "a.jpg", "cpu_ms": 100.0}
+    assert decode["tid"] != encode["tid"] and {e["cat"] for e in complete} == {"postcard"}
+
+    names = {e["tid"]: e["args"]["name"] for e in doc["traceEvents"] if e["ph"] == "M"}
+    assert names == {decode["tid"]: "MainThread", encode["tid"]: "export_0"}
+
+    path = tmp_path / "trace.json"
+    trace.save_chrome(path, spans)
+    assert json.loads(path.read_text()) == json.loads(json.dumps(doc))
+
+
+def test_summary_indents_nested_spans():
+    spans = [trace.Span("card", 0.0, 1.0, 1.0, "MainThread"),
+             trace.Span("encode", 0.5, 0.5, 0.5, "export_0", depth=1, args={"file": "a.jpg"})]
+    lines = trace.summary(spans).splitlines()
+    assert lines[0].startswith("stage")
+    assert lines[1].startswith("card ")
+    assert lines[2].startswith("  encode file=a.jpg [export_0]")